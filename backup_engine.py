@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Backup Engine for Pattern Cleanup
+Takes legacy directories out of the live tree into a store the tools never scan, either as an
+instant snapshot or as a compressed archive indexed by sub-model for single restores
+"""
+
+import errno
+import gzip
+import json
+import os
+import shutil
+import tarfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cli_options import DEFAULT_WORKSPACE
+from instrumentation import BACKUP, phase
+from placeholder_store import reflink
+from validation_cache import CACHE_DIR
+
+BACKUP_DIR = "backups"
+MANIFEST = "manifest.json"
+
+# "snapshot": the tree renamed into the store (instant on the same filesystem, a linked or copied clone
+# across filesystems); "archive": <id>.tar.gz + index;
+# "move": the old behaviour, a *.backup sibling left in the tree
+MODES = ("snapshot", "archive", "move")
+
+
+def default_store_path(base_path: str = DEFAULT_WORKSPACE) -> Path:
+    # Inside .pattern_cache: on the workspace's filesystem (so a snapshot is one rename) but skipped by every crawl
+    return Path(base_path) / CACHE_DIR / BACKUP_DIR
+
+
+def _clone_file(src: str, dst: str, link: bool = True) -> str:
+    """Copy src to dst as cheaply as the filesystem allows; returns the method used
+
+    Without link, dst never shares src's inode (a reflink is still fine: its extents are copy-on-write).
+    """
+    try:
+        reflink(src, dst)
+        return "reflink"
+    except OSError as e:
+        if e.errno == errno.EEXIST:
+            raise
+    if link:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def clone_tree(src: Path, dst: Path, link: bool = True) -> Dict[str, int]:
+    """Recreate src at dst with cloned/linked files (symlinks copied as links); returns entry counts by method
+
+    link=False never hardlinks, for trees that will be edited in place (see _clone_file).
+    """
+    counts: Dict[str, int] = {}
+    os.makedirs(dst)
+    stack = [(str(src), str(dst))]
+    while stack:
+        src_dir, dst_dir = stack.pop()
+        with os.scandir(src_dir) as it:
+            for item in it:
+                target = os.path.join(dst_dir, item.name)
+                if item.is_symlink():
+                    os.symlink(os.readlink(item.path), target)
+                    method = "symlink"
+                elif item.is_dir():
+                    os.mkdir(target)
+                    stack.append((item.path, target))
+                    method = "dir"
+                else:
+                    method = _clone_file(item.path, target, link)
+                counts[method] = counts.get(method, 0) + 1
+        shutil.copystat(src_dir, dst_dir)
+    return counts
+
+
+def _count_entries(root: Path) -> int:
+    """Entries below root (directories, files and symlinks), as listed in a snapshot's manifest"""
+    count = 0
+    for _, dirs, files in os.walk(root):
+        count += len(dirs) + len(files)
+    return count
+
+
+class BackupEngine:
+    def __init__(self, base_path: str = DEFAULT_WORKSPACE, store: Optional[Path] = None, mode: str = "snapshot"):
+        if mode not in MODES:
+            raise ValueError(f"unknown backup mode '{mode}' (choose from {', '.join(MODES)})")
+        self.base_path = Path(base_path)
+        self.store = Path(store) if store else default_store_path(base_path)
+        self.mode = mode
+
+    def _new_id(self, path: Path) -> str:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        backup_id = f"{stamp}-{path.name}"
+        n = 1
+        while (self.store / backup_id).exists() or (self.store / f"{backup_id}.tar.gz").exists():
+            n += 1
+            backup_id = f"{stamp}-{path.name}-{n}"
+        return backup_id
+
+    def backup(self, path: Path) -> str:
+        """Back up path and remove it from the live tree; returns the backup id (or the .backup path for "move")"""
+        with phase(BACKUP):
+            if self.mode == "move":
+                backup_path = path.parent / f"{path.name}.backup"
+                shutil.move(str(path), str(backup_path))
+                return str(backup_path)
+
+            self.store.mkdir(parents=True, exist_ok=True)
+            backup_id = self._new_id(path)
+            manifest = {
+                "id": backup_id,
+                "mode": self.mode,
+                "source": str(path.relative_to(self.base_path)),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            if self.mode == "snapshot":
+                tree = self.store / backup_id / "tree"
+                os.mkdir(self.store / backup_id)
+                moved = False
+                try:
+                    try:
+                        os.rename(path, tree)  # same filesystem: backup and removal in one step
+                        moved = True
+                    except OSError as e:
+                        if e.errno != errno.EXDEV:
+                            raise
+                    manifest["files"] = {"renamed": _count_entries(tree)} if moved else clone_tree(path, tree)
+                    (self.store / backup_id / MANIFEST).write_text(json.dumps(manifest, indent=1))
+                except BaseException:
+                    if moved:
+                        os.rename(tree, path)  # put the original back
+                    shutil.rmtree(self.store / backup_id, ignore_errors=True)
+                    raise
+                if moved:
+                    return backup_id
+            else:
+                manifest["members"] = self._write_archive(path, self.store / f"{backup_id}.tar.gz")
+                (self.store / f"{backup_id}.index.json").write_text(json.dumps(manifest, indent=1))
+
+            # Only once the backup is complete does the original leave the tree
+            shutil.rmtree(path)
+            return backup_id
+
+    def _write_archive(self, path: Path, archive: Path) -> Dict[str, Dict[str, int]]:
+        """Stream path into archive as one gzip member per top-level entry; returns the member index
+
+        Each member is a complete gzip-compressed tar, so a single sub-model is restored by reading
+        just its byte range; `tar -xzif` still extracts the whole file at once.
+        """
+        members: Dict[str, Dict[str, int]] = {}
+        tmp = archive.with_suffix(".tmp")
+        try:
+            with open(tmp, "wb") as out:
+                for name in sorted(os.listdir(path)):
+                    offset = out.tell()
+                    with gzip.GzipFile(filename="", mode="wb", fileobj=out, mtime=0) as gz:
+                        with tarfile.open(fileobj=gz, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+                            tar.add(str(path / name), arcname=name)
+                            count = len(tar.getmembers())
+                    members[name] = {"offset": offset, "length": out.tell() - offset, "entries": count}
+            os.replace(tmp, archive)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return members
+
+    # Inspecting and restoring
+
+    def list(self) -> List[Dict]:
+        """Manifests of every backup in the store, oldest first"""
+        backups = []
+        if not self.store.is_dir():
+            return backups
+        for entry in sorted(self.store.iterdir()):
+            manifest_path = entry / MANIFEST if entry.is_dir() else (
+                entry if entry.name.endswith(".index.json") else None)
+            if manifest_path is None or not manifest_path.is_file():
+                continue
+            try:
+                backups.append(json.loads(manifest_path.read_text()))
+            except ValueError:
+                continue
+        return backups
+
+    def manifest(self, backup_id: str) -> Dict:
+        for path in (self.store / backup_id / MANIFEST, self.store / f"{backup_id}.index.json"):
+            if path.is_file():
+                return json.loads(path.read_text())
+        raise FileNotFoundError(f"no backup '{backup_id}' in {self.store}")
+
+    def restore(self, backup_id: str, member: Optional[str] = None, target: Optional[Path] = None) -> Path:
+        """Restore a backup (or one top-level member of it, e.g. a single sub-model) to target
+
+        target defaults to the original location; restoring never overwrites an existing path.
+        """
+        manifest = self.manifest(backup_id)
+        target = Path(target) if target else self.base_path / manifest["source"]
+        destination = target / member if member else target
+        if destination.exists():
+            raise FileExistsError(f"{destination} already exists")
+
+        if manifest["mode"] == "snapshot":
+            source = self.store / backup_id / "tree"
+            source = source / member if member else source
+            if not source.exists():
+                raise FileNotFoundError(f"'{member}' is not part of backup '{backup_id}'")
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            # Restored files are live again: a hardlink would let an in-place edit rewrite the backup too
+            if source.is_dir():
+                clone_tree(source, destination, link=False)
+            else:
+                _clone_file(str(source), str(destination), link=False)
+            return destination
+
+        names = [member] if member else sorted(manifest["members"])
+        for name in names:
+            info = manifest["members"].get(name)
+            if info is None:
+                raise FileNotFoundError(f"'{name}' is not part of backup '{backup_id}'")
+            target.mkdir(parents=True, exist_ok=True)
+            with open(self.store / f"{backup_id}.tar.gz", "rb") as f:
+                f.seek(info["offset"])
+                with gzip.GzipFile(fileobj=_Window(f, info["length"])) as gz:
+                    with tarfile.open(fileobj=gz, mode="r|") as tar:
+                        if hasattr(tarfile, "data_filter"):
+                            tar.extractall(str(target), filter="data")  # refuse paths escaping target
+                        else:
+                            tar.extractall(str(target))
+        return destination
+
+
+class _Window:
+    """Read-only view of length bytes from a file's current position (one gzip member of an archive)"""
+
+    def __init__(self, f, length: int):
+        self.f = f
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+
+if __name__ == "__main__":
+    import sys
+    from cli_options import option_value
+
+    engine = BackupEngine(DEFAULT_WORKSPACE, store=option_value(sys.argv, "--store"))
+    args = [a for i, a in enumerate(sys.argv[1:], 1) if not a.startswith("--") and sys.argv[i - 1] not in ("--store", "--to")]
+    command = args[0] if args else "list"
+
+    if command == "list":
+        for manifest in engine.list():
+            detail = (f"{sum(manifest['files'].values())} entries" if manifest["mode"] == "snapshot"
+                      else f"{len(manifest['members'])} members")
+            print(f"{manifest['id']}  {manifest['mode']:<8}  {manifest['source']}  ({detail})")
+    elif command == "restore" and len(args) >= 2:
+        to = option_value(sys.argv, "--to")
+        try:
+            restored = engine.restore(args[1], member=args[2] if len(args) > 2 else None, target=to and Path(to))
+        except (OSError, tarfile.TarError) as e:
+            print(f"✗ Restore failed: {e}")
+            exit(1)
+        print(f"✓ Restored {restored}")
+    else:
+        print("Usage: backup_engine.py [list | restore ID [MEMBER] [--to DIR]] [--store DIR]")
+        exit(2)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Multi-Root Batch Validation
+Validates many layout roots (generated projects, packages, other checkouts) in one process: every root's
+models and components go onto one bounded worker pool, taken from the roots in turn, with one merged report
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from cli_options import DEFAULT_WORKSPACE
+from findings import ERROR, Finding, JsonlWriter
+from validate_pattern import PatternValidator, make_cache
+from workspace_snapshot import WorkspaceSnapshot
+
+# Directories searched by --discover, relative to the workspace
+DISCOVER_PARENTS = ("Projects", "Packages")
+
+# A directory is a layout root if it has any of these
+ROOT_MARKERS = ("models", "layout/components", "widow")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def is_layout_root(path: Path) -> bool:
+    return any((path / marker).is_dir() for marker in ROOT_MARKERS)
+
+
+def discover_roots(base_path: str = DEFAULT_WORKSPACE, parents: Iterable[str] = DISCOVER_PARENTS) -> List[Path]:
+    """Layout roots directly below Projects/ and Packages/; a project keeps its tree in <project>/layout"""
+    roots = []
+    for parent in parents:
+        parent_path = Path(base_path) / parent
+        if not parent_path.is_dir():
+            continue
+        for child in sorted(parent_path.iterdir()):
+            if not child.is_dir():
+                continue
+            if is_layout_root(child):
+                roots.append(child)
+            elif is_layout_root(child / "layout"):
+                roots.append(child / "layout")
+    return roots
+
+
+def round_robin(queues: Iterable[Iterable[T]]) -> Iterator[T]:
+    """One item from each queue in turn until all are empty, so no root waits behind another's whole queue"""
+    iterators: Deque[Iterator[T]] = deque(iter(queue) for queue in queues)
+    while iterators:
+        iterator = iterators.popleft()
+        for item in iterator:
+            yield item
+            iterators.append(iterator)
+            break
+
+
+def bounded_map(pool: ThreadPoolExecutor, func: Callable[[T], R], items: Iterable[T],
+                limit: int) -> Iterator[Tuple[T, R]]:
+    """(item, func(item)) in submission order, with at most limit items queued or running at once
+
+    Items are submitted lazily, so the pool works through them in the order given rather than whichever
+    root happened to be enqueued first in full.
+    """
+    pending: Deque[Tuple[T, "object"]] = deque()
+    for item in items:
+        pending.append((item, pool.submit(func, item)))
+        if len(pending) >= limit:
+            done, future = pending.popleft()
+            yield done, future.result()
+    while pending:
+        done, future = pending.popleft()
+        yield done, future.result()
+
+
+class RootRun:
+    """One root of a batch: its snapshot, validator and collected findings"""
+
+    def __init__(self, path: Path, label: str, cache: bool):
+        self.path = path
+        self.label = label
+        self.use_cache = cache
+        self.validator: Optional[PatternValidator] = None
+        self.models: List[str] = []
+        self.components: List[str] = []
+        self.findings: List[Finding] = []
+        self.cached = 0
+
+    def crawl(self):
+        """Index the root (one scandir walk, on a pool thread) and list its work units"""
+        cache = make_cache(str(self.path)) if self.use_cache else None
+        snapshot = WorkspaceSnapshot(str(self.path))
+        self.validator = PatternValidator(str(self.path), snapshot=snapshot, cache=cache)
+        self.models = self.validator.get_models()
+        self.components = self.validator.get_components()
+
+    def units(self) -> List[Tuple["RootRun", Optional[str]]]:
+        """(root, model or component key) per check; None is the root's cross-model property comparison"""
+        return [(self, key) for key in self.models + self.components] + [(self, None)]
+
+    def finish(self):
+        cache = self.validator.cache
+        if cache is not None:
+            cache.prune(self.models + self.components)
+            cache.save()
+
+    def count(self, severity: str) -> int:
+        return sum(1 for finding in self.findings if finding.severity == severity)
+
+
+def _check(unit: Tuple[RootRun, Optional[str]]) -> Tuple[List[Finding], bool]:
+    root, key = unit
+    if key is None:
+        return list(root.validator.property_findings()), False
+    return root.validator.findings_cached(key)
+
+
+class BatchValidator:
+    def __init__(self, roots: List[Path], base_path: str = DEFAULT_WORKSPACE, jobs: int = 1, cache: bool = True):
+        self.base_path = Path(base_path)
+        self.jobs = max(1, jobs)
+        # Resolved, since the snapshot keys a relative root as ./models... and lookups of models/ would miss them
+        self.roots = [RootRun(Path(root).resolve(), self.label(Path(root)), cache) for root in roots]
+
+    def label(self, root: Path) -> str:
+        """Root as the report names it: workspace-relative when inside the workspace"""
+        try:
+            return str(root.resolve().relative_to(self.base_path.resolve())) or "."
+        except ValueError:
+            return str(root)
+
+    def iter_findings(self) -> Iterator[Tuple[RootRun, Finding]]:
+        """(root, finding) for every root, yielded as checks complete
+
+        Crawls run on the pool first (one per root); then each root contributes one model or component
+        at a time in turn, so a large root doesn't hold up the others' results.
+        """
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            list(pool.map(RootRun.crawl, self.roots))
+            for root in self.roots:
+                if not root.models and not root.components:
+                    # Nothing to check is a wrong root, not a pass
+                    finding = Finding("", "", "empty-root", ERROR, f"{root.label}: No models or components found")
+                    root.findings.append(finding)
+                    yield root, finding
+            units = round_robin(root.units() for root in self.roots)
+            for (root, _), (findings, from_cache) in bounded_map(pool, _check, units, self.jobs * 2):
+                root.cached += from_cache
+                root.findings.extend(findings)
+                for finding in findings:
+                    yield root, finding
+        for root in self.roots:
+            root.finish()
+
+    def stream_jsonl(self, stream) -> JsonlWriter:
+        """One JSON line per finding, each carrying the label of its root"""
+        writer = JsonlWriter(stream)
+        for root, finding in self.iter_findings():
+            writer.write(finding, root=root.label)
+        return writer
+
+    def validate_all(self) -> bool:
+        """Check every root and print one merged report; False if any root has errors"""
+        print(f"Validating {len(self.roots)} root(s) on {self.jobs} worker(s)\n")
+        for _ in self.iter_findings():
+            pass
+
+        for root in self.roots:
+            errors = root.count(ERROR)
+            icon = "✓" if not errors else "✗"
+            note = f", {root.cached} cached" if root.cached else ""
+            print(f"{icon} {root.label}: {len(root.models)} model(s), {len(root.components)} component(s) — "
+                  f"{errors} error(s), {len(root.findings) - errors} warning(s){note}")
+            for finding in root.findings:
+                if finding.severity == ERROR:
+                    print(f"    ✗ {finding.message}")
+
+        total_errors = sum(root.count(ERROR) for root in self.roots)
+        total = sum(len(root.findings) for root in self.roots)
+        failing = [root.label for root in self.roots if root.count(ERROR)]
+        print(f"\n=== Summary ===")
+        print(f"Roots: {len(self.roots)} ({len(failing)} with errors)")
+        print(f"Errors: {total_errors}")
+        print(f"Warnings: {total - total_errors}")
+        return not failing
+
+
+if __name__ == "__main__":
+    import sys
+    from cli_options import jobs_option, optional_value
+    from findings import open_report
+    from instrumentation import profile_option
+
+    profile_option(sys.argv)
+    args = [a for i, a in enumerate(sys.argv[1:], 1)
+            if not a.startswith("-") and sys.argv[i - 1] not in ("--jobs", "-j", "--jsonl", "--profile")]
+    roots = [Path(a) for a in args]
+    if "--discover" in sys.argv:
+        roots += discover_roots(DEFAULT_WORKSPACE)
+    if not roots:
+        print("Usage: batch_validate.py [ROOT...] [--discover] [--jobs N] [--jsonl [FILE]] [--no-cache]")
+        exit(2)
+    missing = [str(root) for root in roots if not root.is_dir()]
+    if missing:
+        print(f"✗ Not a directory: {', '.join(missing)}")
+        exit(2)
+
+    batch = BatchValidator(roots, DEFAULT_WORKSPACE, jobs=jobs_option(sys.argv, default=os.cpu_count() or 1),
+                           cache="--no-cache" not in sys.argv)
+    jsonl = optional_value(sys.argv, "--jsonl")
+    if jsonl is not None:
+        with open_report(jsonl) as stream:
+            writer = batch.stream_jsonl(stream)
+        print(f"Findings: {writer.summary()}", file=sys.stderr)
+        exit(1 if writer.counts.get(ERROR) else 0)
+
+    exit(0 if batch.validate_all() else 1)
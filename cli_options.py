@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Command-line option helpers shared by the pattern tools
+Keeps the tools' plain sys.argv style while supporting valued flags like --jobs 8
+"""
+
+import os
+from typing import List, Optional
+
+# Workspace the tools operate on unless given a path; LAYOUT_WORKSPACE overrides it (benchmarks, CI checkouts)
+DEFAULT_WORKSPACE = os.environ.get("LAYOUT_WORKSPACE", "/workspaces/layout")
+
+
+def option_value(argv: List[str], name: str, default: Optional[str] = None) -> Optional[str]:
+    """Value of `name VALUE` or `name=VALUE` in argv, else default"""
+    for i, arg in enumerate(argv):
+        if arg == name and i + 1 < len(argv):
+            return argv[i + 1]
+        if arg.startswith(name + "="):
+            return arg[len(name) + 1:]
+    return default
+
+
+def optional_value(argv: List[str], name: str) -> Optional[str]:
+    """For flags whose value is optional (--jsonl [FILE]): None if absent, else the value or '-' when bare"""
+    for i, arg in enumerate(argv):
+        if arg.startswith(name + "="):
+            return arg[len(name) + 1:]
+        if arg == name:
+            following = argv[i + 1] if i + 1 < len(argv) else None
+            if following is not None and (following == "-" or not following.startswith("-")):
+                return following
+            return "-"
+    return None
+
+
+def jobs_option(argv: List[str], default: int = 1) -> int:
+    """Worker count from --jobs N (0 or 'auto' means one per CPU)"""
+    value = option_value(argv, "--jobs", option_value(argv, "-j"))
+    if value is None:
+        return default
+    if value == "auto" or value == "0":
+        return os.cpu_count() or 1
+    try:
+        return max(1, int(value))
+    except ValueError:
+        print(f"⚠ Ignoring invalid --jobs value '{value}'")
+        return default
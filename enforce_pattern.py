@@ -5,13 +5,20 @@ Migrates old structures, applies pattern to all directories
 """
 
 import os
-import shutil
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from backup_engine import MODES as BACKUP_MODES, BackupEngine
+from cli_options import DEFAULT_WORKSPACE, option_value
+from instrumentation import profile_option
+from pattern_schema import load_schema
+from type_enums import TypeEnumGenerator, derive_case
+from workspace_snapshot import WorkspaceSnapshot
 
 class ComprehensivePatternEnforcer:
-    def __init__(self, base_path: str = "/workspaces/layout"):
+    def __init__(self, base_path: str = DEFAULT_WORKSPACE, snapshot: Optional[WorkspaceSnapshot] = None):
         self.base_path = Path(base_path)
+        self.snapshot = snapshot or WorkspaceSnapshot(base_path)
         self.actions = []
         
     def list_old_submodels(self):
@@ -29,36 +36,31 @@ class ComprehensivePatternEnforcer:
         
         for old_dir_name in old_dirs.keys():
             old_path = models_path / old_dir_name
-            if old_path.exists():
-                for item in old_path.iterdir():
-                    if item.is_dir() and item.name.endswith("Model"):
-                        old_dirs[old_dir_name].append(item.name)
+            for name in self.snapshot.subdirs(old_path):
+                if name.endswith("Model"):
+                    old_dirs[old_dir_name].append(name)
         
         return old_dirs
     
     def analyze_directory_patterns(self, path: Path) -> Dict[str, any]:
         """Analyze a directory's structure"""
-        if not path.exists():
+        if not self.snapshot.exists(path):
             return {"exists": False}
         
         analysis = {
             "exists": True,
-            "is_dir": path.is_dir(),
+            "is_dir": self.snapshot.is_dir(path),
             "subdirs": [],
             "files": [],
             "has_model_pattern": False
         }
         
-        if path.is_dir():
-            for item in path.iterdir():
-                if item.is_dir():
-                    analysis["subdirs"].append(item.name)
-                else:
-                    analysis["files"].append(item.name)
+        if analysis["is_dir"]:
+            analysis["subdirs"] = self.snapshot.subdirs(path)
+            analysis["files"] = self.snapshot.files(path)
             
             # Check if it follows model pattern
-            expected_subdirs = {"properties", "attributes", "operations", "types", "strings", "collections"}
-            if expected_subdirs.issubset(set(analysis["subdirs"])):
+            if set(load_schema().subdirectories).issubset(analysis["subdirs"]):
                 analysis["has_model_pattern"] = True
         
         return analysis
@@ -70,111 +72,56 @@ class ComprehensivePatternEnforcer:
         # Analyze /models
         print("📁 /models/")
         models_path = self.base_path / "models"
-        if models_path.exists():
-            for item in sorted(models_path.iterdir()):
-                if item.is_dir():
-                    analysis = self.analyze_directory_patterns(item)
-                    icon = "✓" if analysis.get("has_model_pattern") else "✗"
-                    suffix = " (unified)" if item.name.endswith("Model") and not item.name.endswith("Models") else " (old)"
-                    print(f"  {icon} {item.name}{suffix}")
+        for name in self.snapshot.subdirs(models_path):
+            analysis = self.analyze_directory_patterns(models_path / name)
+            icon = "✓" if analysis.get("has_model_pattern") else "✗"
+            suffix = " (unified)" if name.endswith("Model") and not name.endswith("Models") else " (old)"
+            print(f"  {icon} {name}{suffix}")
         
         # Analyze /window
         print("\n📁 /window/")
         window_path = self.base_path / "window"
-        if window_path.exists():
-            for item in sorted(window_path.iterdir()):
-                if item.is_dir():
-                    print(f"  → {item.name}/")
-                else:
-                    print(f"  → {item.name}")
+        for name in self.snapshot.list_dir(window_path):
+            if self.snapshot.is_dir(window_path / name):
+                print(f"  → {name}/")
+            else:
+                print(f"  → {name}")
         
         # Analyze /widow
         print("\n📁 /widow/")
         widow_path = self.base_path / "widow"
-        if widow_path.exists():
-            for item in sorted(widow_path.iterdir()):
-                if item.is_dir():
-                    print(f"  → {item.name}/")
+        for name in self.snapshot.subdirs(widow_path):
+            print(f"  → {name}/")
         
         # Analyze /layout/components
         print("\n📁 /layout/components/")
         components_path = self.base_path / "layout" / "components"
-        if components_path.exists():
-            for item in sorted(components_path.iterdir()):
-                if item.is_dir():
-                    analysis = self.analyze_directory_patterns(item)
-                    icon = "✓" if analysis.get("has_model_pattern") else "→"
-                    print(f"  {icon} {item.name}/")
+        for name in self.snapshot.subdirs(components_path):
+            analysis = self.analyze_directory_patterns(components_path / name)
+            icon = "✓" if analysis.get("has_model_pattern") else "→"
+            print(f"  {icon} {name}/")
     
     def create_migration_plan(self):
-        """Create plan for migrating old sub-models"""
+        """Create plan for migrating old sub-models, each to the type enum case type_enums derives for it"""
         print("\n=== Migration Plan ===\n")
         
         old_submodels = self.list_old_submodels()
-        
-        mapping = {
-            "BarModels": {
-                "parent": "BarModel",
-                "types": {
-                    "BreadcrumbsModel": "breadcrumbs",
-                    "PathBarModel": "path",
-                    "StatusBarModel": "status",
-                    "TitleBarModel": "title",
-                    "ToolBarModel": "tool"
-                }
-            },
-            "PanelModels": {
-                "parent": "PanelModel",
-                "types": {
-                    "FloatingPanelModel": "floating",
-                    "PreviewPanelModel": "preview",
-                    "SidePanelModel": "side",
-                    "CategoryPanelModel": "category"
-                }
-            },
-            "TabModels": {
-                "parent": "TabModel",
-                "types": {
-                    "TabsModel": "horizontal",
-                    "VerticalTabsModel": "vertical"
-                }
-            },
-            "ControlModels": {
-                "parent": "ControlModel",
-                "types": {
-                    "AccordionModel": "accordion",
-                    "ButtonsModel": "button",
-                    "ChipsModel": "chip",
-                    "SegmentedControlModel": "segmented",
-                    "StepperModel": "stepper",
-                    "TogglesModel": "toggle"
-                }
-            },
-            "DisplayModels": {
-                "parent": "DisplayModel",
-                "types": {
-                    "BadgesModel": "badge",
-                    "ChartsModel": "chart",
-                    "FeedModel": "feed",
-                    "WidgetsModel": "widget"
-                }
-            },
-            "MenuModels": {
-                "parent": "MenuModel",
-                "types": {
-                    "BentoModel": "bento",
-                    "ContextModel": "context",
-                    "HamburgerModel": "hamburger"
-                }
+        generator = TypeEnumGenerator(str(self.base_path), snapshot=self.snapshot)
+        
+        mapping = {}
+        for old_dir, submodels in old_submodels.items():
+            parent = old_dir[:-1]
+            known = generator.declared(parent)
+            mapping[old_dir] = {
+                "parent": parent,
+                "types": {submodel: derive_case(parent[:-len("Model")], submodel, known) for submodel in submodels}
             }
-        }
         
         for old_dir, config in mapping.items():
-            if old_dir in old_submodels and old_submodels[old_dir]:
+            if config["types"]:
                 print(f"📦 {old_dir}/ → {config['parent']}/")
-                for submodel in old_submodels[old_dir]:
-                    type_name = config['types'].get(submodel, "unknown")
-                    print(f"   • {submodel} → BarType.{type_name}")
+                for submodel, type_name in config["types"].items():
+                    print(f"   • {submodel} → {config['parent'][:-len('Model')]}Type.{type_name}")
         
         return mapping
     
@@ -188,14 +135,14 @@ class ComprehensivePatternEnforcer:
         to_remove = []
         for old_dir in old_dirs:
             path = models_path / old_dir
-            if path.exists():
+            if self.snapshot.exists(path):
                 to_remove.append(path)
                 print(f"🗑️  Remove: /models/{old_dir}/")
         
         return to_remove
     
-    def execute_cleanup(self, dry_run: bool = True):
-        """Execute cleanup of old directories"""
+    def execute_cleanup(self, dry_run: bool = True, backup_mode: str = "snapshot", store: Optional[Path] = None):
+        """Execute cleanup of old directories, backing each up first (see backup_engine.MODES)"""
         to_remove = self.create_cleanup_plan()
         
         if not to_remove:
@@ -206,19 +153,51 @@ class ComprehensivePatternEnforcer:
             print(f"\n[DRY RUN] Would remove {len(to_remove)} directories")
         else:
             print(f"\n🗑️  Removing {len(to_remove)} old directories...")
+            engine = BackupEngine(str(self.base_path), store=store, mode=backup_mode)
             for path in to_remove:
+                backup_path = path.parent / f"{path.name}.backup"
+                if backup_mode == "move" and self.snapshot.exists(backup_path):
+                    continue
                 try:
-                    # Create backup first
-                    backup_path = path.parent / f"{path.name}.backup"
-                    if not backup_path.exists():
-                        shutil.move(str(path), str(backup_path))
-                        print(f"   ✓ Moved {path.name} → {path.name}.backup")
+                    backup = engine.backup(path)
                 except Exception as e:
                     print(f"   ✗ Error backing up {path.name}: {e}")
+                    continue
+                if backup_mode == "move":
+                    self.snapshot.move(path, backup_path)
+                    print(f"   ✓ Moved {path.name} → {path.name}.backup")
+                else:
+                    self.snapshot.remove(path)
+                    print(f"   ✓ Backed up {path.name} ({backup_mode} {backup}) and removed it")
+    
+    def archive_legacy_backups(self, dry_run: bool = True, backup_mode: str = "snapshot",
+                               store: Optional[Path] = None):
+        """Move *.backup directories left in models/ by earlier cleanups into the backup store"""
+        if backup_mode == "move":
+            print("\n✗ Legacy backups can only be archived with the snapshot or archive backup mode")
+            return
+        models_path = self.base_path / "models"
+        legacy = [models_path / name for name in self.snapshot.subdirs(models_path) if name.endswith(".backup")]
+        if not legacy:
+            print("\n✓ No legacy .backup directories in /models")
+            return
+        if dry_run:
+            print(f"\n[DRY RUN] Would move {len(legacy)} .backup directories into the backup store")
+            return
+        engine = BackupEngine(str(self.base_path), store=store, mode=backup_mode)
+        for path in legacy:
+            try:
+                backup = engine.backup(path)
+            except Exception as e:
+                print(f"   ✗ Error archiving {path.name}: {e}")
+                continue
+            self.snapshot.remove(path)
+            print(f"   ✓ {path.name} → {backup_mode} {backup}")
 
 if __name__ == "__main__":
     import sys
     
+    profile_option(sys.argv)
     enforcer = ComprehensivePatternEnforcer()
     
     if "--scan" in sys.argv:
@@ -227,9 +206,19 @@ if __name__ == "__main__":
     if "--migration-plan" in sys.argv:
         enforcer.create_migration_plan()
     
+    backup_mode = option_value(sys.argv, "--backup", "snapshot")
+    store = option_value(sys.argv, "--backup-store")
+    if backup_mode not in BACKUP_MODES:
+        print(f"✗ Unknown --backup mode '{backup_mode}' (choose from {', '.join(BACKUP_MODES)})")
+        exit(2)
+    
     if "--cleanup" in sys.argv:
         dry_run = "--dry-run" in sys.argv
-        enforcer.execute_cleanup(dry_run=dry_run)
+        enforcer.execute_cleanup(dry_run=dry_run, backup_mode=backup_mode, store=store and Path(store))
+    
+    if "--archive-backups" in sys.argv:
+        enforcer.archive_legacy_backups(dry_run="--dry-run" in sys.argv, backup_mode=backup_mode,
+                                        store=store and Path(store))
     
     if len(sys.argv) == 1:
         # Default: show everything
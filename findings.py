@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Structured Findings for the Pattern Tools
+One record per problem or change, streamed as JSON Lines while a run progresses
+"""
+
+import contextlib
+import json
+import sys
+from array import array
+from typing import IO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+# Severities, most to least serious
+ERROR = "error"
+WARNING = "warning"
+FIX = "fix"
+INFO = "info"
+
+
+# Message formats by rule id, for findings whose detail is the rule's arguments rather than the message
+MESSAGES: Dict[str, Callable[["Finding"], str]] = {}
+
+
+def message_format(rule: str):
+    """Register the function that renders the message of a rule's findings (see Finding.detail)"""
+    def register(render: Callable[["Finding"], str]):
+        MESSAGES[rule] = render
+        return render
+    return register
+
+
+class Finding(NamedTuple):
+    model: str      # model name (BarModel) or workspace-relative component key (layout/components/card)
+    path: str       # path relative to the model root, "" for the root itself
+    rule: str       # stable rule id, e.g. "missing-dir", "missing-operation", "naming"
+    severity: str
+    detail: object  # the message itself, or the arguments (None, a number, a list) of the rule's message format
+
+    @property
+    def message(self) -> str:
+        """The human-readable line the text report prints, rendered only when asked for"""
+        if isinstance(self.detail, str):
+            return self.detail
+        return MESSAGES[self.rule](self)
+
+    def to_json(self, **context) -> str:
+        """One JSON object; context fields (e.g. the root of a batch run) come first"""
+        return json.dumps({**context, "model": self.model, "path": self.path, "rule": self.rule,
+                           "severity": self.severity, "message": self.message}, ensure_ascii=False)
+
+
+class FindingTable:
+    """Findings of a whole run kept column-wise: model, path, rule and severity as integer ids into one
+    table of interned strings, details only for the rows that have one
+
+    A row costs four array slots instead of a tuple and a message string; Findings (and their messages)
+    are built only when the table is read.
+    """
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.columns = tuple(array("I") for _ in range(4))
+        self.details: Dict[int, object] = {}
+
+    def _id(self, text: str) -> int:
+        code = self.ids.get(text)
+        if code is None:
+            code = self.ids[text] = len(self.strings)
+            self.strings.append(sys.intern(text))
+        return code
+
+    def append(self, finding: Finding):
+        if finding.detail is not None:
+            self.details[len(self)] = finding.detail
+        for column, text in zip(self.columns, finding[:4]):
+            column.append(self._id(text))
+
+    def extend(self, findings: Iterable[Finding]):
+        for finding in findings:
+            self.append(finding)
+
+    def __len__(self) -> int:
+        return len(self.columns[0])
+
+    def __iter__(self) -> Iterator[Finding]:
+        strings, details = self.strings, self.details
+        for row, ids in enumerate(zip(*self.columns)):
+            yield Finding(*(strings[i] for i in ids), details.get(row))
+
+    def count(self, severity: str) -> int:
+        code = self.ids.get(severity)
+        return 0 if code is None else self.columns[3].count(code)
+
+
+class JsonlWriter:
+    """Writes findings one line at a time, flushing each so consumers see them immediately"""
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+        self.counts: Dict[str, int] = {}
+
+    def write(self, finding: Finding, **context):
+        self.stream.write(finding.to_json(**context) + "\n")
+        self.stream.flush()
+        self.counts[finding.severity] = self.counts.get(finding.severity, 0) + 1
+
+    def write_all(self, findings: Iterable[Finding]) -> Dict[str, int]:
+        for finding in findings:
+            self.write(finding)
+        return self.counts
+
+    def summary(self) -> str:
+        return ", ".join(f"{count} {severity}(s)" for severity, count in sorted(self.counts.items())) or "no findings"
+
+
+@contextlib.contextmanager
+def open_report(target: Optional[str]) -> Iterator[IO[str]]:
+    """Stream for a --jsonl target: '-' (or no value) is stdout, anything else a file path"""
+    if not target or target == "-":
+        yield sys.stdout
+        return
+    with open(target, "w", encoding="utf-8") as stream:
+        yield stream
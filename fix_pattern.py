@@ -5,89 +5,81 @@ Adds missing properties to ensure all models follow the same pattern
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from cli_options import DEFAULT_WORKSPACE, jobs_option, optional_value
+from findings import ERROR, FIX, INFO, Finding, JsonlWriter, open_report
+from instrumentation import PROPERTIES, WRITES, phase, profile_option
+from pattern_schema import load_schema
+from workspace_snapshot import WorkspaceSnapshot
+from write_planner import write_if_changed
 
 class PatternFixer:
-    def __init__(self, base_path: str = "/workspaces/layout"):
+    def __init__(self, base_path: str = DEFAULT_WORKSPACE, snapshot: Optional[WorkspaceSnapshot] = None,
+                 jobs: int = 1):
         self.base_path = Path(base_path)
         self.models_path = self.base_path / "models"
+        self.jobs = jobs
+        self.snapshot = snapshot or WorkspaceSnapshot(base_path, jobs=jobs)
         self.fixes_applied = []
+        self.writes_avoided = []  # property files already on disk with the default bytes (not rewritten)
         
-    # Core properties ALL models should have
-    CORE_PROPERTIES = {
-        "layout": {
-            "width": "auto",
-            "height": "auto",
-            "padding": "8",
-            "spacing": "4",
-            "position": "relative"
-        },
-        "style": {
-            "backgroundColor": "#FFFFFF",
-            "borderRadius": "4",
-            "borderWidth": "1",
-            "opacity": "1.0",
-            "shadowOffset": "0,2",
-            "shadowOpacity": "0.1"
-        },
-        "behavior": {
-            "isVisible": "true",
-            "isEnabled": "true",
-            "isInteractive": "true"
-        }
-    }
-    
-    # Optional properties that are model-specific (keep if exists, don't force)
-    OPTIONAL_PROPERTIES = {
-        "style": ["selectionColor"],
-        "content": ["body", "data", "icon", "items", "label", "subtitle", "text", "title", "value"],
-        "behavior": [
-            "allowsMultipleSelection", "autoRefresh", "canAutoHide", "canClose",
-            "canDetach", "canReorder", "canResize", "dismissOnSelect",
-            "isAnimated", "isSelectable", "isSelected", "showsFeedback", "showsHover"
-        ]
-    }
+    # Core properties ALL models should have, and the model-specific optional ones (keep if exists,
+    # don't force); both come from the shared pattern schema
+    CORE_PROPERTIES = load_schema().core_properties
+    OPTIONAL_PROPERTIES = load_schema().optional_properties
     
     def get_models(self) -> List[str]:
         """Get all model directories"""
-        models = []
-        if self.models_path.exists():
-            for item in self.models_path.iterdir():
-                if item.is_dir() and item.name.endswith("Model"):
-                    models.append(item.name)
+        models = [name for name in self.snapshot.subdirs(self.models_path) if name.endswith("Model")]
         return sorted(models)
     
     def get_existing_properties(self, model: str, category: str) -> Set[str]:
         """Get list of existing property files in a category"""
         path = self.models_path / model / "properties" / category
-        if not path.exists():
+        if not self.snapshot.exists(path):
             return set()
-        return set(f.stem for f in path.iterdir() if f.is_file())
+        return set(Path(name).stem for name in self.snapshot.files(path))
     
-    def add_missing_property(self, model: str, category: str, prop_name: str, default_value: str) -> bool:
+    def add_missing_property(self, model: str, category: str, prop_name: str, default_value: str,
+                             fixes: Optional[List[Finding]] = None, log: Optional[List[str]] = None) -> bool:
         """Add a missing property file"""
-        path = self.models_path / model / "properties" / category / prop_name
+        fixes = self.fixes_applied if fixes is None else fixes
+        relpath = f"properties/{category}/{prop_name}"
+        path = self.models_path / model / relpath
         
-        if path.exists():
+        if self.snapshot.exists(path):
             return False  # Already exists
         
         try:
-            path.write_text(default_value)
-            self.fixes_applied.append(f"Added {model}/properties/{category}/{prop_name}")
+            # The snapshot may be stale: a file that appeared meanwhile with the same bytes is left untouched
+            with phase(WRITES):
+                written = write_if_changed(str(path), default_value.encode())
+            self.snapshot.record_file(path, len(default_value.encode()))
+            if not written:
+                self.writes_avoided.append(f"{model}/{relpath}")
+                return False
+            fixes.append(Finding(model, relpath, "core-property", FIX, f"Added {model}/{relpath}"))
             return True
         except Exception as e:
-            print(f"Error adding {model}/properties/{category}/{prop_name}: {e}")
+            message = f"Error adding {model}/{relpath}: {e}"
+            if log is None:
+                print(message)
+            else:
+                log.append(message)
+                fixes.append(Finding(model, relpath, "core-property", ERROR, message))
             return False
     
-    def fix_core_properties(self, model: str):
+    def fix_core_properties(self, model: str, fixes: Optional[List[Finding]] = None, log: Optional[List[str]] = None):
         """Ensure model has all core properties"""
         for category, properties in self.CORE_PROPERTIES.items():
             existing = self.get_existing_properties(model, category)
             
             for prop_name, default_value in properties.items():
                 if prop_name not in existing:
-                    self.add_missing_property(model, category, prop_name, default_value)
+                    self.add_missing_property(model, category, prop_name, default_value, fixes, log)
     
     def analyze_model_specific_properties(self, model: str) -> Dict[str, List[str]]:
         """Identify which optional properties this model should have based on its type"""
@@ -119,17 +111,19 @@ class PatternFixer:
         
         return recommendations
     
-    def fix_all_models(self, dry_run: bool = False):
-        """Fix all models"""
-        models = self.get_models()
-        print(f"Found {len(models)} models to fix\n")
+    def fix_model(self, model: str, dry_run: bool = False) -> Tuple[List[Finding], List[str]]:
+        """Fix one model, returning (findings, report lines) so models can be fixed concurrently
+
+        Findings are the applied fixes plus any write errors and recommendations, as records.
+        """
+        fixes = []
+        log = []
         
-        for model in models:
-            print(f"Fixing {model}...")
-            
-            if not dry_run:
+        if not dry_run:
+            # Compare against the core and recommended properties; the writes are timed as their own phase
+            with phase(PROPERTIES):
                 # Add core properties
-                self.fix_core_properties(model)
+                self.fix_core_properties(model, fixes, log)
                 
                 # Get recommendations for model-specific properties
                 recommendations = self.analyze_model_specific_properties(model)
@@ -139,32 +133,79 @@ class PatternFixer:
                     existing = self.get_existing_properties(model, category)
                     for prop in props:
                         if prop not in existing:
-                            print(f"  ℹ Recommended: {category}/{prop} (not auto-added)")
-            else:
-                print(f"  [DRY RUN] Would fix core properties for {model}")
+                            log.append(f"  ℹ Recommended: {category}/{prop} (not auto-added)")
+                            fixes.append(Finding(model, f"properties/{category}/{prop}", "recommended-property",
+                                                 INFO, f"{model}: Recommended {category}/{prop} (not auto-added)"))
+        else:
+            log.append(f"  [DRY RUN] Would fix core properties for {model}")
+        
+        return fixes, log
+    
+    def iter_fix_results(self, models: List[str], dry_run: bool = False) -> Iterator[Tuple[List[Finding], List[str]]]:
+        """fix_model() for each model, yielded in order as each finishes"""
+        # Each model writes only inside its own directory; map() keeps the report in sorted order
+        if self.jobs <= 1:
+            yield from (self.fix_model(m, dry_run) for m in models)
+            return
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            yield from pool.map(lambda m: self.fix_model(m, dry_run), models)
+    
+    def iter_findings(self, dry_run: bool = False) -> Iterator[Finding]:
+        """Every fix, error and recommendation as a record, yielded model by model without collecting them"""
+        for findings, _ in self.iter_fix_results(self.get_models(), dry_run):
+            yield from findings
+    
+    def fix_all_models(self, dry_run: bool = False) -> bool:
+        """Fix all models; False if any fix could not be written"""
+        models = self.get_models()
+        print(f"Found {len(models)} models to fix\n")
+        
+        failed = False
+        for model, (findings, log) in zip(models, self.iter_fix_results(models, dry_run)):
+            print(f"Fixing {model}...")
+            for line in log:
+                print(line)
+            self.fixes_applied.extend(f for f in findings if f.severity == FIX)
+            failed |= any(f.severity == ERROR for f in findings)
         
         print(f"\n=== Summary ===")
         print(f"Fixes applied: {len(self.fixes_applied)}")
+        if self.writes_avoided:
+            print(f"Writes avoided: {len(self.writes_avoided)} (already held the default bytes)")
         
         if self.fixes_applied:
             print("\nFixed:")
             for fix in self.fixes_applied:
-                print(f"  ✓ {fix}")
+                print(f"  ✓ {fix.message}")
+        
+        return not failed
     
     def verify_fixes(self):
         """Re-run validation to confirm fixes"""
         print("\n=== Verifying Fixes ===")
         from validate_pattern import PatternValidator
-        validator = PatternValidator()
+        # Reuse our snapshot (kept in sync by add_missing_property) instead of re-crawling
+        validator = PatternValidator(str(self.base_path), snapshot=self.snapshot, jobs=self.jobs)
         valid = validator.validate_all()
         return valid
 
 if __name__ == "__main__":
     import sys
     
+    profile_option(sys.argv)
     dry_run = "--dry-run" in sys.argv
+    jsonl = optional_value(sys.argv, "--jsonl")
+    
+    fixer = PatternFixer(jobs=jobs_option(sys.argv))
+    
+    if jsonl is not None:
+        # Machine-readable mode: one record per fix as it is applied, no verification pass
+        with open_report(jsonl) as stream:
+            writer = JsonlWriter(stream)
+            writer.write_all(fixer.iter_findings(dry_run=dry_run))
+        print(f"Findings: {writer.summary()}", file=sys.stderr)
+        exit(1 if writer.counts.get(ERROR) else 0)
     
-    fixer = PatternFixer()
     fixer.fix_all_models(dry_run=dry_run)
     
     if not dry_run:
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Git-Diff Scoping for the Pattern Tools
+Turns --since <ref> / --staged into the list of changed paths, so pre-commit and CI runs
+only look at the model and component roots a change actually touched
+"""
+
+import os
+import subprocess
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from cli_options import option_value
+
+
+class GitScopeError(Exception):
+    pass
+
+
+def _git(cwd: Path, *args: str) -> bytes:
+    try:
+        result = subprocess.run(["git", *args], cwd=str(cwd), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise GitScopeError(f"git is not available: {e}")
+    if result.returncode != 0:
+        raise GitScopeError(result.stderr.decode(errors="replace").strip() or f"git {' '.join(args)} failed")
+    return result.stdout
+
+
+def scope_option(argv: List[str]) -> Optional[Tuple[Optional[str], bool]]:
+    """(since ref, staged) from --since REF / --staged, or None when the run isn't scoped"""
+    since = option_value(argv, "--since")
+    staged = "--staged" in argv
+    if since is None and not staged:
+        return None
+    return since, staged
+
+
+def describe_scope(since: Optional[str], staged: bool) -> str:
+    return "staged changes" if staged else f"changes since {since}"
+
+
+def changed_paths(base_path: str, since: Optional[str] = None, staged: bool = False) -> List[Path]:
+    """Absolute paths added, modified, deleted or renamed (both sides) in the diff, limited to base_path
+
+    --staged compares the index with HEAD; --since compares the working tree with REF and also
+    counts untracked files, so new models show up before they are added.
+    """
+    base = Path(base_path).resolve()
+    top = Path(_git(base, "rev-parse", "--show-toplevel").decode().strip())
+    if staged:
+        out = _git(top, "diff", "--cached", "--name-only", "--no-renames", "-z")
+    else:
+        out = _git(top, "diff", "--name-only", "--no-renames", "-z", since, "--")
+        out += _git(top, "ls-files", "--others", "--exclude-standard", "-z")
+    paths = []
+    for raw in out.split(b"\0"):
+        if not raw:
+            continue
+        path = top / os.fsdecode(raw)
+        if path == base or base in path.parents:
+            paths.append(Path(base_path) / path.relative_to(base))
+    return sorted(set(paths))
+
+
+def owning_roots(paths: Iterable[Path], owner_of: Callable[[str], Optional[str]]) -> List[str]:
+    """Sorted owner keys (model names / component keys) of paths, dropping paths no root owns"""
+    return sorted({owner_of(str(path)) for path in paths} - {None})
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Minimal Linux inotify Watcher (ctypes, no third-party dependency)
+Recursively watches directory trees and reports which paths changed
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+from pathlib import Path
+from typing import Dict, List, Set
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_CLOSE_WRITE | IN_ATTRIB
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class InotifyWatcher:
+    def __init__(self, roots: List[Path], skip_dirs: Set[str] = frozenset()):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("inotify is only available on Linux (libc not found)")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is only available on Linux")
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.skip_dirs = set(skip_dirs)
+        self.watches: Dict[int, str] = {}
+        self.overflowed = False
+        for root in roots:
+            self.add_tree(root)
+
+    def add_tree(self, root: Path):
+        """Watch root and every directory below it"""
+        stack = [str(root)]
+        while stack:
+            path = stack.pop()
+            if not self._add_watch(path):
+                continue
+            try:
+                with os.scandir(path) as it:
+                    for item in it:
+                        if item.is_dir(follow_symlinks=False) and item.name not in self.skip_dirs:
+                            stack.append(item.path)
+            except OSError:
+                pass
+
+    def _add_watch(self, path: str) -> bool:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return False  # vanished before we got to it
+            raise OSError(err, f"inotify_add_watch failed for {path}: {os.strerror(err)}")
+        self.watches[wd] = path
+        return True
+
+    def read_events(self, timeout: float = None, settle: float = 0.01) -> Set[str]:
+        """Block up to timeout for events, then keep draining until quiet for `settle` seconds
+
+        Returns the set of changed paths. Directories created under a watched tree are
+        watched automatically; overflowed queues set self.overflowed.
+        """
+        changed: Set[str] = set()
+        wait = timeout
+        while True:
+            ready, _, _ = select.select([self.fd], [], [], wait)
+            if not ready:
+                return changed
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            self._parse(data, changed)
+            wait = settle
+
+    def _parse(self, data: bytes, changed: Set[str]):
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_len].split(b"\0", 1)[0]
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            directory = self.watches.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.watches[wd]
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            changed.add(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and os.path.basename(path) not in self.skip_dirs:
+                self.add_tree(Path(path))
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
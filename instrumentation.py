@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Profiling and Instrumentation for the Pattern Tools
+Per-phase wall time, filesystem calls by type and peak memory for any tool run with --profile
+"""
+
+import atexit
+import builtins
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import IO, Dict, List, Optional, Tuple
+
+from cli_options import optional_value
+
+# Phase names the tools report under, in table order
+SCAN = "scan"
+STRUCTURE = "structure"
+OPERATIONS = "operations"
+NAMING = "naming"
+PROPERTIES = "property comparison"
+CONTENT = "content scan"
+WRITES = "writes"
+BACKUP = "backup"
+OTHER = "other"
+
+# Call kind of DirEntry.stat(follow_symlinks=False), for count_calls()
+LSTAT = "lstat"
+
+
+class FsCallCounter:
+    """Counts filesystem calls made through os/builtins while active, by type
+
+    DirEntry.stat() runs inside the C scandir iterator, out of the wrappers' sight, and costs one lstat per
+    entry on Linux; callers report those themselves with count_calls(LSTAT, n). DirEntry.is_dir() and
+    inode() come from the directory listing and cost no call.
+    """
+    PATCHES = (
+        ("stat", os, "stat"),
+        ("lstat", os, "lstat"),
+        ("scandir", os, "scandir"),
+        ("listdir", os, "listdir"),
+        ("open", os, "open"),
+        ("mkdir", os, "mkdir"),
+        ("rmdir", os, "rmdir"),
+        ("unlink", os, "unlink"),
+        ("rename", os, "rename"),
+        ("replace", os, "replace"),
+        ("link", os, "link"),
+    )
+
+    def __init__(self, current_phase=None):
+        """current_phase, if given, is called on every counted call to also count it under a phase"""
+        self.counts: Dict[str, int] = {}
+        self.by_phase: Dict[Tuple[str, str], int] = {}
+        self._current_phase = current_phase
+        self._lock = threading.Lock()
+        self._saved = []
+
+    def _count(self, kind: str, n: int = 1):
+        with self._lock:
+            self.counts[kind] = self.counts.get(kind, 0) + n
+            if self._current_phase is not None:
+                key = (self._current_phase(), kind)
+                self.by_phase[key] = self.by_phase.get(key, 0) + n
+
+    def _wrap(self, kind, func):
+        count = self._count
+
+        def wrapper(*args, **kwargs):
+            count(kind)
+            return func(*args, **kwargs)
+        return wrapper
+
+    def _wrap_open(self, func):
+        count = self._count
+
+        def wrapper(file, mode="r", *args, **kwargs):
+            count("write" if any(c in mode for c in "wxa+") else "open")
+            return func(file, mode, *args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        for kind, module, name in self.PATCHES:
+            original = getattr(module, name)
+            self._saved.append((module, name, original))
+            setattr(module, name, self._wrap(kind, original))
+        for module in (builtins, io):
+            original = module.open
+            self._saved.append((module, "open", original))
+            module.open = self._wrap_open(original)
+        return self
+
+    def __exit__(self, *exc):
+        for module, name, original in reversed(self._saved):
+            setattr(module, name, original)
+        self._saved = []
+
+
+class Profiler:
+    """Collects phase timings, filesystem calls and peak memory between start() and stop()
+
+    Phase times are exclusive: time spent in a nested phase is counted only there. With --jobs the
+    phases run on worker threads, so their times are summed across threads and can exceed the wall time.
+    """
+
+    def __init__(self, trace_memory: bool = True, cprofile: bool = False):
+        self.trace_memory = trace_memory
+        self.phases: Dict[str, List[float]] = {}  # name -> [seconds, entries]
+        self.counter = FsCallCounter(self.current_phase)
+        self.wall = 0.0
+        self.peak_memory: Optional[int] = None
+        self.retained_memory: Optional[int] = None
+        self.stats = None
+        self._cprofile = None
+        if cprofile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._start = None
+
+    def _stack(self) -> List[list]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current_phase(self) -> str:
+        stack = self._stack()
+        return stack[-1][0] if stack else OTHER
+
+    @contextlib.contextmanager
+    def phase(self, name: str, timed: bool = True):
+        """Attribute the block's time and filesystem calls to name
+
+        timed=False only attributes the calls: for pool workers of a phase the calling thread already times.
+        """
+        stack = self._stack()
+        if stack and stack[-1][0] == name:
+            yield  # already inside this phase (e.g. a per-file step of a timed batch)
+            return
+        frame = [name, time.perf_counter(), 0.0]  # name, start, time spent in nested phases
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            if not timed:
+                return
+            elapsed = time.perf_counter() - frame[1]
+            if stack:
+                stack[-1][2] += elapsed
+            with self._lock:
+                totals = self.phases.setdefault(name, [0.0, 0])
+                totals[0] += elapsed - frame[2]
+                totals[1] += 1
+
+    def start(self):
+        """Begin collecting; phase() blocks anywhere in the process now report to this profiler"""
+        global _active
+        _active = self
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.counter.__enter__()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        self._start = time.perf_counter()
+        return self
+
+    def stop(self):
+        global _active
+        if self._start is None:
+            return
+        self.wall = time.perf_counter() - self._start
+        self._start = None
+        if _active is self:
+            _active = None
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            import pstats
+            self.stats = pstats.Stats(self._cprofile, stream=sys.stderr)
+        self.counter.__exit__(None, None, None)
+        if self.trace_memory and tracemalloc.is_tracing():
+            self.retained_memory, self.peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def report(self) -> Dict:
+        """Timings and counts as plain data (seconds, per-phase breakdown, fs calls, memory)"""
+        attributed = sum(seconds for seconds, _ in self.phases.values())
+        phases = {name: {"seconds": round(seconds, 6), "entries": entries,
+                         "fs_calls": self._phase_calls(name)}
+                  for name, (seconds, entries) in self.phases.items()}
+        other_calls = self._phase_calls(OTHER)
+        if OTHER not in phases and (self.wall > attributed or other_calls):
+            phases[OTHER] = {"seconds": round(max(0.0, self.wall - attributed), 6), "entries": 0,
+                             "fs_calls": other_calls}
+        result = {
+            "seconds": round(self.wall, 6),
+            "phases": phases,
+            "fs_calls": dict(sorted(self.counter.counts.items())),
+        }
+        if self.peak_memory is not None:
+            result["alloc_peak_bytes"] = self.peak_memory
+            result["alloc_retained_bytes"] = self.retained_memory
+        return result
+
+    def _phase_calls(self, name: str) -> Dict[str, int]:
+        return dict(sorted((kind, n) for (phase, kind), n in self.counter.by_phase.items() if phase == name))
+
+    def format_report(self) -> str:
+        report = self.report()
+        kinds = sorted(report["fs_calls"])
+        lines = [f"{'phase':<20} {'ms':>10} {'share':>6} {'entries':>8}  " + "".join(f"{k:>9}" for k in kinds)]
+        wall = report["seconds"] or 1.0
+        for name, data in sorted(report["phases"].items(), key=lambda item: -item[1]["seconds"]):
+            calls = data["fs_calls"]
+            lines.append(f"{name:<20} {data['seconds'] * 1000:10.1f} {data['seconds'] / wall:6.0%} "
+                         f"{data['entries']:8d}  " + "".join(f"{calls.get(k, 0):9d}" for k in kinds))
+        lines.append(f"{'total (wall)':<20} {report['seconds'] * 1000:10.1f} {'':>6} {'':>8}  "
+                     + "".join(f"{report['fs_calls'][k]:9d}" for k in kinds))
+        lines.append(f"Filesystem calls: {sum(report['fs_calls'].values())}")
+        if self.peak_memory is not None:
+            lines.append(f"Peak traced memory: {self.peak_memory / 1024:.1f} KiB "
+                         f"({self.retained_memory / 1024:.1f} KiB retained)")
+        return "\n".join(lines)
+
+
+# The running Profiler, if any (--profile or a benchmark); phase() is a no-op otherwise
+_active: Optional[Profiler] = None
+_NULL = contextlib.nullcontext()
+
+
+def phase(name: str, timed: bool = True):
+    """Context manager timing a block under name while profiling (a shared no-op otherwise)"""
+    profiler = _active
+    return _NULL if profiler is None else profiler.phase(name, timed)
+
+
+def count_calls(kind: str, n: int = 1):
+    """Count n filesystem calls made where FsCallCounter can't see them (DirEntry.stat()) while profiling"""
+    profiler = _active
+    if profiler is not None and n:
+        profiler.counter._count(kind, n)
+
+
+def profile_option(argv: List[str], stream: Optional[IO[str]] = None) -> Optional[Profiler]:
+    """Start profiling for --profile [FILE]: the summary table goes to stderr at exit, and with FILE a
+    cProfile dump (load with `python -m pstats FILE`) is written there too. None without the flag."""
+    target = optional_value(argv, "--profile")
+    if target is None:
+        return None
+    profiler = Profiler(cprofile=target != "-").start()
+
+    def finish():
+        profiler.stop()
+        out = stream or sys.stderr
+        print("\n=== Profile ===", file=out)
+        print(profiler.format_report(), file=out)
+        if profiler.stats is not None:
+            profiler.stats.dump_stats(target)
+            profiler.stats.stream = out
+            print(f"\ncProfile stats written to {target}; top functions by own time:", file=out)
+            profiler.stats.sort_stats("tottime").print_stats(10)
+
+    atexit.register(finish)
+    return profiler
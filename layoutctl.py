@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+layoutctl: One Entry Point for the Pattern Tools
+Runs scan, validate, fix, migrate, cleanup and scaffold as steps of one process that share a single
+workspace snapshot, so a chained run crawls the tree once; each step imports its tool only when it runs
+"""
+
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from cli_options import DEFAULT_WORKSPACE, jobs_option, option_value
+
+SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
+
+USAGE = """Usage: layoutctl.py STEP [STEP...] [options]
+
+Steps run in the order given and share one in-memory workspace snapshot:
+{steps}
+
+Options:
+  --jobs N, -j N          worker threads for crawling, validation and writes (0/auto: one per CPU)
+  --dry-run               fix, types and cleanup only report what they would change
+  --no-cache              validate without the on-disk validation cache
+  --backup MODE           cleanup backup mode: snapshot (default), archive or move
+  --backup-store DIR      where cleanup backups go (default .pattern_cache/backups)
+  --archive-backups       cleanup also moves existing *.backup dirs into the backup store
+  --dedup[=MODE]          scaffold links placeholder files to shared blobs (hardlink, reflink, copy)
+  --refresh               scaffold also rewrites outdated placeholder files, only where their bytes differ
+  --journal               scaffold journals its writes, rolling back an interrupted earlier run first
+  --profile [FILE]        print a timing/fs-call profile at exit; with FILE also dump cProfile stats
+
+Workspace: {workspace} (set LAYOUT_WORKSPACE to change)
+
+Example: layoutctl.py fix scaffold validate --jobs 8"""
+
+# Options that take a separate value (--jobs 8); everything else is a flag or uses NAME=VALUE
+VALUED_OPTIONS = {"--jobs", "-j", "--backup", "--backup-store"}
+
+
+class Session:
+    """State shared by the steps of one run: the workspace snapshot and the tools built on it"""
+
+    def __init__(self, argv: List[str], base_path: str = DEFAULT_WORKSPACE):
+        self.argv = argv
+        self.base_path = base_path
+        self.jobs = jobs_option(argv)
+        self.dry_run = "--dry-run" in argv
+        self._snapshot = None
+        self._enforcer = None
+
+    @property
+    def snapshot(self):
+        """The workspace index, crawled on first use; every step keeps it in sync with its writes"""
+        if self._snapshot is None:
+            from workspace_snapshot import WorkspaceSnapshot
+            self._snapshot = WorkspaceSnapshot(self.base_path, jobs=self.jobs)
+        return self._snapshot
+
+    @property
+    def enforcer(self):
+        if self._enforcer is None:
+            from enforce_pattern import ComprehensivePatternEnforcer
+            self._enforcer = ComprehensivePatternEnforcer(self.base_path, snapshot=self.snapshot)
+        return self._enforcer
+
+
+# Steps: each returns True on success
+
+def scan(session: Session) -> bool:
+    print(f"Indexed {session.snapshot.summary()}\n")
+    session.enforcer.scan_workspace()
+    return True
+
+
+def validate(session: Session) -> bool:
+    from validate_pattern import PatternValidator, make_cache
+    cache = None if "--no-cache" in session.argv else make_cache(session.base_path)
+    validator = PatternValidator(session.base_path, snapshot=session.snapshot, cache=cache, jobs=session.jobs)
+    valid = validator.validate_all()
+    if cache is not None:
+        print(f"\nCache: {cache.hits} hit(s), {cache.misses} miss(es)")
+    return valid
+
+
+def fix(session: Session) -> bool:
+    from fix_pattern import PatternFixer
+    fixer = PatternFixer(session.base_path, snapshot=session.snapshot, jobs=session.jobs)
+    return fixer.fix_all_models(dry_run=session.dry_run)
+
+
+def migrate(session: Session) -> bool:
+    session.enforcer.create_migration_plan()
+    return True
+
+
+def types(session: Session) -> bool:
+    from type_enums import TypeEnumGenerator
+    counts = TypeEnumGenerator(session.base_path, snapshot=session.snapshot).run(dry_run=session.dry_run)
+    return not counts.get("drifted")
+
+
+def cleanup(session: Session) -> bool:
+    from backup_engine import MODES as BACKUP_MODES
+    backup_mode = option_value(session.argv, "--backup", "snapshot")
+    if backup_mode not in BACKUP_MODES:
+        print(f"✗ Unknown --backup mode '{backup_mode}' (choose from {', '.join(BACKUP_MODES)})")
+        return False
+    store = option_value(session.argv, "--backup-store")
+    store = store and Path(store)
+    session.enforcer.execute_cleanup(dry_run=session.dry_run, backup_mode=backup_mode, store=store)
+    if "--archive-backups" in session.argv:
+        session.enforcer.archive_legacy_backups(dry_run=session.dry_run, backup_mode=backup_mode, store=store)
+    return True
+
+
+def scaffold(session: Session) -> bool:
+    """The scripts/ fixers in pipeline order: unified and sub-models, workspace dirs, components, sub-models"""
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+    import classify_and_validate_components
+    import populate_submodels
+    import validate_and_fix_all_models
+    import validate_and_fix_entire_workspace
+    from placeholder_store import store_option
+    from write_planner import WritePlan, default_journal_path
+
+    journal = None
+    if "--journal" in session.argv:
+        journal = default_journal_path(session.base_path)
+        undone = WritePlan.rollback_journal(journal)
+        if undone:
+            print(f"Rolled back {undone} entries left by an interrupted run")
+            session.snapshot.scan()
+    store = store_option(session.base_path, session.argv)
+    refresh = "--refresh" in session.argv
+    snapshot = session.snapshot
+
+    ok = validate_and_fix_all_models.validate_and_fix(snapshot, journal=journal, store=store, refresh=refresh)
+    ok &= validate_and_fix_entire_workspace.validate_and_fix_workspace(snapshot, jobs=session.jobs, journal=journal,
+                                                                       store=store, refresh=refresh)
+    ok &= classify_and_validate_components.classify_and_validate(snapshot, store=store, refresh=refresh)
+    ok &= populate_submodels.populate_submodels(snapshot, store=store)
+    return ok
+
+
+STEPS: Dict[str, Tuple[Callable[[Session], bool], str]] = {
+    "scan": (scan, "index the workspace and show its structure analysis"),
+    "validate": (validate, "check every model against the pattern and compare properties"),
+    "fix": (fix, "add missing core properties to every model"),
+    "migrate": (migrate, "show the migration plan for old plural sub-model directories"),
+    "types": (types, "generate each unified model's type enum from its plural sub-model directories"),
+    "cleanup": (cleanup, "back up and remove migrated old directories"),
+    "scaffold": (scaffold, "create missing canonical files in models, components and widow areas"),
+}
+
+
+def usage() -> str:
+    steps = "\n".join(f"  {name:<10} {summary}" for name, (_, summary) in STEPS.items())
+    return USAGE.format(steps=steps, workspace=DEFAULT_WORKSPACE)
+
+
+def parse_steps(argv: List[str]) -> Tuple[List[str], List[str], Optional[str]]:
+    """(steps in order, unknown words, --profile target or None) from argv
+
+    A word right after --profile is its FILE unless it names a step.
+    """
+    steps, unknown = [], []
+    profile = None
+    args = iter(argv[1:])
+    for arg in args:
+        if arg in VALUED_OPTIONS:
+            next(args, None)
+        elif arg == "--profile":
+            profile = "-"
+            following = next(args, None)
+            if following is None:
+                continue
+            if following in STEPS:
+                steps.append(following)
+            elif following in VALUED_OPTIONS:
+                next(args, None)
+            elif not following.startswith("-"):
+                profile = following
+        elif arg.startswith("--profile="):
+            profile = arg[len("--profile="):]
+        elif arg.startswith("-"):
+            continue
+        elif arg in STEPS:
+            steps.append(arg)
+        else:
+            unknown.append(arg)
+    return steps, unknown, profile
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) == 1 or "--help" in argv or "-h" in argv:
+        print(usage())
+        return 0 if len(argv) > 1 else 2
+
+    steps, unknown, profile = parse_steps(argv)
+    if unknown or not steps:
+        if unknown:
+            print(f"✗ Unknown step(s): {', '.join(unknown)}", file=sys.stderr)
+        print(usage(), file=sys.stderr)
+        return 2
+
+    if profile is not None:
+        from instrumentation import profile_option
+        profile_option(["--profile", profile])
+
+    session = Session(argv)
+    failed = []
+    for name in steps:
+        print(f"\n{'=' * 50}\nlayoutctl {name}\n{'=' * 50}")
+        if not STEPS[name][0](session):
+            failed.append(name)
+
+    if len(steps) > 1:
+        print(f"\n{'=' * 50}")
+        print(f"Steps: {', '.join(steps)}" + (f" (failed: {', '.join(failed)})" if failed else " (all ok)"))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Merkle Tree Hashes and Structural Diff
+Hashes every file and directory of a tree bottom-up (a directory's hash covers its children's names, types and
+hashes), persists file hashes under the workspace's .pattern_cache so unchanged files are never re-read, and
+diffs two trees by descending only into subtrees whose hashes differ
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from cli_options import DEFAULT_WORKSPACE
+from instrumentation import CONTENT, phase
+from validation_cache import CACHE_DIR
+from workspace_snapshot import WorkspaceSnapshot
+
+STORE_NAME = "merkle.json"
+FOREIGN_STORE_DIR = "merkle"  # stores of trees outside the workspace, one per resolved path
+STORE_VERSION = 1
+
+ADDED = "A"
+DELETED = "D"
+MODIFIED = "M"
+TYPE_CHANGED = "T"
+
+_CHUNK = 1 << 16
+
+
+class Change(NamedTuple):
+    status: str   # ADDED, DELETED, MODIFIED or TYPE_CHANGED
+    path: str     # relative to the compared roots, "/"-separated
+    is_dir: bool  # a whole directory added or deleted
+
+
+class MerkleTree:
+    """Hashes of every node of a snapshot, with file hashes kept across runs (by default in <root>/.pattern_cache)
+
+    A stored file hash is reused while the file's size, mtime and inode are unchanged, so a refresh costs
+    one scandir walk plus reading only the files that changed. Directory hashes are recombined from their
+    children on every run: that is only hashing names and digests, and nothing cheaper proves a subtree unchanged.
+    """
+
+    def __init__(self, root: str = DEFAULT_WORKSPACE, snapshot: Optional[WorkspaceSnapshot] = None,
+                 store_path: Optional[Path] = None):
+        self.root = Path(root)
+        self.snapshot = snapshot or WorkspaceSnapshot(str(self.root))
+        self.store_path = store_path or self.root / CACHE_DIR / STORE_NAME
+        self.files: Dict[str, List] = {}  # rel -> [size, mtime_ns, inode, hash]
+        self.hashes: Dict[str, str] = {}  # key -> hash of every node computed for this snapshot generation
+        self.files_read = 0
+        self.dirty = False
+        self._generation = self.snapshot.generation
+        self.load()
+
+    def load(self):
+        """Read the stored hashes; a missing, corrupt or outdated store just starts empty"""
+        try:
+            data = json.loads(self.store_path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") == STORE_VERSION:
+            self.files = data.get("files", {})
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.store_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({"version": STORE_VERSION, "files": self.files},
+                                           separators=(",", ":"), sort_keys=True))
+            os.replace(tmp_path, self.store_path)
+            self.dirty = False
+        except OSError as e:
+            print(f"⚠ Could not write Merkle store: {e}")
+
+    def rel(self, key: str) -> str:
+        return Path(key).relative_to(self.root).as_posix()
+
+    def node_hash(self, path) -> Optional[str]:
+        """Hash of the file, link or directory at path (None if the snapshot doesn't have it)"""
+        if self.snapshot.generation != self._generation:
+            self.hashes = {}
+            self._generation = self.snapshot.generation
+        key = str(path)
+        known = self.hashes.get(key)
+        if known is not None:
+            return known
+        entry = self.snapshot.entry(key)
+        if entry is None:
+            return None
+        if entry.d_type == "dir":
+            digest = hashlib.sha1(b"dir\n")
+            for name in self.snapshot.list_dir(key):
+                child = os.path.join(key, name)
+                digest.update(f"{name}\0{self.snapshot.entry(child).d_type}\0{self.node_hash(child)}\n".encode())
+            result = digest.hexdigest()
+        elif entry.d_type == "link":
+            try:
+                result = hashlib.sha1(b"link\n" + os.fsencode(os.readlink(key))).hexdigest()
+            except OSError:
+                result = hashlib.sha1(b"link\n").hexdigest()
+        else:
+            result = self._file_hash(key, entry)
+        self.hashes[key] = result
+        return result
+
+    def _file_hash(self, key: str, entry) -> str:
+        rel = self.rel(key)
+        signature = [entry.size, entry.mtime_ns, entry.inode]
+        stored = self.files.get(rel)
+        if stored is not None and stored[:3] == signature and entry.mtime_ns:
+            return stored[3]
+        digest = hashlib.sha1(b"file\n")
+        with phase(CONTENT):
+            try:
+                with open(key, "rb") as f:
+                    for chunk in iter(lambda: f.read(_CHUNK), b""):
+                        digest.update(chunk)
+            except OSError:
+                digest.update(b"<unreadable>")
+        self.files_read += 1
+        result = digest.hexdigest()
+        # Files recorded by a writer have no mtime in the snapshot; hash them but don't trust the signature
+        if entry.mtime_ns:
+            self.files[rel] = signature + [result]
+            self.dirty = True
+        return result
+
+    def prune(self):
+        """Forget stored hashes of files no longer in the snapshot"""
+        base = str(self.root)
+        for rel in [rel for rel in self.files if not self.snapshot.exists(os.path.join(base, rel))]:
+            del self.files[rel]
+            self.dirty = True
+
+
+def diff(a: MerkleTree, a_path, b: MerkleTree, b_path) -> Tuple[List[Change], int]:
+    """Changes that turn the tree at a_path into the one at b_path, and the number of directory pairs listed
+
+    Equal hashes prune a whole subtree, so the directories listed are only those on paths to a change.
+    """
+    changes: List[Change] = []
+    a_key, b_key = str(a_path), str(b_path)
+    if a.node_hash(a_key) == b.node_hash(b_key):
+        return changes, 0
+    visited = 0
+    stack = [("", a_key, b_key)]
+    while stack:
+        rel, a_dir, b_dir = stack.pop()
+        visited += 1
+        a_names = a.snapshot.list_dir(a_dir)
+        b_names = b.snapshot.list_dir(b_dir)
+        pending = []
+        for name in sorted(set(a_names) | set(b_names)):
+            path = f"{rel}{name}"
+            a_child, b_child = os.path.join(a_dir, name), os.path.join(b_dir, name)
+            a_entry, b_entry = a.snapshot.entry(a_child), b.snapshot.entry(b_child)
+            if b_entry is None:
+                changes.append(Change(DELETED, path, a_entry.d_type == "dir"))
+            elif a_entry is None:
+                changes.append(Change(ADDED, path, b_entry.d_type == "dir"))
+            elif a_entry.d_type != b_entry.d_type:
+                changes.append(Change(TYPE_CHANGED, path, False))
+            elif a.node_hash(a_child) != b.node_hash(b_child):
+                if a_entry.d_type == "dir":
+                    pending.append((path + "/", a_child, b_child))
+                else:
+                    changes.append(Change(MODIFIED, path, False))
+        stack.extend(reversed(pending))
+    changes.sort(key=lambda change: change.path)
+    return changes, visited
+
+
+def backup_pairs(snapshot: WorkspaceSnapshot) -> List[Tuple[Path, Path]]:
+    """(sub-model, unified model) for every sub-model of a plural directory: models/BarModels.backup/X -> BarModel"""
+    models = snapshot.base_path / "models"
+    pairs = []
+    for plural in snapshot.subdirs(models):
+        stem = plural[:-len(".backup")] if plural.endswith(".backup") else plural
+        if not stem.endswith("Models"):
+            continue
+        unified = models / stem[:-1]
+        if not snapshot.is_dir(unified):
+            continue
+        for name in snapshot.subdirs(models / plural):
+            pairs.append((models / plural / name, unified))
+    return pairs
+
+
+def format_change(change: Change, a: MerkleTree, a_path, b: MerkleTree, b_path) -> str:
+    """Name-status line of a change; an added or deleted directory is one line with its file count"""
+    if not change.is_dir:
+        return f"{change.status}  {change.path}"
+    tree, root = (a, a_path) if change.status == DELETED else (b, b_path)
+    count = sum(1 for _ in tree.snapshot.walk_files(os.path.join(str(root), change.path)))
+    return f"{change.status}  {change.path}/  ({count} file(s))"
+
+
+def counts(changes: List[Change]) -> str:
+    tally = {status: 0 for status in (ADDED, DELETED, MODIFIED, TYPE_CHANGED)}
+    for change in changes:
+        tally[change.status] += 1
+    return (f"{tally[ADDED]} added, {tally[DELETED]} deleted, {tally[MODIFIED]} modified"
+            + (f", {tally[TYPE_CHANGED]} type changed" if tally[TYPE_CHANGED] else ""))
+
+
+def foreign_store_path(workspace: MerkleTree, root: str) -> Path:
+    """Store for a tree outside the workspace: kept in the workspace's cache, never written into that tree"""
+    return (workspace.store_path.parent / FOREIGN_STORE_DIR
+            / f"{hashlib.sha1(os.fsencode(root)).hexdigest()[:16]}.json")
+
+
+def tree_for(path: Path, trees: Dict[str, MerkleTree], workspace: MerkleTree) -> Tuple[MerkleTree, Path]:
+    """The workspace's tree for a path inside it; otherwise one tree per outside root, whose store lives in the
+    workspace's cache keyed by the resolved path (comparing against another checkout must not write to it)"""
+    path = path.resolve()
+    try:
+        path.relative_to(workspace.root.resolve())
+        return workspace, workspace.root / path.relative_to(workspace.root.resolve())
+    except ValueError:
+        pass
+    key = str(path)
+    if key not in trees:
+        trees[key] = MerkleTree(key, store_path=foreign_store_path(workspace, key))
+    return trees[key], trees[key].root
+
+
+USAGE = """Usage: merkle_tree.py hash [PATH...]
+       merkle_tree.py diff A B [--stat]
+       merkle_tree.py diff --backups [--stat]
+
+hash prints the Merkle hash of each path (default: the workspace), refreshing the store in .pattern_cache.
+diff lists what differs between two trees, descending only into subtrees whose hashes differ; paths inside
+the workspace share its store, others (another checkout) get their own, also under the workspace's
+.pattern_cache, so nothing is written to them. --backups diffs every
+models/*Models.backup sub-model against its unified model."""
+
+
+if __name__ == "__main__":
+    import sys
+    from instrumentation import profile_option
+
+    profile_option(sys.argv)
+    args = [a for i, a in enumerate(sys.argv[1:], 1) if not a.startswith("--") and sys.argv[i - 1] != "--profile"]
+    command = args[0] if args else ""
+    workspace = MerkleTree(DEFAULT_WORKSPACE)
+    trees: Dict[str, MerkleTree] = {}
+
+    if command == "hash":
+        for arg in args[1:] or [DEFAULT_WORKSPACE]:
+            tree, path = tree_for(Path(arg), trees, workspace)
+            digest = tree.node_hash(path)
+            print(f"{digest or '<missing>'}  {arg}")
+    elif command == "diff" and (len(args) == 3 or "--backups" in sys.argv):
+        backups = "--backups" in sys.argv
+        if backups:
+            pairs = [(workspace, sub, workspace, unified) for sub, unified in backup_pairs(workspace.snapshot)]
+        else:
+            (a, a_path), (b, b_path) = (tree_for(Path(arg), trees, workspace) for arg in args[1:3])
+            pairs = [(a, a_path, b, b_path)]
+        missing = [str(path) for a, a_path, b, b_path in pairs
+                   for tree, path in ((a, a_path), (b, b_path)) if tree.node_hash(path) is None]
+        if missing:
+            print(f"✗ Not found: {', '.join(sorted(set(missing)))}")
+            exit(2)
+        total = 0
+        for a, a_path, b, b_path in pairs:
+            changes, visited = diff(a, a_path, b, b_path)
+            total += len(changes)
+            label = f"{a.rel(str(a_path))} → {b.rel(str(b_path))}" if backups else f"{a_path} → {b_path}"
+            summary = f"{counts(changes) if changes else 'identical'} ({visited} director(ies) listed)"
+            if "--stat" in sys.argv or (backups and not changes):
+                print(f"{label}: {summary}")
+                continue
+            if backups:
+                print(f"\n{label}")
+            for change in changes:
+                print(format_change(change, a, a_path, b, b_path))
+            print(f"{'' if backups else chr(10)}{summary}")
+        print(f"\nFiles read for hashing: {sum(t.files_read for t in [workspace, *trees.values()])}",
+              file=sys.stderr)
+    else:
+        print(USAGE)
+        exit(2)
+    for tree in [workspace, *trees.values()]:
+        tree.prune()
+        tree.save()
+    if command == "diff":
+        exit(1 if total else 0)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Canonical Model Pattern Schema
+Single declarative definition of the layout pattern, compiled once into frozen path sets,
+a path trie and precompiled name matchers that every validator, fixer and script shares
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Pattern, Set, Tuple
+
+from workspace_snapshot import WorkspaceSnapshot
+
+# The pattern, as documented in PATTERN_DEFINITION.md. Everything else is derived from this.
+SCHEMA = {
+    "subdirectories": ["properties", "attributes", "operations", "types", "strings", "collections"],
+    "properties_subdirs": ["layout", "style", "content", "behavior"],
+    "operations": ["Create.swift", "Read.swift", "Update.swift", "Delete.swift", "Toggle.swift", "Validate.swift"],
+    # {prefix} is the model name without its "Model" suffix
+    "type_file": "types/{prefix}Type.swift",
+
+    # Core properties ALL models should have, with their defaults
+    "core_properties": {
+        "layout": {
+            "width": "auto",
+            "height": "auto",
+            "padding": "8",
+            "spacing": "4",
+            "position": "relative"
+        },
+        "style": {
+            "backgroundColor": "#FFFFFF",
+            "borderRadius": "4",
+            "borderWidth": "1",
+            "opacity": "1.0",
+            "shadowOffset": "0,2",
+            "shadowOpacity": "0.1"
+        },
+        "behavior": {
+            "isVisible": "true",
+            "isEnabled": "true",
+            "isInteractive": "true"
+        }
+    },
+
+    # Optional properties that are model-specific (keep if exists, don't force)
+    "optional_properties": {
+        "style": ["selectionColor"],
+        "content": ["body", "data", "icon", "items", "label", "subtitle", "text", "title", "value"],
+        "behavior": [
+            "allowsMultipleSelection", "autoRefresh", "canAutoHide", "canClose",
+            "canDetach", "canReorder", "canResize", "dismissOnSelect",
+            "isAnimated", "isSelectable", "isSelected", "showsFeedback", "showsHover"
+        ]
+    },
+
+    # Files scaffolded into every model/component by the scripts/ fixers
+    "scaffold": [
+        "attributes/Alignment.swift",
+        "attributes/Position.swift",
+        "attributes/State.swift",
+        "attributes/Visibility.swift",
+        "collections/ActionsSet.swift",
+        "collections/MetadataDictionary.swift",
+        "collections/ModelArray.swift",
+        "operations/Create.swift",
+        "operations/Read.swift",
+        "operations/Update.swift",
+        "operations/Delete.swift",
+        "operations/Toggle.swift",
+        "operations/Validate.swift",
+        "properties/layout/width",
+        "properties/layout/height",
+        "properties/layout/padding",
+        "properties/layout/spacing",
+        "properties/layout/position",
+        "properties/style/backgroundColor",
+        "properties/style/borderRadius",
+        "properties/style/borderWidth",
+        "properties/style/opacity",
+        "properties/style/shadowOffset",
+        "properties/style/shadowOpacity",
+        "properties/content/title",
+        "properties/content/body",
+        "properties/content/icon",
+        "properties/content/value",
+        "properties/behavior/isVisible",
+        "properties/behavior/isEnabled",
+        "properties/behavior/isInteractive",
+        "strings/DefaultTitle.swift",
+        "strings/PlaceholderText.swift",
+        "strings/ErrorMessages.swift",
+        "types/ModelType.swift",
+        "types/ModelAction.swift",
+        "types/ModelStyle.swift"
+    ],
+    "default_content": {
+        ".swift": "// ...\n",
+        "": "default\n"
+    },
+    # Bodies earlier scaffold versions wrote; --refresh may replace a file holding exactly one of these
+    "retired_content": [
+        "// ...",
+        "default",
+    ],
+
+    # File naming conventions per directory (globs; {prefix} as above)
+    "naming": {
+        "attributes": ["[A-Z]*.swift"],
+        "operations": ["[A-Z]*.swift"],
+        "types": ["{prefix}*.swift", "Model*.swift"],
+        "strings": ["[A-Z]*.swift"],
+        "collections": ["[A-Z]*.swift"],
+        "properties/*": ["[a-z]*"],
+    },
+}
+
+# Plain re-exports for the scripts that used to carry their own copies
+CANONICAL_STRUCTURE: List[str] = SCHEMA["scaffold"]
+DEFAULT_CONTENT: Dict[str, str] = SCHEMA["default_content"]
+RETIRED_CONTENT: List[str] = SCHEMA["retired_content"]
+
+
+def schema_fingerprint(schema: dict = SCHEMA) -> str:
+    return hashlib.sha1(json.dumps(schema, sort_keys=True).encode()).hexdigest()
+
+
+class CompiledSchema:
+    """Frozen, query-ready form of SCHEMA"""
+
+    def __init__(self, schema: dict = SCHEMA):
+        self.fingerprint = schema_fingerprint(schema)
+        self.subdirectories: Tuple[str, ...] = tuple(schema["subdirectories"])
+        self.properties_subdirs: Tuple[str, ...] = tuple(schema["properties_subdirs"])
+        self.operations: Tuple[str, ...] = tuple(schema["operations"])
+        self.type_file: str = schema["type_file"]
+        self.core_properties: Dict[str, Dict[str, str]] = schema["core_properties"]
+        self.optional_properties: Dict[str, List[str]] = schema["optional_properties"]
+        self.scaffold: Tuple[str, ...] = tuple(schema["scaffold"])
+        self.default_content: Dict[str, str] = schema["default_content"]
+
+        # Frozen path sets: a model is checked with one set difference per rule group
+        self.required_dirs: FrozenSet[str] = frozenset(
+            list(self.subdirectories) + [f"properties/{sub}" for sub in self.properties_subdirs])
+        self.required_operations: FrozenSet[str] = frozenset(f"operations/{op}" for op in self.operations)
+        self.scaffold_paths: FrozenSet[str] = frozenset(self.scaffold)
+        self.scaffold_dirs: FrozenSet[str] = frozenset(
+            "/".join(p.split("/")[:i]) for p in self.scaffold for i in range(1, p.count("/") + 1))
+
+        # Path trie over every path the schema knows: segment -> child node
+        self.trie: Dict[str, dict] = {}
+        for path in sorted(self.required_dirs | self.scaffold_paths | self.required_operations):
+            node = self.trie
+            for segment in path.split("/"):
+                node = node.setdefault(segment, {})
+
+        # Name matchers: directory glob -> list of (regex source, has_prefix)
+        self.naming: List[Tuple[str, List[Tuple[str, bool]]]] = []
+        for directory, globs in schema["naming"].items():
+            compiled = []
+            for glob in globs:
+                has_prefix = "{prefix}" in glob
+                compiled.append((fnmatch.translate(glob.replace("{prefix}", "\x00")), has_prefix))
+            self.naming.append((directory, compiled))
+        self._matchers: Dict[str, List[Tuple[str, List[Pattern]]]] = {}
+
+    # Queries
+
+    def type_path(self, model: str) -> str:
+        return self.type_file.format(prefix=model.replace("Model", ""))
+
+    def content_for(self, relpath: str) -> str:
+        return self.default_content.get(Path(relpath).suffix, self.default_content[""])
+
+    def contains(self, relpath: str) -> bool:
+        """Whether relpath (file or directory) is part of the schema, via the trie"""
+        node = self.trie
+        for segment in relpath.split("/"):
+            node = node.get(segment)
+            if node is None:
+                return False
+        return True
+
+    def missing_scaffold(self, present: Set[str]) -> List[str]:
+        """Scaffold files absent from present, in schema order"""
+        missing = self.scaffold_paths - present
+        return [p for p in self.scaffold if p in missing] if missing else []
+
+    def matchers_for(self, model: str) -> List[Tuple[str, List[Pattern]]]:
+        """(directory glob, compiled name regexes) with {prefix} bound to this model, memoized"""
+        prefix = model.replace("Model", "")
+        matchers = self._matchers.get(prefix)
+        if matchers is None:
+            escaped = re.escape(prefix)
+            matchers = [(directory, [re.compile(src.replace("\x00", escaped) if has_prefix else src)
+                                     for src, has_prefix in compiled])
+                        for directory, compiled in self.naming]
+            self._matchers[prefix] = matchers
+        return matchers
+
+    def naming_violations(self, model: str, files: Set[str]) -> List[str]:
+        """Relative paths of files whose name breaks the naming convention of their directory"""
+        matchers = self.matchers_for(model)
+        violations = []
+        for relpath in sorted(files):
+            parent, _, name = relpath.rpartition("/")
+            for directory, regexes in matchers:
+                if fnmatch.fnmatchcase(parent, directory) and not any(r.match(name) for r in regexes):
+                    violations.append(relpath)
+                    break
+        return violations
+
+
+def relpaths(snapshot: WorkspaceSnapshot, root: Path) -> Tuple[Set[str], Set[str]]:
+    """(all relative paths, file relative paths) below root, from one walk of the snapshot
+
+    The paths are interned: every root of a workspace holds the same few hundred, so all their sets share them.
+    """
+    root_key = str(root)
+    cut = len(root_key) + 1
+    present, files = set(), set()
+    for key, entry in snapshot.walk(root):
+        if key == root_key:
+            continue
+        rel = sys.intern(key[cut:].replace(os.sep, "/"))
+        present.add(rel)
+        if not entry.is_dir:
+            files.add(rel)
+    return present, files
+
+
+_SCHEMA: Optional[CompiledSchema] = None
+
+
+def load_schema() -> CompiledSchema:
+    """The compiled schema, built on first use and shared for the rest of the process"""
+    global _SCHEMA
+    if _SCHEMA is None:
+        _SCHEMA = CompiledSchema()
+    return _SCHEMA
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Live Watch Mode for the Pattern Validator
+Indexes the workspace once, then re-validates only the model/component an inotify event touched
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from inotify_watch import InotifyWatcher
+from workspace_snapshot import SKIP_DIRS
+
+
+class PatternWatch:
+    def __init__(self, validator):
+        self.validator = validator
+        self.base_path = validator.base_path
+        self.snapshot = validator.snapshot
+        self.roots = [validator.models_path, self.base_path / "layout" / "components", self.base_path / "widow"]
+        self.results: Dict[str, List[str]] = {}
+        self.warnings: List[str] = []
+
+    def owner_of(self, path: str) -> Optional[str]:
+        """Model name or component key that owns path, or None if no validated root does"""
+        return self.validator.owner_of(path)
+
+    def validate_key(self, key: str) -> List[str]:
+        if "/" in key:
+            _, errors = self.validator.validate_component(key)
+        else:
+            _, errors = self.validator.validate_model(key)
+        return errors
+
+    def full_pass(self):
+        self.results = {}
+        for key in self.validator.get_models() + self.validator.get_components():
+            self.results[key] = self.validate_key(key)
+        self.warnings = self.validator.collect_property_warnings()
+
+    def refresh(self, keys: List[str]) -> List[str]:
+        """Rescan and re-validate the given roots; returns the report delta lines"""
+        lines = []
+        models_touched = False
+        for key in sorted(keys):
+            root = self.validator.model_dir(key)
+            self.snapshot.scan(root)
+            models_touched |= "/" not in key
+            before = self.results.get(key)
+            if not self.snapshot.is_dir(root):
+                # A root that was never a directory (e.g. a loose file) is not worth reporting
+                if before is not None:
+                    del self.results[key]
+                    lines.append(f"  - {key} removed")
+                continue
+            after = self.validate_key(key)
+            self.results[key] = after
+            if before is None:
+                lines.append(f"  + {key} added ({len(after)} error(s))")
+            for error in after:
+                if before is not None and error not in before:
+                    lines.append(f"  ✗ {error}")
+            for error in before or []:
+                if error not in after:
+                    lines.append(f"  ✓ fixed: {error}")
+
+        if models_touched:
+            warnings = self.validator.collect_property_warnings()
+            lines.extend(f"  ⚠ {w}" for w in warnings if w not in self.warnings)
+            lines.extend(f"  ✓ resolved: {w}" for w in self.warnings if w not in warnings)
+            self.warnings = warnings
+        return lines
+
+    def error_count(self) -> int:
+        return sum(len(errors) for errors in self.results.values())
+
+    def run(self):
+        start = time.perf_counter()
+        self.full_pass()
+        print(f"Watching {len(self.results)} models/components "
+              f"({self.error_count()} error(s), {len(self.warnings)} warning(s); "
+              f"indexed in {(time.perf_counter() - start) * 1000:.0f} ms). Ctrl-C to stop.")
+
+        with InotifyWatcher([r for r in self.roots if self.snapshot.is_dir(r)], skip_dirs=SKIP_DIRS) as watcher:
+            try:
+                while True:
+                    changed = watcher.read_events()
+                    start = time.perf_counter()
+                    if watcher.overflowed:
+                        # Events were lost; fall back to one full pass to resynchronise
+                        watcher.overflowed = False
+                        self.snapshot.scan()
+                        self.full_pass()
+                        print(f"[resync] {self.error_count()} error(s), {len(self.warnings)} warning(s)")
+                        continue
+                    keys = {self.owner_of(path) for path in changed} - {None}
+                    if not keys:
+                        continue
+                    lines = self.refresh(list(keys))
+                    elapsed = (time.perf_counter() - start) * 1000
+                    stamp = time.strftime("%H:%M:%S")
+                    print(f"[{stamp}] {', '.join(sorted(keys))} → {self.error_count()} error(s), "
+                          f"{len(self.warnings)} warning(s) ({elapsed:.1f} ms)")
+                    for line in lines:
+                        print(line)
+            except KeyboardInterrupt:
+                print("\nStopped watching.")
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Deduplicated Placeholder Storage
+Keeps one copy of each scaffold default body and materializes placeholders as copy-on-write clones of it
+(hardlinks only when asked for, and never for property files, which are edited in place)
+"""
+
+import errno
+import hashlib
+import os
+import stat
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from cli_options import DEFAULT_WORKSPACE
+from pattern_schema import DEFAULT_CONTENT
+from validation_cache import CACHE_DIR
+from workspace_snapshot import WorkspaceSnapshot
+
+BLOB_DIR = "blobs"
+FICLONE = 0x40049409  # _IOW(0x94, 9, int): share extents copy-on-write (btrfs, XFS, bcachefs)
+
+# "reflink" clones extents copy-on-write (own inode; a plain copy where unsupported, e.g. ext4); "hardlink"
+# shares one inode per body, so an in-place write to one file changes them all: it is never used below
+# properties/; "copy" writes files as before
+MODES = ("reflink", "hardlink", "copy")
+DEFAULT_MODE = "reflink"
+
+
+def is_property_path(key: str) -> bool:
+    """Whether key lies below a properties/ directory: a value edited in place, one component at a time"""
+    return "properties" in Path(key).parts[:-1]
+
+
+def _body_hash(content: bytes) -> str:
+    return hashlib.sha1(content).hexdigest()
+
+
+def reflink(src: str, dst: str):
+    """Create dst as a copy-on-write clone of src; raises OSError where the filesystem can't"""
+    import fcntl
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        except OSError:
+            os.close(dst_fd)
+            os.unlink(dst)
+            raise
+        os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+
+class PlaceholderStore:
+    def __init__(self, base_path: str = DEFAULT_WORKSPACE, mode: str = DEFAULT_MODE,
+                 bodies: Iterable[str] = DEFAULT_CONTENT.values()):
+        if mode not in MODES:
+            raise ValueError(f"unknown placeholder mode '{mode}' (choose from {', '.join(MODES)})")
+        self.base_path = Path(base_path)
+        self.blob_path = self.base_path / CACHE_DIR / BLOB_DIR
+        self.mode = mode
+        self.bodies = {body.encode() for body in bodies}
+        self.generation: Dict[bytes, int] = {}  # bumped when a blob hits the filesystem's link limit
+        self.methods: Dict[str, int] = {}       # how placeholders were materialized, for the report
+        self._reflink_ok = mode == "reflink"
+        self._blobs: Dict[Tuple[bytes, int], str] = {}
+        self._lock = threading.Lock()
+
+    def is_placeholder(self, content: bytes) -> bool:
+        return content in self.bodies
+
+    def blob_for(self, content: bytes) -> str:
+        """Path of the read-only blob holding content, created on first use"""
+        with self._lock:
+            generation = self.generation.get(content, 0)
+            key = self._blobs.get((content, generation))
+            if key is not None:
+                return key
+            key = str(self.blob_path / f"{_body_hash(content)}-{generation}")
+            if not os.path.exists(key):
+                self.blob_path.mkdir(parents=True, exist_ok=True)
+                tmp = f"{key}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(content)
+                # Read-only, so an in-place edit of one placeholder can't silently change all of its links;
+                # editors that save by rename still work
+                os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                os.replace(tmp, key)
+            self._blobs[(content, generation)] = key
+            return key
+
+    def materialize(self, content: bytes, dest: str) -> str:
+        """Create dest (which must not exist) holding content; returns the method used"""
+        method = "copy"
+        if self.mode != "copy" and self.is_placeholder(content):
+            method = self._link(content, dest, hardlink=self.mode == "hardlink" and not is_property_path(dest))
+        if method == "copy":
+            with open(dest, "xb") as f:
+                f.write(content)
+        with self._lock:
+            self.methods[method] = self.methods.get(method, 0) + 1
+        return method
+
+    def _link(self, content: bytes, dest: str, hardlink: bool) -> str:
+        """Clone (or, with hardlink, link) the blob to dest; "copy" if the caller must write it instead"""
+        blob = self.blob_for(content)
+        if self._reflink_ok and not hardlink:
+            try:
+                reflink(blob, dest)
+                return "reflink"
+            except OSError as e:
+                if e.errno == errno.EEXIST:
+                    raise
+                self._reflink_ok = False  # not supported here; don't retry for every file
+        if not hardlink:
+            return "copy"
+        try:
+            os.link(blob, dest)
+            return "hardlink"
+        except OSError as e:
+            if e.errno == errno.EMLINK:
+                # Link count limit reached (65000 on ext4): start a fresh blob for this body
+                with self._lock:
+                    if self._blobs.get((content, self.generation.get(content, 0))) == blob:
+                        self.generation[content] = self.generation.get(content, 0) + 1
+                return self._link(content, dest, hardlink)
+            if e.errno in (errno.EXDEV, errno.EPERM, errno.ENOTSUP):
+                return "copy"
+            raise
+
+    # Existing trees
+
+    def placeholders(self, snapshot: WorkspaceSnapshot) -> Iterable[Tuple[str, bytes]]:
+        """(path, body) of every file in the snapshot whose content is a default body"""
+        sizes = {len(body) for body in self.bodies}
+        for key, entry in snapshot.walk(snapshot.base_path):
+            if entry.is_dir or entry.d_type != "file" or entry.size not in sizes:
+                continue
+            try:
+                with open(key, "rb") as f:
+                    content = f.read()
+            except OSError:
+                continue
+            if content in self.bodies:
+                yield key, content
+
+    def audit(self, snapshot: WorkspaceSnapshot) -> Dict[str, int]:
+        """Count placeholder files and the inodes/blocks they occupy versus the minimum needed"""
+        files = 0
+        inodes: Dict[Tuple[int, int], int] = {}  # (dev, inode) -> allocated bytes
+        linkable = set()  # inodes of placeholders outside properties/, the only ones dedup() may link
+        bodies, linkable_bodies = set(), set()
+        for key, content in self.placeholders(snapshot):
+            files += 1
+            bodies.add(content)
+            try:
+                st = os.stat(key)
+            except OSError:
+                continue
+            inodes[(st.st_dev, st.st_ino)] = st.st_blocks * 512
+            if not is_property_path(key):
+                linkable_bodies.add(content)
+                linkable.add((st.st_dev, st.st_ino))
+        try:
+            block = os.statvfs(str(snapshot.base_path)).f_bsize
+        except OSError:
+            block = 4096
+        return {
+            "placeholder_files": files,
+            "distinct_bodies": len(bodies),
+            "inodes_used": len(inodes),
+            "inodes_reclaimed": files - len(inodes),
+            "inodes_reclaimable": max(0, len(linkable) - len(linkable_bodies)),
+            "bytes_used": sum(inodes.values()),
+            "bytes_reclaimed": (files - len(inodes)) * block,
+            "bytes_reclaimable": max(0, len(linkable) - len(linkable_bodies)) * block,
+        }
+
+    def dedup(self, snapshot: WorkspaceSnapshot, dry_run: bool = False) -> int:
+        """In hardlink mode, link every standalone placeholder outside properties/ to its blob; returns the
+        number of files replaced (always 0 in the other modes)
+
+        Existing files are only ever hardlinked: a reflink would not reclaim the inode, and a clone can't be
+        told apart from an unrelated copy on the next run.
+        """
+        if self.mode != "hardlink":
+            return 0
+        replaced = 0
+        for key, content in list(self.placeholders(snapshot)):
+            if is_property_path(key):
+                continue
+            if dry_run:
+                replaced += os.stat(key).st_nlink == 1
+                continue
+            blob = self.blob_for(content)
+            if os.path.samefile(blob, key):
+                continue
+            tmp = f"{key}.dedup.tmp"
+            try:
+                os.link(blob, tmp)
+            except OSError as e:
+                if e.errno == errno.EMLINK:
+                    with self._lock:
+                        self.generation[content] = self.generation.get(content, 0) + 1
+                    blob = self.blob_for(content)
+                    os.link(blob, tmp)
+                elif e.errno in (errno.EXDEV, errno.EPERM, errno.ENOTSUP):
+                    continue  # linking isn't possible here, so keep the original file
+                else:
+                    raise
+            os.replace(tmp, key)
+            replaced += 1
+        return replaced
+
+
+    def unshare_properties(self, snapshot: WorkspaceSnapshot, dry_run: bool = False) -> int:
+        """Give every property file that shares its inode (linked by an earlier dedup) a private copy, so
+        editing one value no longer rewrites the others; returns the number of files split off"""
+        unshared = 0
+        for key, entry in snapshot.walk(snapshot.base_path):
+            if entry.d_type != "file" or not is_property_path(key):
+                continue
+            try:
+                if os.stat(key).st_nlink == 1:
+                    continue
+                if not dry_run:
+                    with open(key, "rb") as f:
+                        content = f.read()
+                    tmp = f"{key}.unshare.tmp"
+                    with open(tmp, "xb") as f:
+                        f.write(content)
+                    os.replace(tmp, key)
+            except OSError:
+                continue
+            unshared += 1
+        return unshared
+
+
+def format_audit(report: Dict[str, int]) -> str:
+    def kib(n: int) -> str:
+        return f"{n / 1024:.1f} KiB"
+    return "\n".join([
+        f"Placeholder files:   {report['placeholder_files']} ({report['distinct_bodies']} distinct bodies)",
+        f"Inodes in use:       {report['inodes_used']} ({kib(report['bytes_used'])} allocated)",
+        f"Reclaimed:           {report['inodes_reclaimed']} inodes, ~{kib(report['bytes_reclaimed'])}",
+        f"Still reclaimable:   {report['inodes_reclaimable']} inodes, ~{kib(report['bytes_reclaimable'])}",
+    ])
+
+
+def mode_option(argv) -> Optional[str]:
+    """Placeholder mode from --dedup[=reflink|hardlink|copy] (bare: reflink), or None when dedup is off; exits on
+    an unknown mode"""
+    for arg in argv:
+        if arg == "--dedup":
+            return DEFAULT_MODE
+        if arg.startswith("--dedup="):
+            mode = arg[len("--dedup="):]
+            if mode not in MODES:
+                print(f"✗ Unknown --dedup mode '{mode}' (choose from {', '.join(MODES)})")
+                sys.exit(2)
+            return mode
+    return None
+
+
+def store_option(base_path: str, argv) -> Optional[PlaceholderStore]:
+    """PlaceholderStore for a script's --dedup[=mode] flag, or None to write placeholders as plain files"""
+    mode = mode_option(argv)
+    return PlaceholderStore(base_path, mode=mode) if mode else None
+
+
+USAGE = """Usage: placeholder_store.py [--audit]
+       placeholder_store.py --dedup[=reflink|hardlink|copy] [--dry-run]
+
+Without --dedup only the audit runs, which changes nothing. --dedup first gives every property file that
+shares an inode with others its own copy again. --dedup=hardlink then also links every placeholder outside
+properties/ to a shared read-only blob; only use it where those files are replaced by rename, never written
+in place. --dry-run counts instead of changing anything."""
+
+
+if __name__ == "__main__":
+    if "--help" in sys.argv or "-h" in sys.argv:
+        print(USAGE)
+        exit(0)
+
+    base_path = DEFAULT_WORKSPACE
+    mode = mode_option(sys.argv)
+    snapshot = WorkspaceSnapshot(base_path)
+    store = PlaceholderStore(base_path, mode=mode or DEFAULT_MODE)
+
+    if mode is not None:
+        dry_run = "--dry-run" in sys.argv
+        unshared = store.unshare_properties(snapshot, dry_run=dry_run)
+        if unshared:
+            print(f"{'Would split' if dry_run else 'Split'} {unshared} shared property file(s) into private copies")
+        if mode == "hardlink":
+            replaced = store.dedup(snapshot, dry_run=dry_run)
+            verb = "Would link" if dry_run else "Linked"
+            print(f"{verb} {replaced} placeholder file(s) outside properties/ to shared blobs")
+        else:
+            print(f"Existing files are only linked with --dedup=hardlink; {mode} applies to files the tools create")
+        if not dry_run:
+            snapshot.scan()
+    print("\n=== Placeholder Audit ===")
+    print(format_audit(store.audit(snapshot)))
+    if mode is None:
+        print("\nRun with --dedup=hardlink to link the reclaimable placeholders (add --dry-run to count them first)")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Bitset Property Matrix for Cross-Model Comparison
+Inverted index property -> bitset of models, so coverage and gaps are integer mask operations
+"""
+
+from typing import Dict, Iterable, List
+
+
+class PropertyMatrix:
+    """Models x properties for one property category, stored column-wise as int bitsets"""
+
+    def __init__(self, models: Iterable[str]):
+        self.models = list(models)
+        self.model_bit = {model: 1 << i for i, model in enumerate(self.models)}
+        self.all_mask = (1 << len(self.models)) - 1
+        self.index: Dict[str, int] = {}
+
+    def add(self, model: str, props: Iterable[str]):
+        """Record that model has every property in props"""
+        bit = self.model_bit[model]
+        index = self.index
+        for prop in props:
+            index[prop] = index.get(prop, 0) | bit
+
+    def properties(self) -> List[str]:
+        return sorted(self.index)
+
+    def models_in(self, mask: int) -> List[str]:
+        """Decode a bitset back into model names, in model order"""
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.models[low.bit_length() - 1])
+            mask ^= low
+        return names
+
+    def has_mask(self, prop: str) -> int:
+        return self.index.get(prop, 0)
+
+    def missing_mask(self, prop: str) -> int:
+        return self.all_mask & ~self.index.get(prop, 0)
+
+    def missing_from(self, prop: str) -> List[str]:
+        return self.models_in(self.missing_mask(prop))
+
+    def count(self, prop: str) -> int:
+        return bin(self.index.get(prop, 0)).count("1")
+
+    def coverage(self, prop: str) -> float:
+        """Fraction of models (0.0-1.0) that have prop"""
+        if not self.models:
+            return 0.0
+        return self.count(prop) / len(self.models)
+
+    def incomplete(self) -> List[str]:
+        """Properties not present in every model, sorted"""
+        full = self.all_mask
+        return sorted(prop for prop, mask in self.index.items() if mask != full)
+
+    def outliers(self, threshold: float = 0.5) -> Dict[str, List[str]]:
+        """Per model, the properties it lacks although more than `threshold` of the models have them"""
+        result: Dict[str, List[str]] = {}
+        needed = threshold * len(self.models)
+        for prop in self.incomplete():
+            if self.count(prop) > needed:
+                for model in self.missing_from(prop):
+                    result.setdefault(model, []).append(prop)
+        return result
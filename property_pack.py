@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Packed Property Store
+Compiles every properties/** tree into one indexed binary file that readers mmap and query zero-copy
+
+Layout (little-endian):
+    header   magic "LPPK", version, entry count, data offset
+    index    one fixed-size record per property, sorted by workspace-relative path:
+             key offset/length, value offset/length, file mode, mtime_ns
+    data     key bytes, then each distinct value once
+"""
+
+import bisect
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from cli_options import DEFAULT_WORKSPACE
+from validation_cache import CACHE_DIR
+from workspace_snapshot import WorkspaceSnapshot
+from write_planner import WritePlan
+
+PACK_MAGIC = b"LPPK"
+PACK_VERSION = 1
+PACK_NAME = "properties.pack"
+
+_HEADER = struct.Struct("<4sIII")    # magic, version, count, data offset
+_RECORD = struct.Struct("<IIIIIQ")   # key off, key len, value off, value len, mode, mtime_ns
+
+
+def default_pack_path(base_path: str = DEFAULT_WORKSPACE) -> Path:
+    return Path(base_path) / CACHE_DIR / PACK_NAME
+
+
+def property_files(snapshot: WorkspaceSnapshot) -> Iterator[Tuple[str, str]]:
+    """(absolute key, workspace-relative path) of every file below a properties/ directory"""
+    base = str(snapshot.base_path)
+    cut = len(base) + 1
+    for key, entry in snapshot.walk(snapshot.base_path):
+        if entry.d_type != "file":
+            continue
+        rel = key[cut:].replace(os.sep, "/")
+        if "properties" in rel.split("/")[:-1]:
+            yield key, rel
+
+
+def pack(snapshot: WorkspaceSnapshot, output: Optional[Path] = None) -> Tuple[Path, int]:
+    """Write every property file in the snapshot into one pack; returns (path, entries packed)"""
+    output = output or default_pack_path(str(snapshot.base_path))
+    rows = []
+    for key, rel in property_files(snapshot):
+        try:
+            with open(key, "rb") as f:
+                value = f.read()
+            st = os.stat(key)
+        except OSError:
+            continue
+        rows.append((rel.encode(), value, st.st_mode & 0o7777, st.st_mtime_ns))
+    rows.sort()
+
+    # Keys first, then each distinct value once: most properties share a handful of defaults
+    data_offset = _HEADER.size + _RECORD.size * len(rows)
+    data = bytearray()
+    keys = []
+    for rel, _, _, _ in rows:
+        keys.append(data_offset + len(data))
+        data += rel
+    values: Dict[bytes, int] = {}
+    for _, value, _, _ in rows:
+        if value not in values:
+            values[value] = data_offset + len(data)
+            data += value
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(rows), data_offset))
+        for key_offset, (rel, value, mode, mtime_ns) in zip(keys, rows):
+            f.write(_RECORD.pack(key_offset, len(rel), values[value], len(value), mode, mtime_ns))
+        f.write(data)
+    os.replace(tmp, output)
+    return output, len(rows)
+
+
+class PropertyPack:
+    """Read-only view of a pack; values are memoryviews into the mapping, valid until close()"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"{self.path}: not a property pack")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, version, self.count, self._data_offset = _HEADER.unpack_from(self._map, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self.close()
+            raise ValueError(f"{self.path}: unsupported property pack (magic {magic!r}, version {version})")
+        self._keys = _KeyColumn(self)
+
+    def _record(self, i: int) -> Tuple[int, int, int, int, int, int]:
+        return _RECORD.unpack_from(self._map, _HEADER.size + i * _RECORD.size)
+
+    def _key(self, i: int) -> bytes:
+        key_offset, key_len = _RECORD.unpack_from(self._map, _HEADER.size + i * _RECORD.size)[:2]
+        return self._map[key_offset:key_offset + key_len]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, rel: str) -> bool:
+        return self._find(rel) is not None
+
+    def _find(self, rel: str) -> Optional[int]:
+        encoded = rel.encode()
+        i = bisect.bisect_left(self._keys, encoded)
+        return i if i < self.count and self._key(i) == encoded else None
+
+    def get(self, rel: str) -> Optional[memoryview]:
+        """Raw value of a workspace-relative property path, without copying it"""
+        i = self._find(rel)
+        if i is None:
+            return None
+        _, _, value_offset, value_len, _, _ = self._record(i)
+        return self._view[value_offset:value_offset + value_len]
+
+    def text(self, rel: str, default: Optional[str] = None) -> Optional[str]:
+        value = self.get(rel)
+        return default if value is None else str(value, "utf-8").strip()
+
+    def keys(self, prefix: str = "") -> Iterator[str]:
+        """Sorted property paths, optionally only those under prefix"""
+        for i in self._range(prefix):
+            yield self._key(i).decode()
+
+    def items(self, prefix: str = "") -> Iterator[Tuple[str, memoryview]]:
+        for i in self._range(prefix):
+            key_offset, key_len, value_offset, value_len, _, _ = self._record(i)
+            yield (self._map[key_offset:key_offset + key_len].decode(),
+                   self._view[value_offset:value_offset + value_len])
+
+    def _range(self, prefix: str) -> range:
+        if not prefix:
+            return range(self.count)
+        encoded = prefix.encode()
+        start = bisect.bisect_left(self._keys, encoded)
+        # Every key starting with prefix sorts before prefix + the highest byte
+        end = bisect.bisect_left(self._keys, encoded + b"\xff", start)
+        return range(start, end)
+
+    def properties_of(self, root: str) -> Dict[str, str]:
+        """All properties of one model/component root, keyed by their path below it"""
+        prefix = root.rstrip("/") + "/"
+        return {rel[len(prefix):]: str(value, "utf-8").strip()
+                for rel, value in self.items(prefix) if "properties" in rel[len(prefix):].split("/")[:-1]}
+
+    def close(self):
+        if self._map is None:
+            return
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # a caller still holds a value view; the mapping goes away with the last one
+        self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _KeyColumn:
+    """Sequence view of a pack's sorted keys, so bisect can search the mapping directly"""
+
+    def __init__(self, pack: PropertyPack):
+        self._pack = pack
+
+    def __len__(self) -> int:
+        return self._pack.count
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._pack._key(i)
+
+
+def unpack(pack_path: Path, snapshot: WorkspaceSnapshot, target: Optional[Path] = None) -> Tuple[int, List[str]]:
+    """Recreate the packed files below target (default: the snapshot's workspace) as one WritePlan batch
+
+    Existing files are left untouched; returns (files created, paths whose current content differs).
+    """
+    target = Path(target or snapshot.base_path)
+    if not snapshot.exists(target):
+        target.mkdir(parents=True, exist_ok=True)
+        snapshot.record_dir(target)
+    plan = WritePlan(snapshot)
+    modes = []
+    conflicts = []
+    with PropertyPack(pack_path) as packed:
+        for i in range(len(packed)):
+            key_offset, key_len, value_offset, value_len, mode, mtime_ns = packed._record(i)
+            rel = packed._map[key_offset:key_offset + key_len].decode()
+            value = packed._map[value_offset:value_offset + value_len]
+            path = target / rel
+            if snapshot.exists(path):
+                try:
+                    if path.read_bytes() != value:
+                        conflicts.append(rel)
+                except OSError:
+                    conflicts.append(rel)
+                continue
+            # Bytes, not text: pack() accepts any file, so the restore must reproduce it exactly
+            plan.add_file(path, bytes(value))
+            modes.append((str(path), mode, mtime_ns))
+    plan.apply()
+    for key, mode, mtime_ns in modes:
+        os.chmod(key, mode)
+        os.utime(key, ns=(mtime_ns, mtime_ns))
+    return len(plan.created_files), conflicts
+
+
+if __name__ == "__main__":
+    import sys
+    from cli_options import option_value
+
+    USAGE = "Usage: property_pack.py [pack | unpack [TARGET] | get KEY... | list [PREFIX]] [--pack PATH]"
+    base_path = DEFAULT_WORKSPACE
+    argv = sys.argv[1:]
+    args = [a for i, a in enumerate(argv)
+            if not a.startswith("--pack") and (i == 0 or argv[i - 1] != "--pack")]
+    command = args[0] if args else "pack"
+    args = args[1:]
+    pack_option = option_value(argv, "--pack")
+    pack_path = Path(pack_option) if pack_option else default_pack_path(base_path)
+
+    if command not in ("pack", "unpack", "get", "list"):
+        print(USAGE)
+        exit(2)
+    if command != "pack" and not pack_path.is_file():
+        print(f"✗ No property pack at {pack_path} (run pack first)")
+        exit(1)
+
+    if command == "pack":
+        path, count = pack(WorkspaceSnapshot(base_path), pack_path)
+        print(f"Packed {count} properties into {path} ({path.stat().st_size} bytes)")
+    elif command == "unpack":
+        target = Path(args[0]) if args else Path(base_path)
+        snapshot = WorkspaceSnapshot(str(target))
+        created, conflicts = unpack(pack_path, snapshot, target)
+        print(f"Restored {created} property files into {target}")
+        for rel in conflicts:
+            print(f"  ⚠ {rel}: differs from the packed value (left as is)")
+    else:
+        with PropertyPack(pack_path) as packed:
+            if command == "get":
+                for rel in args:
+                    print(f"{rel} = {packed.text(rel, '<missing>')}")
+            else:
+                for rel, value in packed.items(args[0] if args else ""):
+                    print(f"{rel} = {str(value, 'utf-8').strip()}")
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Layered Property Resolver
+Effective value of a property for a project and component: project override → component → unified model → core default
+"""
+
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from cli_options import DEFAULT_WORKSPACE
+from pattern_schema import DEFAULT_CONTENT, load_schema
+
+# Layers, highest precedence first
+PROJECT = "project"
+COMPONENT = "component"
+MODEL = "model"
+CORE = "core"
+
+PLACEHOLDER = DEFAULT_CONTENT[""].strip()
+
+# Components whose prefixed property files don't use their capitalised directory name
+PREFIXES = {"widow": "Window"}
+
+
+def component_prefix(name: str) -> str:
+    """Prefix of a component's flat property files (card → Card, so CardWidth is its width)"""
+    return PREFIXES.get(name, name[:1].upper() + name[1:])
+
+
+def flat_name(prefix: str, prop: str) -> str:
+    return prefix + prop[:1].upper() + prop[1:]
+
+
+class DirectoryLRU:
+    """Bounded LRU of property directory contents, each entry valid while the directory's mtime is unchanged
+
+    A directory's mtime moves when files are created, removed or replaced by rename (how editors and the
+    tools save); an in-place rewrite of an existing file does not, so call clear() after one of those.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[str, Tuple[int, Dict[str, str]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str) -> Dict[str, str]:
+        """name -> stripped value of every property file directly in path ({} if it isn't a directory)
+
+        Scaffolded placeholders ("default") count as unset, so they don't shadow a real value below them.
+        """
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            self.entries.pop(path, None)
+            return {}
+        cached = self.entries.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            self.entries.move_to_end(path)
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        values = self._read(path)
+        self.entries[path] = (mtime_ns, values)
+        self.entries.move_to_end(path)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return values
+
+    @staticmethod
+    def _read(path: str) -> Dict[str, str]:
+        values = {}
+        try:
+            with os.scandir(path) as it:
+                for item in it:
+                    # Property files are extensionless; .swift files beside them are sources
+                    if "." in item.name or not item.is_file(follow_symlinks=False):
+                        continue
+                    try:
+                        with open(item.path, encoding="utf-8") as f:
+                            value = f.read().strip()
+                    except (OSError, UnicodeDecodeError):
+                        continue
+                    if value != PLACEHOLDER:
+                        values[item.name] = value
+        except OSError:
+            pass
+        return values
+
+    def clear(self):
+        self.entries.clear()
+
+
+class PropertyResolver:
+    def __init__(self, base_path: str = DEFAULT_WORKSPACE, cache_size: int = 1024):
+        self.base_path = Path(base_path)
+        self.schema = load_schema()
+        self.cache = DirectoryLRU(cache_size)
+        self._models: Dict[str, bool] = {}
+
+    # Layer locations
+
+    def model_for(self, component: str) -> Optional[str]:
+        """Unified model a component key falls back to (layout/components/card → CardModel), if it exists"""
+        parts = component.split("/")
+        if parts[0] == "models" and len(parts) == 2:
+            return parts[1]
+        name = f"{parts[-1][:1].upper()}{parts[-1][1:]}Model"
+        if name not in self._models:
+            self._models[name] = (self.base_path / "models" / name).is_dir()
+        return name if self._models[name] else None
+
+    def layer_dirs(self, project: Optional[str], component: str) -> List[Tuple[str, Path, Optional[str]]]:
+        """(layer, properties directory, flat-file prefix or None) in precedence order"""
+        name = component.rstrip("/").split("/")[-1]
+        prefix = component_prefix(name)
+        dirs = []
+        if project:
+            dirs.append((PROJECT, self.base_path / "Projects" / project / "layout" / name / "properties", prefix))
+        dirs.append((COMPONENT, self.base_path / component / "properties", prefix))
+        model = self.model_for(component)
+        if model is not None and f"models/{model}" != component:
+            dirs.append((MODEL, self.base_path / "models" / model / "properties", None))
+        return dirs
+
+    # Lookups
+
+    def _lookup(self, directory: Path, prefix: Optional[str], category: str, prop: str) -> Optional[str]:
+        """Value of category/prop in one layer: properties/<category>/<prop>, else a flat <Prefix><Prop> file"""
+        value = self.cache.get(str(directory / category)).get(prop)
+        if value is None and prefix is not None:
+            value = self.cache.get(str(directory)).get(flat_name(prefix, prop))
+        return value
+
+    def resolve(self, project: Optional[str], component: str, prop: str) -> Optional[Tuple[str, str]]:
+        """(value, layer) of 'category/name' (or a bare name, searched in every category), or None"""
+        if "/" in prop:
+            category, name = prop.split("/", 1)
+            candidates = [(category, name)]
+        else:
+            candidates = [(category, prop) for category in self.schema.properties_subdirs]
+        for layer, directory, prefix in self.layer_dirs(project, component):
+            for category, name in candidates:
+                value = self._lookup(directory, prefix, category, name)
+                if value is not None:
+                    return value, layer
+        for category, name in candidates:
+            value = self.schema.core_properties.get(category, {}).get(name)
+            if value is not None:
+                return value, CORE
+        return None
+
+    def effective(self, project: Optional[str], component: str) -> Dict[str, Tuple[str, str]]:
+        """Every property visible to component in project: 'category/name' (or a flat name) -> (value, layer)
+
+        Flat files whose name maps onto a known category property override it; the rest are kept under
+        their own name (e.g. WindowFrame).
+        """
+        result: Dict[str, Tuple[str, str]] = {}
+        for category, props in self.schema.core_properties.items():
+            for name, value in props.items():
+                result[f"{category}/{name}"] = (value, CORE)
+
+        # Lowest precedence first, so each higher layer overwrites what is below it
+        for layer, directory, prefix in reversed(self.layer_dirs(project, component)):
+            for category in self.schema.properties_subdirs:
+                for name, value in self.cache.get(str(directory / category)).items():
+                    result[f"{category}/{name}"] = (value, layer)
+            if prefix is None:
+                continue
+            by_flat = {flat_name(prefix, key.split("/", 1)[1]): key for key in result if "/" in key}
+            for name, value in self.cache.get(str(directory)).items():
+                result[by_flat.get(name, name)] = (value, layer)
+        return dict(sorted(result.items()))
+
+    def effective_all(self, project: Optional[str], components: List[str]) -> Dict[str, Dict[str, Tuple[str, str]]]:
+        return {component: self.effective(project, component) for component in components}
+
+
+if __name__ == "__main__":
+    import sys
+    from cli_options import option_value
+
+    args = [a for i, a in enumerate(sys.argv[1:], 1)
+            if not a.startswith("--") and sys.argv[i - 1] != "--prop"]
+    if not args:
+        print("Usage: property_resolver.py PROJECT|- [COMPONENT...] [--prop category/name]")
+        exit(2)
+    project = None if args[0] == "-" else args[0]
+    resolver = PropertyResolver(DEFAULT_WORKSPACE)
+
+    components = args[1:]
+    if not components:
+        from validate_pattern import PatternValidator
+        validator = PatternValidator(DEFAULT_WORKSPACE)
+        components = [f"models/{m}" for m in validator.get_models()] + validator.get_components()
+
+    prop = option_value(sys.argv, "--prop")
+    for component in components:
+        if prop:
+            found = resolver.resolve(project, component, prop)
+            print(f"{component}: {prop} = " + (f"{found[0]}  ({found[1]})" if found else "<unset>"))
+            continue
+        print(f"\n{component}/")
+        for name, (value, layer) in resolver.effective(project, component).items():
+            print(f"  {name} = {value}  ({layer})")
+
+    print(f"\nDirectory cache: {resolver.cache.hits} hit(s), {resolver.cache.misses} miss(es)")
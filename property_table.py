@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Typed Columnar Property Table
+Parses every property value of every model and component once into typed columns (float arrays, interned
+color/enum codes, boolean bitsets, split vector components), so workspace-wide filters and aggregations
+run over arrays and bitsets instead of file reads
+"""
+
+import math
+import operator
+import re
+from abc import ABC, abstractmethod
+from array import array
+from collections import Counter
+from itertools import compress, repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from cli_options import DEFAULT_WORKSPACE
+from instrumentation import CONTENT, phase
+from pattern_schema import load_schema
+from property_pack import property_files
+from property_resolver import PLACEHOLDER, component_prefix, flat_name
+from workspace_snapshot import WorkspaceSnapshot
+
+BOOL = "bool"
+NUMBER = "number"
+VECTOR = "vector"
+ENUM = "enum"
+
+CATEGORIES = frozenset(load_schema().properties_subdirs)
+CORE_KEYS = frozenset(f"{category}/{name}" for category, props in load_schema().core_properties.items()
+                      for name in props)
+
+_NUMBER = re.compile(r"[+-]?(?:\d+(?:\.\d*)?|\.\d+)")
+_TOKEN = re.compile(r"[A-Za-z_][\w-]*")
+_COLOR = re.compile(r"#(?:[0-9A-Fa-f]{3}|[0-9A-Fa-f]{6}|[0-9A-Fa-f]{8})")
+_VECTOR_PART = re.compile(r"\s*(?:(\w+)\s*:)?\s*([+-]?(?:\d+(?:\.\d*)?|\.\d+))\s*")
+_COMPARISON = re.compile(r"^([\w/.]+)\s*(<=|>=|!=|==|=|<|>)\s*(.*)$")
+
+OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+             "==": operator.eq, "=": operator.eq, "!=": operator.ne}
+
+# bytes of 0/1 flags -> ASCII digits, so a flag array becomes an int bitset with one int() call
+_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_FLAGS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def bitset(flags: Iterable[bool]) -> int:
+    """Bitset with bit i set where flags[i] is true; a C-level map() of flags stays out of the interpreter"""
+    data = bytes(flags)
+    return int(data[::-1].translate(_DIGITS), 2) if data else 0
+
+
+def parse_vector(text: str) -> Optional[Tuple[Tuple[str, ...], Tuple[float, ...]]]:
+    """("x", "y", ...) names and values of "0,2" or "x:0,y:0,width:800,height:600"; None if not a vector"""
+    parts = text.split(",")
+    if len(parts) < 2:
+        return None
+    names, values = [], []
+    for i, part in enumerate(parts):
+        match = _VECTOR_PART.fullmatch(part)
+        if match is None:
+            return None
+        names.append(match.group(1) or str(i))
+        values.append(float(match.group(2)))
+    return tuple(names), tuple(values)
+
+
+def normalize(text: str) -> str:
+    """Canonical spelling of an enum value: colors as upper-case #RRGGBB[AA]"""
+    if _COLOR.fullmatch(text):
+        digits = text[1:].upper()
+        return "#" + ("".join(c * 2 for c in digits) if len(digits) == 3 else digits)
+    return text
+
+
+def is_number(text: str) -> bool:
+    return _NUMBER.fullmatch(text) is not None
+
+
+def infer_kind(values: Iterable[str]) -> str:
+    """Column type that fits every present value: all true/false is bool, all vectors of one shape is vector,
+    numbers (with bare keywords like auto) is number, anything else is enum"""
+    values = list(values)
+    if values and all(v in ("true", "false") for v in values):
+        return BOOL
+    vectors = [parse_vector(v) for v in values]
+    if values and all(vectors) and len({names for names, _ in vectors}) == 1:
+        return VECTOR
+    if any(is_number(v) for v in values) and all(is_number(v) or _TOKEN.fullmatch(v) for v in values):
+        return NUMBER
+    return ENUM
+
+
+class Interner:
+    """Table-wide string codes, so enum and keyword cells are compared as ints"""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def intern(self, text: str) -> int:
+        code = self.codes.get(text)
+        if code is None:
+            code = self.codes[text] = len(self.strings)
+            self.strings.append(text)
+        return code
+
+    def code(self, text: str) -> int:
+        """Code of text, or -1 (matching no cell) if no cell holds it"""
+        return self.codes.get(text, -1)
+
+
+class Column(ABC):
+    """One property across all rows; present is the bitset of rows that set it"""
+    kind = ""
+
+    def __init__(self, name: str, present: int):
+        self.name = name
+        self.present = present
+
+    @abstractmethod
+    def compare(self, op: str, text: str) -> int:
+        """Bitset of rows whose value satisfies `value <op> text`; rows without the property never match"""
+
+    @abstractmethod
+    def value(self, row: int) -> Optional[str]:
+        """Text of the row's value, or None if the row does not set the property"""
+
+    def count(self) -> int:
+        return bin(self.present).count("1")
+
+
+class BoolColumn(Column):
+    kind = BOOL
+
+    def __init__(self, name: str, present: int, true: int):
+        super().__init__(name, present)
+        self.true = true
+
+    def compare(self, op: str, text: str) -> int:
+        if op not in ("==", "=", "!=") or text not in ("true", "false"):
+            raise ValueError(f"{self.name} is boolean: compare with == or != true/false")
+        return self.true if (text == "true") == (op != "!=") else self.present & ~self.true
+
+    def value(self, row: int) -> Optional[str]:
+        if not self.present >> row & 1:
+            return None
+        return "true" if self.true >> row & 1 else "false"
+
+
+class NumberColumn(Column):
+    """Float per row (NaN where absent or a keyword) plus the interned keyword per row (-1 where numeric)"""
+    kind = NUMBER
+
+    def __init__(self, name: str, present: int, values: array, tokens: array, interner: Interner):
+        super().__init__(name, present)
+        self.values = values
+        self.tokens = tokens
+        self.interner = interner
+
+    def compare(self, op: str, text: str) -> int:
+        compare = OPERATORS[op]
+        if is_number(text):
+            # NaN compares false both ways, so absent and keyword rows drop out of <, > and ==
+            mask = bitset(map(compare, self.values, repeat(float(text))))
+            if op == "!=":
+                mask &= self.present  # ...but not out of !=
+            return mask
+        if op not in ("==", "=", "!="):
+            raise ValueError(f"{self.name}: {op} needs a number, not '{text}'")
+        code = self.interner.code(text)
+        if code < 0:
+            return 0 if op != "!=" else self.present  # no cell holds the keyword (-1 also marks numeric cells)
+        return bitset(map(compare, self.tokens, repeat(code))) & self.present
+
+    def value(self, row: int) -> Optional[str]:
+        if not self.present >> row & 1:
+            return None
+        token = self.tokens[row]
+        return self.interner.strings[token] if token >= 0 else format_number(self.values[row])
+
+
+class EnumColumn(Column):
+    """Interned code per row (-1 where absent): colors, keywords, free text"""
+    kind = ENUM
+
+    def __init__(self, name: str, present: int, codes: array, interner: Interner):
+        super().__init__(name, present)
+        self.codes = codes
+        self.interner = interner
+
+    def compare(self, op: str, text: str) -> int:
+        if op not in ("==", "=", "!="):
+            raise ValueError(f"{self.name} is an enum: compare with == or !=")
+        code = self.interner.code(normalize(text))
+        return bitset(map(OPERATORS[op], self.codes, repeat(code))) & self.present
+
+    def value(self, row: int) -> Optional[str]:
+        code = self.codes[row]
+        return self.interner.strings[code] if code >= 0 else None
+
+    def value_counts(self) -> Dict[str, int]:
+        counts = Counter(self.codes)
+        counts.pop(-1, None)
+        return {self.interner.strings[code]: n for code, n in counts.most_common()}
+
+
+class VectorColumn(Column):
+    """A vector property split into one NumberColumn per component (shadowOffset.0, WindowFrame.width, ...)"""
+    kind = VECTOR
+
+    def __init__(self, name: str, present: int, parts: Dict[str, NumberColumn]):
+        super().__init__(name, present)
+        self.parts = parts
+
+    def compare(self, op: str, text: str) -> int:
+        parsed = parse_vector(text)
+        if parsed is None or op not in ("==", "=", "!="):
+            raise ValueError(f"{self.name} is a vector: compare with == or != a value like "
+                             f"{','.join(self.parts)}")
+        names, values = parsed
+        if names != tuple(self.parts) and names != tuple(str(i) for i in range(len(self.parts))):
+            raise ValueError(f"{self.name} has components {', '.join(self.parts)}")
+        equal = self.present
+        for part, value in zip(self.parts.values(), values):
+            equal &= part.compare("==", format_number(value))
+        return equal if op != "!=" else self.present & ~equal
+
+    def value(self, row: int) -> Optional[str]:
+        if not self.present >> row & 1:
+            return None
+        keyed = not all(name.isdigit() for name in self.parts)
+        return ",".join((f"{name}:" if keyed else "") + part.value(row) for name, part in self.parts.items())
+
+
+def format_number(value: float) -> str:
+    return str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+def property_cells(snapshot: WorkspaceSnapshot) -> Iterator[Tuple[str, str, str]]:
+    """(row, column, stripped value) of every property file: the row is the owning root relative to the
+    workspace, the column "category/name"
+
+    A flat file like CardWidth lands in the category column it overrides, mapped the way
+    PropertyResolver.effective maps it (core properties plus the category files beside it); flat files no
+    category defines keep their unprefixed name.
+    """
+    files = []
+    known: Dict[str, Set[str]] = {}
+    for key, rel in property_files(snapshot):
+        parts = rel.split("/")
+        if parts[0].startswith("."):
+            continue  # cache and backup stores
+        at = len(parts) - 1 - parts[::-1].index("properties")
+        rest = parts[at + 1:]
+        if len(rest) == 2 and rest[0] in CATEGORIES:
+            known.setdefault("/".join(parts[:at]), set()).add("/".join(rest))
+        elif not (len(rest) == 1 and "." not in rest[0]):
+            continue
+        files.append((key, parts, at))
+
+    by_flat: Dict[Tuple[str, str], Dict[str, str]] = {}
+    for key, parts, at in files:
+        row = "/".join(parts[:at])
+        rest = parts[at + 1:]
+        if len(rest) == 2:
+            column = "/".join(rest)
+        else:
+            prefix = component_prefix(parts[at - 1]) if at else ""
+            name = rest[0]
+            if (row, prefix) not in by_flat:
+                keys = CORE_KEYS | known.get(row, set())
+                by_flat[row, prefix] = {flat_name(prefix, k.split("/", 1)[1]): k for k in keys} if prefix else {}
+            column = by_flat[row, prefix].get(name)
+            if column is None:
+                if prefix and name.startswith(prefix) and len(name) > len(prefix):
+                    name = name[len(prefix):]
+                    name = name[:1].lower() + name[1:]
+                column = name
+        try:
+            with open(key, "rb") as f:
+                value = f.read().decode("utf-8").strip()
+        except (OSError, UnicodeDecodeError):
+            continue
+        if value and value != PLACEHOLDER:
+            yield row, column, value
+
+
+class PropertyTable:
+    """Rows are models and components, columns are properties, each column stored by its inferred type"""
+
+    def __init__(self, cells: Iterable[Tuple[str, str, str]]):
+        raw: Dict[str, Dict[str, str]] = {}
+        rows = set()
+        for row, column, value in cells:
+            rows.add(row)
+            raw.setdefault(column, {})[row] = value
+        self.rows: List[str] = sorted(rows)
+        self.row_index = {row: i for i, row in enumerate(self.rows)}
+        self.interner = Interner()
+        self.columns: Dict[str, Column] = {}
+        for name in sorted(raw):
+            self._add_column(name, raw[name])
+
+    @classmethod
+    def load(cls, snapshot: WorkspaceSnapshot) -> "PropertyTable":
+        with phase(CONTENT):
+            return cls(property_cells(snapshot))
+
+    def _add_column(self, name: str, cells: Dict[str, str]):
+        n = len(self.rows)
+        index = self.row_index
+        present = bitset(map(cells.__contains__, self.rows))
+        kind = infer_kind(cells.values())
+        if kind == BOOL:
+            true = 0
+            for row, value in cells.items():
+                if value == "true":
+                    true |= 1 << index[row]
+            self.columns[name] = BoolColumn(name, present, true)
+        elif kind == NUMBER:
+            self.columns[name] = self._number_column(name, present, {index[row]: v for row, v in cells.items()})
+        elif kind == VECTOR:
+            parsed = {index[row]: parse_vector(value) for row, value in cells.items()}
+            names = next(iter(parsed.values()))[0]
+            parts = {}
+            for i, part in enumerate(names):
+                values = {row: format_number(vector[1][i]) for row, vector in parsed.items()}
+                parts[part] = self._number_column(f"{name}.{part}", present, values)
+                self.columns[f"{name}.{part}"] = parts[part]
+            self.columns[name] = VectorColumn(name, present, parts)
+        else:
+            codes = array("i", repeat(-1, n))
+            for row, value in cells.items():
+                codes[index[row]] = self.interner.intern(normalize(value))
+            self.columns[name] = EnumColumn(name, present, codes, self.interner)
+
+    def _number_column(self, name: str, present: int, cells: Dict[int, str]) -> NumberColumn:
+        n = len(self.rows)
+        values = array("d", repeat(math.nan, n))
+        tokens = array("i", repeat(-1, n))
+        for i, value in cells.items():
+            if is_number(value):
+                values[i] = float(value)
+            else:
+                tokens[i] = self.interner.intern(value)
+        return NumberColumn(name, present, values, tokens, self.interner)
+
+    def column(self, name: str) -> Column:
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise KeyError(f"no property column '{name}'") from None
+
+    def default(self, name: str) -> Optional[str]:
+        """Core default of a category column from the pattern schema (shadowOffset -> 0,2)"""
+        category, _, prop = name.partition("/")
+        return load_schema().core_properties.get(category, {}).get(prop)
+
+    def where(self, expression: str) -> int:
+        """Bitset of rows matching "column <op> value"; the value "default" means the schema's core default"""
+        match = _COMPARISON.match(expression.strip())
+        if match is None:
+            raise ValueError(f"not a comparison: '{expression}' (expected e.g. style/opacity<1)")
+        name, op, text = match.groups()
+        text = text.strip()
+        if text == "default":
+            text = self.default(name.split(".")[0])
+            if text is None:
+                raise ValueError(f"{name} has no core default")
+        return self.column(name).compare(op, text)
+
+    def rows_in(self, mask: int) -> List[str]:
+        """Decode a row bitset back into row names, in row order"""
+        rows = []
+        while mask:
+            low = mask & -mask
+            rows.append(self.rows[low.bit_length() - 1])
+            mask ^= low
+        return rows
+
+    def stats(self, name: str, mask: Optional[int] = None) -> Dict[str, float]:
+        """count/min/max/mean of a number column's numeric cells, optionally only over the rows in mask"""
+        column = self.column(name)
+        if not isinstance(column, NumberColumn):
+            raise ValueError(f"{name} is {column.kind}, not a number column")
+        values = column.values
+        if mask is not None:
+            values = compress(values, bin(mask)[:1:-1].ljust(len(self.rows), "0").encode().translate(_FLAGS))
+        numbers = list(filter(math.isfinite, values))
+        if not numbers:
+            return {"count": 0}
+        return {"count": len(numbers), "min": min(numbers), "max": max(numbers),
+                "mean": math.fsum(numbers) / len(numbers)}
+
+    def summary(self) -> str:
+        kinds = Counter(column.kind for name, column in self.columns.items() if "." not in name)
+        return (f"{len(self.rows)} rows, {sum(kinds.values())} properties "
+                f"({', '.join(f'{n} {kind}' for kind, n in sorted(kinds.items()))}), "
+                f"{len(self.interner.strings)} interned values")
+
+
+if __name__ == "__main__":
+    import sys
+    from cli_options import option_value
+    from instrumentation import profile_option
+
+    profile_option(sys.argv)
+    args = sys.argv[1:]
+    filters = [args[i + 1] for i, arg in enumerate(args[:-1]) if arg == "--where"]
+    stats = [args[i + 1] for i, arg in enumerate(args[:-1]) if arg == "--stats"]
+    table = PropertyTable.load(WorkspaceSnapshot(DEFAULT_WORKSPACE))
+    print(f"Property table: {table.summary()}\n")
+
+    mask = None
+    try:
+        masks = [table.where(expression) for expression in filters]
+        if filters:
+            # Filters are ANDed, or ORed with --any
+            mask = 0 if "--any" in sys.argv else (1 << len(table.rows)) - 1
+            for m in masks:
+                mask = mask | m if "--any" in sys.argv else mask & m
+        # Unknown or non-number --stats columns fail here, before anything is printed
+        summaries = [(name, table.stats(name, mask)) for name in stats]
+    except (KeyError, ValueError) as e:
+        print(f"✗ {e.args[0]}")
+        exit(2)
+
+    if filters:
+        shown = [match.group(1) for match in map(_COMPARISON.match, filters)]
+        matched = table.rows_in(mask)
+        joined = (" or " if "--any" in sys.argv else " and ").join(filters)
+        print(f"{len(matched)} of {len(table.rows)} rows match {joined}")
+        for row in matched:
+            i = table.row_index[row]
+            values = ", ".join(f"{name}={table.columns[name].value(i)}" for name in dict.fromkeys(shown))
+            print(f"  {row}: {values}")
+        for name, summary in summaries:
+            print(f"\n{name} over matches: {summary}")
+    elif stats:
+        for name, summary in summaries:
+            print(f"{name}: {summary}")
+    else:
+        width = max((len(name) for name in table.columns), default=6)
+        print(f"{'column':<{width}}  {'type':<6}  {'rows':>4}  values")
+        prefix = option_value(sys.argv, "--columns", "")
+        for name, column in table.columns.items():
+            if not name.startswith(prefix):
+                continue
+            values = sorted({column.value(i) for i in range(len(table.rows))} - {None})
+            sample = ", ".join(values[:4]) + (", ..." if len(values) > 4 else "")
+            print(f"{name:<{width}}  {column.kind:<6}  {column.count():4d}  {sample}")
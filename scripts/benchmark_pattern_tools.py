@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pattern tools against a synthetic layout workspace.
+Generates a tree of configurable size, runs each tool end to end on a fresh copy of it and
+reports wall time, per-phase time, filesystem calls by type and (with --alloc) allocations, as JSON.
+
+Usage: benchmark_pattern_tools.py [--models N] [--submodels M] [--components K] [--widow W]
+                                  [--missing FRACTION] [--seed S] [--repeat R] [--jobs J]
+                                  [--alloc] [--tools a,b,...] [--output FILE]
+"""
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# The tools resolve their workspace when first imported, so point them at the synthetic tree first
+WORK_DIR = Path(tempfile.mkdtemp(prefix="layout-bench-"))
+WORKSPACE = WORK_DIR / "workspace"
+TEMPLATE = WORK_DIR / "template"
+os.environ["LAYOUT_WORKSPACE"] = str(WORKSPACE)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from cli_options import jobs_option, option_value
+
+import classify_and_validate_components
+import populate_submodels
+import validate_and_fix_all_models
+import validate_and_fix_entire_workspace
+from enforce_pattern import ComprehensivePatternEnforcer
+from fix_pattern import PatternFixer
+from instrumentation import Profiler
+from pattern_schema import CANONICAL_STRUCTURE, DEFAULT_CONTENT
+from validate_pattern import PatternValidator, make_cache
+from workspace_snapshot import WorkspaceSnapshot
+
+UNIFIED_MODELS = validate_and_fix_all_models.UNIFIED_MODELS
+PLURAL_DIRS = validate_and_fix_all_models.PLURAL_DIRS
+UI_COMPONENTS = classify_and_validate_components.UI_COMPONENTS
+
+
+def generate_workspace(root: Path, models: int, submodels: int, components: int, widow: int,
+                       missing: float, seed: int) -> dict:
+    """Write a synthetic layout tree; each canonical file is left out with probability `missing`"""
+    rng = random.Random(seed)
+    counts = {"dirs": 0, "files": 0}
+
+    def scaffold(target: Path):
+        for relpath in CANONICAL_STRUCTURE:
+            if rng.random() < missing:
+                continue
+            path = target / relpath
+            if not path.parent.exists():
+                path.parent.mkdir(parents=True)
+                counts["dirs"] += 1
+            path.write_text(DEFAULT_CONTENT.get(Path(relpath).suffix, DEFAULT_CONTENT[""]))
+            counts["files"] += 1
+        # Validators also look for <Prefix>Type.swift
+        prefix = target.name.replace("Model", "")
+        if target.name.endswith("Model") and (target / "types").exists():
+            (target / "types" / f"{prefix}Type.swift").write_text("// ...\n")
+            counts["files"] += 1
+
+    unified = UNIFIED_MODELS[:models] + [f"Gen{i:04d}Model" for i in range(max(0, models - len(UNIFIED_MODELS)))]
+    for name in unified:
+        scaffold(root / "models" / name)
+    for i in range(submodels):
+        scaffold(root / "models" / PLURAL_DIRS[i % len(PLURAL_DIRS)] / f"Sub{i:05d}Model")
+    component_names = UI_COMPONENTS[:components] + [f"comp{i:05d}" for i in range(max(0, components - len(UI_COMPONENTS)))]
+    for name in component_names:
+        scaffold(root / "layout" / "components" / name)
+    for i in range(widow):
+        scaffold(root / "widow" / f"area{i:04d}")
+    for name in ("Models", "ViewModels"):
+        scaffold(root / "window" / name)
+    return counts
+
+
+def tool_runners(jobs: int) -> dict:
+    """Name -> zero-argument callable running that tool end to end (including its own crawl)"""
+    base = str(WORKSPACE)
+
+    def validate_warm():
+        # Prime the cache outside the measured call, then time the unchanged-workspace run
+        PatternValidator(base, cache=make_cache(base), jobs=jobs).validate_all()
+        return lambda: PatternValidator(base, cache=make_cache(base), jobs=jobs).validate_all()
+
+    return {
+        "snapshot": lambda: WorkspaceSnapshot(base, jobs=jobs),
+        "validate": lambda: PatternValidator(base, jobs=jobs).validate_all(),
+        "validate_cached": validate_warm,
+        "fix": lambda: PatternFixer(base, jobs=jobs).fix_all_models(),
+        "enforce_scan": lambda: ComprehensivePatternEnforcer(base).scan_workspace(),
+        "fix_all_models": lambda: validate_and_fix_all_models.validate_and_fix(),
+        "fix_workspace": lambda: validate_and_fix_entire_workspace.validate_and_fix_workspace(jobs=jobs),
+        "classify_components": lambda: classify_and_validate_components.classify_and_validate(),
+        "populate_submodels": lambda: populate_submodels.populate_submodels(),
+    }
+
+
+def run_tool(name: str, runner, repeat: int, trace_alloc: bool) -> dict:
+    best = None
+    for _ in range(repeat):
+        if WORKSPACE.exists():
+            shutil.rmtree(WORKSPACE)
+        shutil.copytree(TEMPLATE, WORKSPACE, symlinks=True)
+        func = runner
+        if name == "validate_cached":
+            with contextlib.redirect_stdout(io.StringIO()):
+                func = runner()
+
+        # The same instrumentation as the tools' --profile, so phases show where each run's time went
+        profiler = Profiler(trace_memory=trace_alloc)
+        with contextlib.redirect_stdout(io.StringIO()), profiler:
+            func()
+        result = {"tool": name, **profiler.report()}
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    best["fs_calls_total"] = sum(best["fs_calls"].values())
+    return best
+
+
+def main(argv):
+    config = {
+        "models": int(option_value(argv, "--models", "7")),
+        "submodels": int(option_value(argv, "--submodels", "25")),
+        "components": int(option_value(argv, "--components", "11")),
+        "widow": int(option_value(argv, "--widow", "7")),
+        "missing": float(option_value(argv, "--missing", "0.05")),
+        "seed": int(option_value(argv, "--seed", "1")),
+        "repeat": int(option_value(argv, "--repeat", "1")),
+        "jobs": jobs_option(argv),
+        "alloc": "--alloc" in argv,
+    }
+    runners = tool_runners(config["jobs"])
+    selected = option_value(argv, "--tools")
+    names = selected.split(",") if selected else list(runners)
+    unknown = [n for n in names if n not in runners]
+    if unknown:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+        print(f"Unknown tool(s): {', '.join(unknown)}; choose from {', '.join(runners)}", file=sys.stderr)
+        return 2
+
+    try:
+        start = time.perf_counter()
+        tree = generate_workspace(TEMPLATE, config["models"], config["submodels"], config["components"],
+                                  config["widow"], config["missing"], config["seed"])
+        tree["generate_seconds"] = round(time.perf_counter() - start, 6)
+        results = [run_tool(name, runners[name], max(1, config["repeat"]), config["alloc"]) for name in names]
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    report = json.dumps({"config": config, "tree": tree, "results": results}, indent=2)
+    output = option_value(argv, "--output")
+    if output:
+        Path(output).write_text(report + "\n")
+        for r in results:
+            print(f"  {r['tool']:<20} {r['seconds'] * 1000:9.1f} ms  {r['fs_calls_total']:7d} fs calls")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -4,86 +4,47 @@ Classify and validate layout/components subfolders as UI components or not.
 Enforce canonical pattern for UI components, and keep models/ separate.
 """
 import os
+import sys
 from pathlib import Path
 
-COMPONENTS_PATH = Path("/workspaces/layout/layout/components")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cli_options import DEFAULT_WORKSPACE
+from instrumentation import profile_option
+from pattern_schema import CANONICAL_STRUCTURE, DEFAULT_CONTENT
+from placeholder_store import PlaceholderStore, store_option
+from workspace_snapshot import WorkspaceSnapshot
+from write_planner import WritePlan, apply_and_report
+
+COMPONENTS_PATH = Path(DEFAULT_WORKSPACE) / "layout" / "components"
 UI_COMPONENTS = [
     "card", "category", "content", "navigation", "panel", "pathbar", "platform",
     "previewpanel", "statusbar", "tabs", "titlebar"
 ]
 
-CANONICAL_STRUCTURE = [
-    "attributes/Alignment.swift",
-    "attributes/Position.swift",
-    "attributes/State.swift",
-    "attributes/Visibility.swift",
-    "collections/ActionsSet.swift",
-    "collections/MetadataDictionary.swift",
-    "collections/ModelArray.swift",
-    "operations/Create.swift",
-    "operations/Read.swift",
-    "operations/Update.swift",
-    "operations/Delete.swift",
-    "operations/Toggle.swift",
-    "operations/Validate.swift",
-    "properties/layout/width",
-    "properties/layout/height",
-    "properties/layout/padding",
-    "properties/layout/spacing",
-    "properties/layout/position",
-    "properties/style/backgroundColor",
-    "properties/style/borderRadius",
-    "properties/style/borderWidth",
-    "properties/style/opacity",
-    "properties/style/shadowOffset",
-    "properties/style/shadowOpacity",
-    "properties/content/title",
-    "properties/content/body",
-    "properties/content/icon",
-    "properties/content/value",
-    "properties/behavior/isVisible",
-    "properties/behavior/isEnabled",
-    "properties/behavior/isInteractive",
-    "strings/DefaultTitle.swift",
-    "strings/PlaceholderText.swift",
-    "strings/ErrorMessages.swift",
-    "types/ModelType.swift",
-    "types/ModelAction.swift",
-    "types/ModelStyle.swift"
-]
-
-DEFAULT_CONTENT = {
-    ".swift": "// ...\n",
-    "": "default\n"
-}
 
-def ensure_pattern(component_path: Path):
-    changed = False
-    for relpath in CANONICAL_STRUCTURE:
-        target = component_path / relpath
-        target.parent.mkdir(parents=True, exist_ok=True)
-        ext = Path(relpath).suffix
-        content = DEFAULT_CONTENT.get(ext, DEFAULT_CONTENT[""])
-        if not target.exists():
-            target.write_text(content)
-            print(f"  ✓ Created {target.relative_to(component_path)} in {component_path.name}")
-            changed = True
-    return changed
+def ensure_pattern(component_path: Path, plan: WritePlan):
+    """Plan the missing canonical files of one component; returns its report lines"""
+    return [f"  ✓ {'Refreshed' if plan.refreshed(component_path / relpath) else 'Created'} {relpath} "
+            f"in {component_path.name}"
+            for relpath in plan.ensure_pattern(component_path, CANONICAL_STRUCTURE, DEFAULT_CONTENT)]
 
-def classify_and_validate():
-    print("\n=== Classifying and Validating layout/components ===")
-    for sub in COMPONENTS_PATH.iterdir():
-        if not sub.is_dir():
-            continue
-        if sub.name == "models":
-            print(f"\n{sub.name}/ (NOT a UI component, skip pattern enforcement)")
+def classify_and_validate(snapshot: WorkspaceSnapshot = None, store: PlaceholderStore = None,
+                          refresh: bool = False):
+    snapshot = snapshot or WorkspaceSnapshot(str(COMPONENTS_PATH.parent.parent))
+    plan = WritePlan(snapshot, store, refresh=refresh)
+    report = [("\n=== Classifying and Validating layout/components ===", [])]
+    for name in snapshot.subdirs(COMPONENTS_PATH):
+        if name == "models":
+            report.append((f"\n{name}/ (NOT a UI component, skip pattern enforcement)", []))
             continue
-        if sub.name in UI_COMPONENTS:
-            print(f"\n{sub.name}/ (UI component)")
-            ensure_pattern(sub)
+        if name in UI_COMPONENTS:
+            report.append((f"\n{name}/ (UI component)", ensure_pattern(COMPONENTS_PATH / name, plan)))
         else:
-            print(f"\n{sub.name}/ (Unknown, treat as non-component)")
+            report.append((f"\n{name}/ (Unknown, treat as non-component)", []))
+    return apply_and_report(plan, report)
 
 if __name__ == "__main__":
-    classify_and_validate()
+    profile_option(sys.argv)
+    classify_and_validate(store=store_option(str(COMPONENTS_PATH.parent.parent), sys.argv),
+                          refresh="--refresh" in sys.argv)
     print("\nClassification and validation complete.")
@@ -5,77 +5,47 @@ Each sub-model will get the same subfolders and files as its parent unified mode
 """
 import os
 import shutil
+import sys
 from pathlib import Path
 
-# Canonical subfolders and files (relative to model root)
-CANONICAL_STRUCTURE = [
-    "attributes/Alignment.swift",
-    "attributes/Position.swift",
-    "attributes/State.swift",
-    "attributes/Visibility.swift",
-    "collections/ActionsSet.swift",
-    "collections/MetadataDictionary.swift",
-    "collections/ModelArray.swift",
-    "operations/Create.swift",
-    "operations/Read.swift",
-    "operations/Update.swift",
-    "operations/Delete.swift",
-    "operations/Toggle.swift",
-    "operations/Validate.swift",
-    "properties/layout/width",
-    "properties/layout/height",
-    "properties/layout/padding",
-    "properties/layout/spacing",
-    "properties/layout/position",
-    "properties/style/backgroundColor",
-    "properties/style/borderRadius",
-    "properties/style/borderWidth",
-    "properties/style/opacity",
-    "properties/style/shadowOffset",
-    "properties/style/shadowOpacity",
-    "properties/content/title",
-    "properties/content/body",
-    "properties/content/icon",
-    "properties/content/value",
-    "properties/behavior/isVisible",
-    "properties/behavior/isEnabled",
-    "properties/behavior/isInteractive",
-    "strings/DefaultTitle.swift",
-    "strings/PlaceholderText.swift",
-    "strings/ErrorMessages.swift",
-    "types/ModelType.swift",
-    "types/ModelAction.swift",
-    "types/ModelStyle.swift"
-]
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cli_options import DEFAULT_WORKSPACE
+from instrumentation import profile_option
+from pattern_schema import CANONICAL_STRUCTURE, DEFAULT_CONTENT
+from placeholder_store import PlaceholderStore, store_option
+from workspace_snapshot import WorkspaceSnapshot
+from write_planner import WritePlan
 
-# Default content for each file type
-DEFAULT_CONTENT = {
-    ".swift": "// ...\n",
-    "": "default\n"
-}
 
 PLURAL_DIRS = [
     "BarModels", "PanelModels", "TabModels", "ControlModels", "DisplayModels", "MenuModels"
 ]
 
-MODELS_PATH = Path("/workspaces/layout/models")
+MODELS_PATH = Path(DEFAULT_WORKSPACE) / "models"
+
+def populate_submodels(snapshot: WorkspaceSnapshot = None, store: PlaceholderStore = None):
+    snapshot = snapshot or WorkspaceSnapshot(str(MODELS_PATH.parent))
+    plan = WritePlan(snapshot, store)
+
+    for plural_dir in PLURAL_DIRS:
+        plural_path = MODELS_PATH / plural_dir
+        for name in snapshot.subdirs(plural_path):
+            submodel = plural_path / name
+            # Check if submodel is empty or missing canonical structure
+            if next(snapshot.walk_files(submodel), None) is not None:
+                continue  # Skip non-empty
+            print(f"Populating {submodel.relative_to(MODELS_PATH)}...")
+            plan.ensure_pattern(submodel, CANONICAL_STRUCTURE, DEFAULT_CONTENT)
+
+    # One batch for all sub-models; a failure removes everything this run created
+    try:
+        plan.apply()
+    except OSError as e:
+        print(f"✗ Populating failed ({e}); rolled back {plan.summary()}")
+        return False
+    return True
 
-for plural_dir in PLURAL_DIRS:
-    plural_path = MODELS_PATH / plural_dir
-    if not plural_path.exists():
-        continue
-    for submodel in plural_path.iterdir():
-        if not submodel.is_dir():
-            continue
-        # Check if submodel is empty or missing canonical structure
-        existing_files = list(submodel.rglob("*"))
-        if len([f for f in existing_files if f.is_file()]) > 0:
-            continue  # Skip non-empty
-        print(f"Populating {submodel.relative_to(MODELS_PATH)}...")
-        for relpath in CANONICAL_STRUCTURE:
-            target = submodel / relpath
-            target.parent.mkdir(parents=True, exist_ok=True)
-            ext = Path(relpath).suffix
-            content = DEFAULT_CONTENT.get(ext, DEFAULT_CONTENT[""])
-            if not target.exists():
-                target.write_text(content)
+if __name__ == "__main__":
+    profile_option(sys.argv)
+    if not populate_submodels(store=store_option(str(MODELS_PATH.parent), sys.argv)):
+        sys.exit(1)
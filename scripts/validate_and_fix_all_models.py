@@ -4,52 +4,17 @@ Validate and auto-correct all unified models and plural sub-models to match the
 Run this script anytime to enforce structure and file count across all models.
 """
 import os
+import sys
 from pathlib import Path
 
-CANONICAL_STRUCTURE = [
-    "attributes/Alignment.swift",
-    "attributes/Position.swift",
-    "attributes/State.swift",
-    "attributes/Visibility.swift",
-    "collections/ActionsSet.swift",
-    "collections/MetadataDictionary.swift",
-    "collections/ModelArray.swift",
-    "operations/Create.swift",
-    "operations/Read.swift",
-    "operations/Update.swift",
-    "operations/Delete.swift",
-    "operations/Toggle.swift",
-    "operations/Validate.swift",
-    "properties/layout/width",
-    "properties/layout/height",
-    "properties/layout/padding",
-    "properties/layout/spacing",
-    "properties/layout/position",
-    "properties/style/backgroundColor",
-    "properties/style/borderRadius",
-    "properties/style/borderWidth",
-    "properties/style/opacity",
-    "properties/style/shadowOffset",
-    "properties/style/shadowOpacity",
-    "properties/content/title",
-    "properties/content/body",
-    "properties/content/icon",
-    "properties/content/value",
-    "properties/behavior/isVisible",
-    "properties/behavior/isEnabled",
-    "properties/behavior/isInteractive",
-    "strings/DefaultTitle.swift",
-    "strings/PlaceholderText.swift",
-    "strings/ErrorMessages.swift",
-    "types/ModelType.swift",
-    "types/ModelAction.swift",
-    "types/ModelStyle.swift"
-]
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cli_options import DEFAULT_WORKSPACE
+from instrumentation import profile_option
+from pattern_schema import CANONICAL_STRUCTURE, DEFAULT_CONTENT
+from placeholder_store import PlaceholderStore, store_option
+from workspace_snapshot import WorkspaceSnapshot
+from write_planner import WritePlan, apply_and_report, default_journal_path
 
-DEFAULT_CONTENT = {
-    ".swift": "// ...\n",
-    "": "default\n"
-}
 
 PLURAL_DIRS = [
     "BarModels", "PanelModels", "TabModels", "ControlModels", "DisplayModels", "MenuModels"
@@ -59,41 +24,42 @@ UNIFIED_MODELS = [
     "BarModel", "PanelModel", "CardModel", "TabModel", "ControlModel", "DisplayModel", "MenuModel"
 ]
 
-MODELS_PATH = Path("/workspaces/layout/models")
+MODELS_PATH = Path(DEFAULT_WORKSPACE) / "models"
 
-def ensure_pattern(model_path: Path):
-    changed = False
-    for relpath in CANONICAL_STRUCTURE:
-        target = model_path / relpath
-        target.parent.mkdir(parents=True, exist_ok=True)
-        ext = Path(relpath).suffix
-        content = DEFAULT_CONTENT.get(ext, DEFAULT_CONTENT[""])
-        if not target.exists():
-            target.write_text(content)
-            print(f"  ✓ Created {target.relative_to(MODELS_PATH)}")
-            changed = True
-    return changed
+def ensure_pattern(model_path: Path, plan: WritePlan):
+    """Plan the missing canonical files of one model; returns its report lines"""
+    return [f"  ✓ {'Refreshed' if plan.refreshed(model_path / relpath) else 'Created'} "
+            f"{(model_path / relpath).relative_to(MODELS_PATH)}"
+            for relpath in plan.ensure_pattern(model_path, CANONICAL_STRUCTURE, DEFAULT_CONTENT)]
 
-def validate_and_fix():
-    print("\n=== Validating Unified Models ===")
+def validate_and_fix(snapshot: WorkspaceSnapshot = None, journal: Path = None, store: PlaceholderStore = None,
+                     refresh: bool = False):
+    snapshot = snapshot or WorkspaceSnapshot(str(MODELS_PATH.parent))
+    plan = WritePlan(snapshot, store, refresh=refresh)
+    report = [("\n=== Validating Unified Models ===", [])]
     for model in UNIFIED_MODELS:
         model_path = MODELS_PATH / model
-        if not model_path.exists():
+        if not snapshot.exists(model_path):
             continue
-        print(f"\n{model}/")
-        ensure_pattern(model_path)
+        report.append((f"\n{model}/", ensure_pattern(model_path, plan)))
 
-    print("\n=== Validating Plural Sub-Models ===")
+    report.append(("\n=== Validating Plural Sub-Models ===", []))
     for plural_dir in PLURAL_DIRS:
         plural_path = MODELS_PATH / plural_dir
-        if not plural_path.exists():
-            continue
-        for submodel in plural_path.iterdir():
-            if not submodel.is_dir():
-                continue
-            print(f"\n{plural_dir}/{submodel.name}/")
-            ensure_pattern(submodel)
+        for name in snapshot.subdirs(plural_path):
+            report.append((f"\n{plural_dir}/{name}/", ensure_pattern(plural_path / name, plan)))
+
+    # Every model is planned first, so shared parents are created once and a failure undoes the whole batch
+    return apply_and_report(plan, report, journal=journal)
 
 if __name__ == "__main__":
-    validate_and_fix()
+    profile_option(sys.argv)
+    journal = None
+    if "--journal" in sys.argv:
+        journal = default_journal_path(str(MODELS_PATH.parent))
+        undone = WritePlan.rollback_journal(journal)
+        if undone:
+            print(f"Rolled back {undone} entries left by an interrupted run")
+    validate_and_fix(journal=journal, store=store_option(str(MODELS_PATH.parent), sys.argv),
+                     refresh="--refresh" in sys.argv)
     print("\nPattern validation and correction complete.")
@@ -4,93 +4,91 @@ Validate and auto-correct all relevant directories in the workspace to match the
 This includes /models, /window/Models, /window/ViewModels, /layout/components/*, and /widow/*.
 """
 import os
+import sys
 from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cli_options import DEFAULT_WORKSPACE, jobs_option
+from git_scope import GitScopeError, changed_paths, describe_scope, scope_option
+from instrumentation import profile_option
+from pattern_schema import CANONICAL_STRUCTURE, DEFAULT_CONTENT
+from placeholder_store import PlaceholderStore, store_option
+from workspace_snapshot import WorkspaceSnapshot
+from write_planner import WritePlan, apply_and_report, default_journal_path
 
-CANONICAL_STRUCTURE = [
-    "attributes/Alignment.swift",
-    "attributes/Position.swift",
-    "attributes/State.swift",
-    "attributes/Visibility.swift",
-    "collections/ActionsSet.swift",
-    "collections/MetadataDictionary.swift",
-    "collections/ModelArray.swift",
-    "operations/Create.swift",
-    "operations/Read.swift",
-    "operations/Update.swift",
-    "operations/Delete.swift",
-    "operations/Toggle.swift",
-    "operations/Validate.swift",
-    "properties/layout/width",
-    "properties/layout/height",
-    "properties/layout/padding",
-    "properties/layout/spacing",
-    "properties/layout/position",
-    "properties/style/backgroundColor",
-    "properties/style/borderRadius",
-    "properties/style/borderWidth",
-    "properties/style/opacity",
-    "properties/style/shadowOffset",
-    "properties/style/shadowOpacity",
-    "properties/content/title",
-    "properties/content/body",
-    "properties/content/icon",
-    "properties/content/value",
-    "properties/behavior/isVisible",
-    "properties/behavior/isEnabled",
-    "properties/behavior/isInteractive",
-    "strings/DefaultTitle.swift",
-    "strings/PlaceholderText.swift",
-    "strings/ErrorMessages.swift",
-    "types/ModelType.swift",
-    "types/ModelAction.swift",
-    "types/ModelStyle.swift"
-]
 
-DEFAULT_CONTENT = {
-    ".swift": "// ...\n",
-    "": "default\n"
-}
+WORKSPACE_PATH = Path(DEFAULT_WORKSPACE)
 
 # Directories to enforce pattern on
 EXTRA_DIRS = [
-    Path("/workspaces/layout/window/Models"),
-    Path("/workspaces/layout/window/ViewModels")
+    WORKSPACE_PATH / "window" / "Models",
+    WORKSPACE_PATH / "window" / "ViewModels"
 ]
 
-COMPONENTS_DIR = Path("/workspaces/layout/layout/components")
-WIDOW_DIR = Path("/workspaces/layout/widow")
+COMPONENTS_DIR = WORKSPACE_PATH / "layout" / "components"
+WIDOW_DIR = WORKSPACE_PATH / "widow"
+
+def collect_target_dirs(snapshot: WorkspaceSnapshot):
+    """EXTRA_DIRS plus every subdir of /layout/components and /widow"""
+    dirs = list(EXTRA_DIRS)
+    for parent in (COMPONENTS_DIR, WIDOW_DIR):
+        dirs.extend(parent / name for name in snapshot.subdirs(parent))
+    return dirs
 
-# Add all subdirs in /layout/components
-for sub in COMPONENTS_DIR.iterdir():
-    if sub.is_dir():
-        EXTRA_DIRS.append(sub)
+def target_of(path: Path):
+    """Target directory (as collect_target_dirs would list it) that contains path, or None"""
+    for extra in EXTRA_DIRS:
+        if path == extra or extra in path.parents:
+            return extra
+    for parent in (COMPONENTS_DIR, WIDOW_DIR):
+        if parent in path.parents:
+            return parent / path.relative_to(parent).parts[0]
+    return None
 
-# Add all subdirs in /widow
-for sub in WIDOW_DIR.iterdir():
-    if sub.is_dir():
-        EXTRA_DIRS.append(sub)
+def scoped_target_dirs(changed):
+    """Target directories touched by the changed paths of a git diff, skipping loose files"""
+    targets = {target_of(path) for path in changed} - {None}
+    return sorted(d for d in targets if d.is_dir())
 
-def ensure_pattern(model_path: Path):
-    changed = False
-    for relpath in CANONICAL_STRUCTURE:
-        target = model_path / relpath
-        target.parent.mkdir(parents=True, exist_ok=True)
-        ext = Path(relpath).suffix
-        content = DEFAULT_CONTENT.get(ext, DEFAULT_CONTENT[""])
-        if not target.exists():
-            target.write_text(content)
-            print(f"  ✓ Created {target.relative_to(model_path)} in {model_path.relative_to(Path('/workspaces/layout'))}")
-            changed = True
-    return changed
+def ensure_pattern(model_path: Path, plan: WritePlan):
+    """Plan any missing canonical files under model_path; returns the report lines (empty if unchanged)"""
+    return [f"  ✓ {'Refreshed' if plan.refreshed(model_path / relpath) else 'Created'} {relpath} "
+            f"in {model_path.relative_to(WORKSPACE_PATH)}"
+            for relpath in plan.ensure_pattern(model_path, CANONICAL_STRUCTURE, DEFAULT_CONTENT)]
 
-def validate_and_fix_workspace():
+def validate_and_fix_workspace(snapshot: WorkspaceSnapshot = None, jobs: int = 1, journal: Path = None,
+                               store: PlaceholderStore = None, targets: List[Path] = None, refresh: bool = False):
+    """Scaffold every target directory, or only `targets` (e.g. those a git diff touched); with refresh,
+    existing scaffold files are also brought up to the current template where their bytes differ"""
+    if snapshot is None:
+        snapshot = WorkspaceSnapshot(str(WORKSPACE_PATH), jobs=jobs, roots=targets)
     print("\n=== Validating and Fixing Workspace Directories ===")
-    for d in EXTRA_DIRS:
-        if not d.exists():
-            continue
-        print(f"\n{d.relative_to(Path('/workspaces/layout'))}/")
-        ensure_pattern(d)
+    # Planning is answered from the snapshot; all writes then go out as one batch (files on the pool)
+    plan = WritePlan(snapshot, store, refresh=refresh)
+    dirs = collect_target_dirs(snapshot) if targets is None else targets
+    report = [(f"\n{d.relative_to(WORKSPACE_PATH)}/", ensure_pattern(d, plan))
+              for d in dirs if snapshot.exists(d)]
+    return apply_and_report(plan, report, journal=journal, jobs=jobs)
 
 if __name__ == "__main__":
-    validate_and_fix_workspace()
+    profile_option(sys.argv)
+    journal = None
+    if "--journal" in sys.argv:
+        journal = default_journal_path(str(WORKSPACE_PATH))
+        undone = WritePlan.rollback_journal(journal)
+        if undone:
+            print(f"Rolled back {undone} entries left by an interrupted run")
+    targets = None
+    scope = scope_option(sys.argv)
+    if scope is not None:
+        try:
+            targets = scoped_target_dirs(changed_paths(str(WORKSPACE_PATH), *scope))
+        except GitScopeError as e:
+            print(f"✗ Cannot scope to {describe_scope(*scope)}: {e}")
+            sys.exit(2)
+        print(f"Scoped to {len(targets)} director(ies) with {describe_scope(*scope)}")
+    validate_and_fix_workspace(jobs=jobs_option(sys.argv), journal=journal,
+                               store=store_option(str(WORKSPACE_PATH), sys.argv), targets=targets,
+                               refresh="--refresh" in sys.argv)
     print("\nWorkspace pattern validation and correction complete.")
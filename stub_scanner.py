@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Placeholder Stub Scanner
+Classifies every Swift source of the models and components as placeholder, trivial or implemented with
+precompiled byte patterns over the raw file contents, and scores each root's completeness
+"""
+
+import mmap
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from cli_options import DEFAULT_WORKSPACE
+from findings import INFO, WARNING, Finding
+from instrumentation import CONTENT, phase
+from pattern_schema import DEFAULT_CONTENT
+from validate_pattern import owner_of, root_dir
+from workspace_snapshot import WorkspaceSnapshot
+
+PLACEHOLDER = "placeholder"    # nothing but comments and whitespace (the scaffolded "// ..." body)
+TRIVIAL = "trivial"            # code, but no members or statements: imports, empty declarations, typealiases
+IMPLEMENTED = "implemented"
+KINDS = (PLACEHOLDER, TRIVIAL, IMPLEMENTED)
+
+# Larger files are mapped rather than read; below this a read() is cheaper than setting up a mapping
+MMAP_THRESHOLD = 64 * 1024
+
+# Subdirectories holding Swift code; strings/*.swift hold plain text values, not sources
+CODE_DIRS = frozenset({"attributes", "collections", "operations", "types"})
+
+PLACEHOLDER_BODIES = frozenset({DEFAULT_CONTENT[".swift"].encode(), b""})
+
+_BLOCK_COMMENT = re.compile(rb"/\*.*?\*/", re.S)
+# A line with something on it that isn't a // comment (or a * continuation line of a block comment)
+_CODE_LINE = re.compile(rb"^[ \t]*(?!//|\*)\S", re.M)
+# A member declaration or statement outside a // comment
+_MEMBER = re.compile(rb"^[^/\n]*\b(?:func|init|deinit|subscript|var|let|case|return)\b", re.M)
+
+
+def classify(data) -> str:
+    """Kind of a Swift source given as bytes (or any buffer, e.g. an mmap)"""
+    if len(data) < 16 and bytes(data) in PLACEHOLDER_BODIES:
+        return PLACEHOLDER
+    if _CODE_LINE.search(data) is None:
+        return PLACEHOLDER
+    if b"/*" in data:
+        data = _BLOCK_COMMENT.sub(b"", data)
+        if _CODE_LINE.search(data) is None:
+            return PLACEHOLDER
+    if _MEMBER.search(data) is None:
+        return TRIVIAL
+    return IMPLEMENTED
+
+
+def classify_file(key: str, size: int) -> str:
+    with open(key, "rb") as f:
+        if size < MMAP_THRESHOLD:
+            return classify(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return classify(data)
+
+
+class StubFile(NamedTuple):
+    owner: str    # model name or component key
+    path: str     # relative to the owner's root
+    kind: str
+
+
+class StubScanner:
+    def __init__(self, base_path: str = DEFAULT_WORKSPACE, snapshot: Optional[WorkspaceSnapshot] = None,
+                 jobs: int = 1):
+        self.base_path = Path(base_path)
+        self.snapshot = snapshot or WorkspaceSnapshot(base_path, jobs=jobs)
+        self.jobs = jobs
+
+    def swift_files(self) -> Iterator[Tuple[str, int, str, str]]:
+        """(path, size, owner, path below the owner's root) of every Swift file in a model's or component's
+        code directories"""
+        for key, entry in self.snapshot.walk(self.base_path):
+            if entry.d_type != "file" or not key.endswith(".swift"):
+                continue
+            owner = owner_of(self.base_path, key)
+            if owner is None:
+                continue
+            root = root_dir(self.base_path, owner)
+            if not self.snapshot.is_dir(root):
+                continue  # a loose source next to the roots (widow/LayoutApp.swift), not part of one
+            rel = Path(key).relative_to(root)
+            if rel.parts[0] in CODE_DIRS:
+                yield key, entry.size, owner, str(rel)
+
+    def _classify(self, item: Tuple[str, int, str, str]) -> Optional[StubFile]:
+        key, size, owner, rel = item
+        with phase(CONTENT, timed=False):
+            try:
+                kind = classify_file(key, size)
+            except (OSError, ValueError):
+                return None
+        return StubFile(owner, rel, kind)
+
+    def scan(self) -> List[StubFile]:
+        """Every Swift file of every root, classified (on a pool of self.jobs threads)"""
+        items = list(self.swift_files())
+        with phase(CONTENT):
+            if self.jobs > 1:
+                with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                    results = list(pool.map(self._classify, items))
+            else:
+                results = [self._classify(item) for item in items]
+        return [result for result in results if result is not None]
+
+
+def completeness(files: List[StubFile]) -> Dict[str, Dict[str, int]]:
+    """owner -> count per kind (plus "total"), sorted by owner"""
+    scores: Dict[str, Dict[str, int]] = {}
+    for f in files:
+        counts = scores.setdefault(f.owner, dict.fromkeys(KINDS + ("total",), 0))
+        counts[f.kind] += 1
+        counts["total"] += 1
+    return dict(sorted(scores.items()))
+
+
+def score(counts: Dict[str, int]) -> float:
+    """Share of a root's Swift files that are implemented"""
+    return counts[IMPLEMENTED] / counts["total"] if counts["total"] else 1.0
+
+
+def stub_findings(files: List[StubFile]) -> Iterator[Finding]:
+    for f in files:
+        if f.kind == PLACEHOLDER:
+            yield Finding(f.owner, f.path, "placeholder-stub", WARNING, f"{f.owner}/{f.path}: Placeholder stub")
+        elif f.kind == TRIVIAL:
+            yield Finding(f.owner, f.path, "trivial-stub", INFO, f"{f.owner}/{f.path}: No members or statements")
+
+
+def format_report(files: List[StubFile]) -> str:
+    scores = completeness(files)
+    width = max((len(owner) for owner in scores), default=5)
+    lines = [f"{'root':<{width}}  {'score':>6}  {'impl':>5}  {'trivial':>7}  {'stub':>5}  {'total':>5}"]
+    for owner, counts in sorted(scores.items(), key=lambda item: (score(item[1]), item[0])):
+        lines.append(f"{owner:<{width}}  {score(counts):6.0%}  {counts[IMPLEMENTED]:5d}  {counts[TRIVIAL]:7d}  "
+                     f"{counts[PLACEHOLDER]:5d}  {counts['total']:5d}")
+    totals = {kind: sum(1 for f in files if f.kind == kind) for kind in KINDS}
+    lines.append(f"\nFiles: {len(files)} ({totals[IMPLEMENTED]} implemented, {totals[TRIVIAL]} trivial, "
+                 f"{totals[PLACEHOLDER]} placeholder) across {len(scores)} root(s)")
+    if files:
+        lines.append(f"Workspace completeness: {totals[IMPLEMENTED] / len(files):.0%}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import sys
+    from cli_options import jobs_option, optional_value
+    from findings import JsonlWriter, open_report
+    from instrumentation import profile_option
+
+    profile_option(sys.argv)
+    scanner = StubScanner(DEFAULT_WORKSPACE, jobs=jobs_option(sys.argv))
+    files = scanner.scan()
+
+    jsonl = optional_value(sys.argv, "--jsonl")
+    if jsonl is not None:
+        with open_report(jsonl) as stream:
+            writer = JsonlWriter(stream)
+            writer.write_all(stub_findings(files))
+        print(f"Findings: {writer.summary()}", file=sys.stderr)
+        exit(0)
+
+    print("=== Swift Stub Completeness ===\n")
+    print(format_report(files))
+    if "--list" in sys.argv:
+        print("\nNot implemented:")
+        for f in sorted(files):
+            if f.kind != IMPLEMENTED:
+                print(f"  {'·' if f.kind == TRIVIAL else '○'} {f.owner}/{f.path} ({f.kind})")
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Template Scaffolding by Tree Cloning
+Creates new projects and components by cloning a registered template tree (the canonical component layout,
+or an existing project) with reflinks, hardlinks or copy_file_range where available and batched writes of
+the template's cached bytes otherwise, then applies per-project property overrides as a thin layer on top
+"""
+
+import errno
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from cli_options import DEFAULT_WORKSPACE
+from instrumentation import WRITES, phase
+from pattern_schema import CANONICAL_STRUCTURE, DEFAULT_CONTENT, load_schema
+from placeholder_store import is_property_path, reflink
+from validation_cache import CACHE_DIR
+from workspace_snapshot import WorkspaceSnapshot
+from write_planner import write_if_changed
+
+REGISTRY_NAME = "templates.json"
+TEMPLATE_DIR = "templates"
+
+# The template every workspace has: what the scaffold fixers' ensure_pattern() creates in an empty directory
+COMPONENT_TEMPLATE = "component"
+
+# "auto" writes small files from the template's cached bytes (one open and write each, no source to open)
+# and clones larger ones by reflink, then copy_file_range; "reflink" tries a reflink for every file;
+# "hardlink" shares the template's inodes, so only use it where edits save by rename (property files are
+# edited in place, so they are copied as in "auto" instead); "copy" always writes
+MODES = ("auto", "reflink", "hardlink", "copy")
+
+# Below this a reflink or copy_file_range saves nothing: the data fits in one block either way
+SMALL_FILE = 64 * 1024
+
+# errnos meaning "this filesystem (pair) can't do that", as opposed to a real failure
+UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EINVAL, errno.ENOSYS,
+               errno.ENOTTY}
+
+
+def default_registry_path(base_path: str = DEFAULT_WORKSPACE) -> Path:
+    return Path(base_path) / CACHE_DIR / REGISTRY_NAME
+
+
+def override_path(key: str) -> str:
+    """Where an override lands below a cloned root: "style/opacity" is shorthand for
+    properties/style/opacity; any path with a properties segment (layout/widow/properties/WindowTitle) is
+    used as is"""
+    parts = key.strip("/").split("/")
+    if "properties" not in parts[:-1] and len(parts) == 2 and parts[0] in load_schema().properties_subdirs:
+        return "properties/" + "/".join(parts)
+    return "/".join(parts)
+
+
+class TemplateFile:
+    """One file of a template: its path, permission bits and (for small files) its bytes, read once"""
+    __slots__ = ("rel", "src", "size", "mode", "data")
+
+    def __init__(self, rel: str, src: str, size: int, mode: int, data: Optional[bytes]):
+        self.rel = rel
+        self.src = src
+        self.size = size
+        self.mode = mode
+        self.data = data
+
+
+class Template:
+    """A template tree loaded once: directories in creation order and files with cached small bodies"""
+
+    def __init__(self, name: str, root: Path):
+        self.name = name
+        self.root = root
+        snapshot = WorkspaceSnapshot(str(root))
+        cut = len(str(root)) + 1
+        self.dirs: List[str] = []
+        self.links: List[Tuple[str, str]] = []
+        self.files: List[TemplateFile] = []
+        for key, entry in snapshot.walk(root):
+            if key == str(root):
+                continue
+            rel = key[cut:]
+            if entry.d_type == "dir":
+                self.dirs.append(rel)
+            elif entry.d_type == "link":
+                self.links.append((rel, os.readlink(key)))
+            else:
+                mode = os.stat(key).st_mode & 0o777
+                data = None
+                if entry.size < SMALL_FILE:
+                    with open(key, "rb") as f:
+                        data = f.read()
+                self.files.append(TemplateFile(rel, key, entry.size, mode, data))
+        self.dirs.sort()  # parents before children
+
+
+class TemplateScaffolder:
+    def __init__(self, base_path: str = DEFAULT_WORKSPACE, mode: str = "auto", jobs: int = 1,
+                 snapshot: Optional[WorkspaceSnapshot] = None):
+        if mode not in MODES:
+            raise ValueError(f"unknown clone mode '{mode}' (choose from {', '.join(MODES)})")
+        self.base_path = Path(base_path)
+        self.mode = mode
+        self.jobs = jobs
+        self.snapshot = snapshot  # when given, kept in sync with everything created
+        self.registry_path = default_registry_path(base_path)
+        self.registry: Dict[str, str] = self._load_registry()
+        self.methods: Dict[str, int] = {}  # how files were created, for the report
+        self.overrides_written = 0
+        self._templates: Dict[str, Template] = {}
+        self._reflink_ok = mode in ("auto", "reflink")
+        self._copy_range_ok = hasattr(os, "copy_file_range")
+        self._lock = threading.Lock()
+
+    # Registry
+
+    def _load_registry(self) -> Dict[str, str]:
+        try:
+            return json.loads(self.registry_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def register(self, name: str, path: Path):
+        """Remember path (relative to the workspace when inside it) as template name"""
+        if name == COMPONENT_TEMPLATE:
+            raise ValueError(f"'{COMPONENT_TEMPLATE}' is the built-in canonical layout")
+        path = path.resolve()
+        if not path.is_dir():
+            raise ValueError(f"{path} is not a directory")
+        try:
+            stored = str(path.relative_to(self.base_path.resolve()))
+        except ValueError:
+            stored = str(path)
+        self.registry[name] = stored
+        self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.registry_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.registry, indent=1, sort_keys=True))
+        os.replace(tmp, self.registry_path)
+
+    def templates(self) -> Dict[str, Path]:
+        found = {COMPONENT_TEMPLATE: self.component_template()}
+        found.update((name, self.base_path / path) for name, path in sorted(self.registry.items()))
+        return found
+
+    def component_template(self) -> Path:
+        """The canonical layout as a real tree under .pattern_cache, rebuilt whenever the schema changes"""
+        root = self.base_path / CACHE_DIR / TEMPLATE_DIR / f"{COMPONENT_TEMPLATE}-{load_schema().fingerprint[:12]}"
+        if root.is_dir():
+            return root
+        tmp = root.with_name(f"{root.name}.{os.getpid()}.tmp")
+        for relpath in CANONICAL_STRUCTURE:
+            path = tmp / relpath
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(DEFAULT_CONTENT.get(path.suffix, DEFAULT_CONTENT[""]))
+        try:
+            os.rename(tmp, root)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)  # another run built it first
+        return root
+
+    def template(self, name: str) -> Template:
+        if name not in self._templates:
+            path = self.templates().get(name)
+            if path is None or not path.is_dir():
+                raise KeyError(f"no template '{name}' (see `template_scaffold.py list`)")
+            self._templates[name] = Template(name, path)
+        return self._templates[name]
+
+    # Cloning
+
+    def clone(self, name: str, dest: Path, overrides: Optional[Dict[str, str]] = None) -> int:
+        """Create dest as a copy of template name plus overrides; returns the number of files created
+
+        dest must not exist yet. On any failure everything created below dest is removed again.
+        """
+        template = self.template(name)
+        dest = Path(dest)
+        with phase(WRITES):
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            os.mkdir(dest)  # refuses an existing destination
+            try:
+                for rel in template.dirs:
+                    os.mkdir(dest / rel)
+                for rel, target in template.links:
+                    os.symlink(target, dest / rel)
+                if self.jobs > 1:
+                    with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                        list(pool.map(lambda f: self._clone_file(f, str(dest / f.rel)), template.files))
+                else:
+                    for f in template.files:
+                        self._clone_file(f, str(dest / f.rel))
+                for key, value in (overrides or {}).items():
+                    self.override(dest, key, value)
+            except BaseException:
+                shutil.rmtree(dest, ignore_errors=True)
+                raise
+        if self.snapshot is not None:
+            self.snapshot.scan(dest)
+        return len(template.files)
+
+    def clone_many(self, name: str, dests: List[Path], overrides: Optional[Dict[str, str]] = None) -> int:
+        """clone() into every destination; the template is walked and read only once
+
+        All or nothing: if one clone fails, the destinations already created are removed again.
+        """
+        created: List[Path] = []
+        try:
+            files = 0
+            for dest in dests:
+                files += self.clone(name, dest, overrides)
+                created.append(Path(dest))
+            return files
+        except BaseException:
+            for dest in created:
+                shutil.rmtree(dest, ignore_errors=True)
+                if self.snapshot is not None:
+                    self.snapshot.remove(dest)
+            raise
+
+    def _clone_file(self, f: TemplateFile, dst: str):
+        method = self._copy(f, dst)
+        with self._lock:
+            self.methods[method] = self.methods.get(method, 0) + 1
+
+    def _copy(self, f: TemplateFile, dst: str) -> str:
+        if self.mode == "hardlink" and not is_property_path(f.rel):
+            try:
+                os.link(f.src, dst)
+                return "hardlink"
+            except OSError as e:
+                if e.errno not in UNSUPPORTED and e.errno != errno.EMLINK:
+                    raise
+        elif self._reflink_ok and (self.mode == "reflink" or f.data is None):
+            try:
+                reflink(f.src, dst)
+                return "reflink"
+            except OSError as e:
+                if e.errno not in UNSUPPORTED:
+                    raise
+                self._reflink_ok = False  # not supported here; don't retry for every file
+        if f.data is not None and self.mode != "reflink":
+            return self._write(f.data, f.mode, dst)
+        if self._copy_range_ok:
+            try:
+                self._copy_range(f, dst)
+                return "copy_file_range"
+            except OSError as e:
+                if e.errno not in UNSUPPORTED:
+                    raise
+                self._copy_range_ok = False
+        if f.data is not None:
+            return self._write(f.data, f.mode, dst)
+        with open(f.src, "rb") as src, open(dst, "xb") as out:
+            shutil.copyfileobj(src, out)
+        os.chmod(dst, f.mode)
+        return "copy"
+
+    @staticmethod
+    def _write(data: bytes, mode: int, dst: str) -> str:
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        return "write"
+
+    @staticmethod
+    def _copy_range(f: TemplateFile, dst: str):
+        src_fd = os.open(f.src, os.O_RDONLY)
+        try:
+            dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, f.mode)
+            try:
+                remaining = f.size
+                while remaining > 0:
+                    copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            except OSError:
+                os.close(dst_fd)
+                os.unlink(dst)
+                raise
+            os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+
+    def override(self, dest: Path, key: str, value: str) -> bool:
+        """Set one property below a cloned root; True if written
+
+        Written by atomic rename, never in place, so a file that shares its data with the template (hardlink
+        or reflink) gets its own inode and the template itself is untouched.
+        """
+        path = dest / override_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        written = write_if_changed(str(path), (value.rstrip("\n") + "\n").encode())
+        if written:
+            with self._lock:
+                self.overrides_written += 1
+        return written
+
+    def summary(self) -> str:
+        methods = ", ".join(f"{n} {method}" for method, n in sorted(self.methods.items())) or "none"
+        return f"files by {methods}; {self.overrides_written} override(s) written"
+
+
+def parse_overrides(argv: List[str]) -> Dict[str, str]:
+    """--set KEY=VALUE (repeatable) and --overrides FILE.json ({"KEY": "VALUE"}), the latter first"""
+    overrides: Dict[str, str] = {}
+    for i, arg in enumerate(argv[:-1]):
+        if arg == "--overrides":
+            loaded = json.loads(Path(argv[i + 1]).read_text())
+            if not isinstance(loaded, dict):
+                raise ValueError(f"{argv[i + 1]}: overrides must be a JSON object of KEY: \"VALUE\"")
+            for key, value in loaded.items():
+                if not isinstance(value, str):
+                    raise ValueError(f"{argv[i + 1]}: override '{key}' must be a string, not {json.dumps(value)}")
+            overrides.update(loaded)
+    for i, arg in enumerate(argv[:-1]):
+        if arg == "--set":
+            key, sep, value = argv[i + 1].partition("=")
+            if not sep:
+                raise ValueError(f"--set needs KEY=VALUE, not '{argv[i + 1]}'")
+            overrides[key] = value
+    return overrides
+
+
+USAGE = """Usage: template_scaffold.py list
+       template_scaffold.py register NAME PATH
+       template_scaffold.py new TEMPLATE DEST [--names A,B,...] [--set KEY=VALUE]... [--overrides FILE.json]
+                                [--mode auto|reflink|hardlink|copy] [--jobs N]
+
+new clones TEMPLATE into DEST, or into DEST/<name> for each of --names. Built-in template: component
+(the canonical layout). KEY is a path below each clone, with category/name short for
+properties/category/name: --set style/opacity=0.9 --set layout/widow/properties/WindowTitle=MyApp"""
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from cli_options import jobs_option, option_value
+    from instrumentation import profile_option
+
+    profile_option(sys.argv)
+    valued = ("--names", "--set", "--overrides", "--mode", "--jobs", "-j", "--profile")
+    args = [a for i, a in enumerate(sys.argv[1:], 1) if not a.startswith("-") and sys.argv[i - 1] not in valued]
+    command = args[0] if args else ""
+    try:
+        scaffolder = TemplateScaffolder(DEFAULT_WORKSPACE, mode=option_value(sys.argv, "--mode", "auto"),
+                                        jobs=jobs_option(sys.argv))
+        if command == "list":
+            for name, path in scaffolder.templates().items():
+                print(f"{name:<16} {path}")
+        elif command == "register" and len(args) == 3:
+            scaffolder.register(args[1], Path(args[2]))
+            print(f"✓ Registered template '{args[1]}' → {scaffolder.registry[args[1]]}")
+        elif command == "new" and len(args) == 3:
+            dest = Path(args[2])
+            names = option_value(sys.argv, "--names")
+            dests = [dest / name for name in names.split(",") if name] if names else [dest]
+            existing = [str(d) for d in dests if os.path.lexists(d)]
+            if existing:
+                print(f"✗ Already exists: {', '.join(existing)}")
+                exit(2)
+            overrides = parse_overrides(sys.argv)
+            start = time.perf_counter()
+            files = scaffolder.clone_many(args[1], dests, overrides)
+            elapsed = time.perf_counter() - start
+            print(f"✓ Created {len(dests)} tree(s) from '{args[1]}' ({files} files) in {elapsed * 1000:.1f} ms")
+            print(f"  {scaffolder.summary()}")
+        else:
+            print(USAGE)
+            exit(2)
+    except (KeyError, ValueError, OSError) as e:
+        print(f"✗ {e.args[0] if isinstance(e, KeyError) else e}")
+        exit(1)
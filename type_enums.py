@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Unified Type Enum Generator
+Derives each unified model's <Prefix>Type enum from the sub-models in its plural directories
+(<Prefix>Models/ and <Prefix>Models.backup/) and rewrites a file only when its content changed
+"""
+
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from cli_options import DEFAULT_WORKSPACE
+from pattern_schema import load_schema
+from workspace_snapshot import WorkspaceSnapshot
+
+GENERATED_MARKER = "// Generated by type_enums.py"
+
+# Sub-models whose case can't be derived from their name (the old migration plan's irregular entries)
+LEGACY_CASES = {"TabsModel": "horizontal"}
+
+# Swift keywords that need backticks as case names
+SWIFT_KEYWORDS = {"default", "class", "struct", "enum", "protocol", "extension", "func", "var", "let", "case",
+                  "switch", "if", "else", "for", "while", "return", "import", "in", "is", "as", "self", "Type"}
+
+_CASE_LINE = re.compile(r"^\s*case\s+([^=(:\n]+?)\s*$", re.M)
+
+
+class EnumPlan(NamedTuple):
+    model: str                 # unified model, e.g. BarModel
+    path: Path                 # its types/<Prefix>Type.swift
+    cases: Dict[str, str]      # case -> sub-model directory it comes from, sorted by case
+    sources: List[str]         # plural directories read, relative to models/
+
+
+def plural_dirs(model: str) -> List[str]:
+    """The legacy directories of a unified model: BarModel -> BarModels, BarModels.backup"""
+    return [f"{model}s", f"{model}s.backup"]
+
+
+def declared_cases(source: str) -> List[str]:
+    """Case names declared in a Swift enum source (`case a`, `case a, b`), in order"""
+    cases = []
+    for match in _CASE_LINE.finditer(source):
+        for name in match.group(1).split(","):
+            name = name.strip().strip("`")
+            if name.isidentifier():
+                cases.append(name)
+    return cases
+
+
+def derive_case(prefix: str, submodel: str, known: List[str] = ()) -> str:
+    """Case name for a sub-model directory: PathBarModel -> path, ButtonsModel -> button
+
+    The unified model's prefix is dropped from the end (Bar, Tabs, ...), then a plural "s" unless the
+    enum already declares the plural form (breadcrumbs).
+    """
+    if submodel in LEGACY_CASES:
+        return LEGACY_CASES[submodel]
+    stem = submodel[:-len("Model")] if submodel.endswith("Model") else submodel
+    for suffix in (prefix + "s", prefix):
+        if len(stem) > len(suffix) and stem.lower().endswith(suffix.lower()):
+            stem = stem[:-len(suffix)]
+            break
+    name = stem[:1].lower() + stem[1:]
+    if name in known:
+        return name
+    if name.endswith("s") and not name.endswith("ss") and len(name) > 1:
+        return name[:-1]
+    return name
+
+
+def swift_name(case: str) -> str:
+    return f"`{case}`" if case in SWIFT_KEYWORDS else case
+
+
+def render(prefix: str, cases: Dict[str, str], sources: List[str]) -> str:
+    """The generated <Prefix>Type.swift"""
+    lines = [
+        f"{GENERATED_MARKER} from models/{', models/'.join(sources)}.",
+        "// Add or remove a sub-model directory and re-run the generator instead of editing this file.",
+        "import Foundation",
+        "",
+        f"/// {prefix} types, one per sub-model of the unified {prefix}Model",
+        "@available(iOS 13.0, tvOS 13.0, macOS 10.15, visionOS 1.0, watchOS 6.0, *)",
+        f"public enum {prefix}Type: String, CaseIterable, Hashable, Codable {{",
+    ]
+    lines += [f"    case {swift_name(case)}" for case in cases]
+    lines += [
+        "    ",
+        "    /// Legacy sub-model this type was migrated from",
+        "    public var submodel: String {",
+        "        switch self {",
+    ]
+    for case, submodel in cases.items():
+        lines += [f"        case .{swift_name(case)}:", f"            return \"{submodel}\""]
+    lines += ["        }", "    }", "}", ""]
+    return "\n".join(lines)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+class TypeEnumGenerator:
+    def __init__(self, base_path: str = DEFAULT_WORKSPACE, snapshot: Optional[WorkspaceSnapshot] = None):
+        self.base_path = Path(base_path)
+        self.models_path = self.base_path / "models"
+        self.snapshot = snapshot or WorkspaceSnapshot(base_path)
+        self.schema = load_schema()
+
+    def unified_models(self) -> List[str]:
+        return sorted(name for name in self.snapshot.subdirs(self.models_path) if name.endswith("Model"))
+
+    def enum_path(self, model: str) -> Path:
+        return self.models_path / model / self.schema.type_path(model)
+
+    def declared(self, model: str) -> List[str]:
+        """Cases the model's enum on disk declares ([] if it has none)"""
+        path = self.enum_path(model)
+        if not self.snapshot.is_file(path):
+            return []
+        try:
+            return declared_cases(path.read_text(encoding="utf-8"))
+        except (OSError, UnicodeDecodeError):
+            return []
+
+    def plan(self, model: str) -> Optional[EnumPlan]:
+        """What the model's enum should contain, or None if it has no plural directories"""
+        prefix = model[:-len("Model")]
+        path = self.enum_path(model)
+        known = self.declared(model)
+        cases: Dict[str, str] = {}
+        sources = []
+        for plural in plural_dirs(model):
+            submodels = [name for name in self.snapshot.subdirs(self.models_path / plural) if name.endswith("Model")]
+            if not submodels:
+                continue
+            sources.append(plural)
+            for submodel in sorted(submodels):
+                # The live directory wins over its backup when both hold the same sub-model
+                cases.setdefault(derive_case(prefix, submodel, known), submodel)
+        if not cases:
+            return None
+        return EnumPlan(model, path, dict(sorted(cases.items())), sources)
+
+    def sync(self, plan: EnumPlan, dry_run: bool = False) -> str:
+        """Bring one enum file up to date; returns "created", "updated", "unchanged" or "hand-maintained"
+
+        Files without the generated marker are hand-written enums with their own members; they are never
+        overwritten, only compared (see missing_cases()).
+        """
+        content = render(plan.model[:-len("Model")], plan.cases, plan.sources).encode()
+        try:
+            current = plan.path.read_bytes()
+        except FileNotFoundError:
+            current = None
+        if current is not None and not current.startswith(GENERATED_MARKER.encode()):
+            return "hand-maintained"
+        # Compare hashes rather than rewriting: an untouched file keeps its mtime, so SwiftPM doesn't rebuild
+        if current is not None and content_hash(current) == content_hash(content):
+            return "unchanged"
+        if not dry_run:
+            plan.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = plan.path.with_name(plan.path.name + ".tmp")
+            tmp.write_bytes(content)
+            os.replace(tmp, plan.path)
+            self.snapshot.record_file(plan.path, len(content))
+        return "created" if current is None else "updated"
+
+    def missing_cases(self, plan: EnumPlan) -> List[str]:
+        """Cases derived from sub-models that the enum on disk doesn't declare"""
+        declared = set(self.declared(plan.model))
+        return [case for case in plan.cases if case not in declared]
+
+    def run(self, dry_run: bool = False) -> Dict[str, int]:
+        """Sync every unified model's enum, printing one line per model; returns counts by outcome
+        (sync()'s, with hand-maintained enums that lack a sub-model counted as "drifted")"""
+        counts: Dict[str, int] = {}
+        for model in self.unified_models():
+            plan = self.plan(model)
+            if plan is None:
+                continue
+            outcome = self.sync(plan, dry_run)
+            name = plan.path.name
+            if outcome == "hand-maintained":
+                missing = self.missing_cases(plan)
+                if missing:
+                    outcome = "drifted"
+                    detail = ", ".join(f".{case} ({plan.cases[case]})" for case in missing)
+                    print(f"  ⚠ {model}/{name}: hand-maintained, lacks {detail}")
+                else:
+                    print(f"  ✓ {model}/{name}: hand-maintained, covers all {len(plan.cases)} sub-models")
+            elif outcome == "unchanged":
+                print(f"  ✓ {model}/{name}: up to date")
+            else:
+                verb = outcome[:-1] if dry_run else outcome.capitalize()
+                note = "[DRY RUN] Would " if dry_run else ""
+                print(f"  ✓ {note}{verb} {model}/{name} ({len(plan.cases)} cases from {', '.join(plan.sources)})")
+            counts[outcome] = counts.get(outcome, 0) + 1
+        return counts
+
+
+if __name__ == "__main__":
+    import sys
+
+    # --check (CI) only reports, and fails while an enum is stale or a hand-maintained one lacks a sub-model
+    check = "--check" in sys.argv
+    generator = TypeEnumGenerator(DEFAULT_WORKSPACE)
+    print("=== Unified Type Enums ===\n")
+    counts = generator.run(dry_run=check or "--dry-run" in sys.argv)
+    print(f"\n{', '.join(f'{n} {outcome}' for outcome, n in sorted(counts.items())) or 'No plural directories'}")
+    if check:
+        exit(1 if counts.get("created") or counts.get("updated") or counts.get("drifted") else 0)
@@ -5,21 +5,42 @@ Ensures all models follow the same structure and naming conventions
 """
 
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from cli_options import DEFAULT_WORKSPACE, jobs_option, optional_value
+from findings import ERROR, WARNING, Finding, FindingTable, JsonlWriter, message_format, open_report
+from git_scope import GitScopeError, changed_paths, describe_scope, owning_roots, scope_option
+from instrumentation import NAMING, OPERATIONS, PROPERTIES, STRUCTURE, phase, profile_option
+from pattern_schema import load_schema, relpaths
+from property_matrix import PropertyMatrix
+from validation_cache import ValidationCache, rules_fingerprint
+from workspace_snapshot import WorkspaceSnapshot
 
 class PatternValidator:
-    def __init__(self, base_path: str = "/workspaces/layout"):
+    def __init__(self, base_path: str = DEFAULT_WORKSPACE, snapshot: Optional[WorkspaceSnapshot] = None,
+                 cache: Optional[ValidationCache] = None, jobs: int = 1):
         self.base_path = Path(base_path)
         self.models_path = self.base_path / "models"
-        self.errors = []
-        self.warnings = []
+        self.jobs = jobs
+        self.cache = cache
+        # Given a cache and no snapshot, a root is indexed only when its cache entry can't be reused as is
+        self.lazy = snapshot is None and cache is not None and not cache.content_hash
+        self.snapshot = snapshot or WorkspaceSnapshot(base_path, jobs=jobs, roots=[] if self.lazy else None)
+        self._indexed: Set[str] = set()   # roots scanned on demand (lazy mode)
+        self._unscanned: Set[str] = set() # roots answered from the cache without indexing them
+        self._scan_lock = threading.Lock()
+        self.findings = FindingTable()
+        self._paths: Dict[str, Tuple[int, Set[str], Set[str]]] = {}
         
-    # Expected structure for all models
+    # Expected structure for all models (the rules themselves live in pattern_schema)
+    SCHEMA = load_schema()
     EXPECTED_STRUCTURE = {
-        "subdirectories": ["properties", "attributes", "operations", "types", "strings", "collections"],
-        "properties_subdirs": ["layout", "style", "content", "behavior"],
-        "operations": ["Create.swift", "Read.swift", "Update.swift", "Delete.swift", "Toggle.swift", "Validate.swift"],
+        "subdirectories": list(SCHEMA.subdirectories),
+        "properties_subdirs": list(SCHEMA.properties_subdirs),
+        "operations": list(SCHEMA.operations),
     }
     
     # Common properties all models should have
@@ -29,84 +50,160 @@ class PatternValidator:
         "behavior": []  # Varies by model type
     }
     
-    # Naming conventions
-    NAMING_PATTERNS = {
-        "attributes": lambda model: f"{model}*.swift",
-        "operations": lambda model: "*.swift",
-        "types": lambda model: f"{model}*.swift",
-        "strings": lambda model: "*.swift",
-        "collections": lambda model: "*.swift",
-    }
-    
     def get_models(self) -> List[str]:
         """Get all model directories"""
-        models = []
-        if self.models_path.exists():
-            for item in self.models_path.iterdir():
-                if item.is_dir() and item.name.endswith("Model"):
-                    models.append(item.name)
+        if self.lazy:
+            self.snapshot.index_dir(self.models_path)
+        models = [name for name in self.snapshot.subdirs(self.models_path) if name.endswith("Model")]
         return sorted(models)
     
-    def validate_directory_structure(self, model: str) -> bool:
-        """Validate model has all required subdirectories"""
-        model_path = self.models_path / model
-        valid = True
+    def get_components(self) -> List[str]:
+        """Component roots (layout/components/*, widow/*) as workspace-relative keys"""
+        components = []
+        for parent in ("layout/components", "widow"):
+            if self.lazy:
+                self.snapshot.index_dir(self.base_path / parent)
+            for name in self.snapshot.subdirs(self.base_path / parent):
+                # layout/components/models holds legacy sub-models, not a UI component
+                if parent == "layout/components" and name == "models":
+                    continue
+                components.append(f"{parent}/{name}")
+        return components
+    
+    def model_dir(self, model: str) -> Path:
+        """Directory of a model name (models/<model>) or of a workspace-relative component key"""
+        return root_dir(self.base_path, model)
+    
+    def index_root(self, model: str):
+        """Scan a root the lazy snapshot hasn't indexed yet"""
+        with self._scan_lock:
+            if model not in self._indexed:
+                self.snapshot.scan(self.model_dir(model))
+                self._indexed.add(model)
+    
+    def model_paths(self, model: str) -> Tuple[Set[str], Set[str]]:
+        """(relative paths, relative file paths) under a model or component, memoized until the snapshot changes"""
+        cached = self._paths.get(model)
+        if cached is None or cached[0] != self.snapshot.generation:
+            generation = self.snapshot.generation
+            cached = (generation,) + relpaths(self.snapshot, self.model_dir(model))
+            self._paths[model] = cached
+        return cached[1], cached[2]
+    
+    def structure_findings(self, model: str) -> Iterator[Finding]:
+        """Missing required subdirectories, from one set difference against the schema"""
+        present, _ = self.model_paths(model)
+        missing = self.SCHEMA.required_dirs - present
+        if not missing:
+            return
         
-        for subdir in self.EXPECTED_STRUCTURE["subdirectories"]:
-            path = model_path / subdir
-            if not path.exists():
-                self.errors.append(f"{model}: Missing subdirectory '{subdir}'")
-                valid = False
+        for subdir in self.SCHEMA.subdirectories:
+            if subdir in missing:
+                yield Finding(model, subdir, "missing-dir", ERROR, None)
         
         # Check properties subdirectories
-        props_path = model_path / "properties"
-        if props_path.exists():
-            for subdir in self.EXPECTED_STRUCTURE["properties_subdirs"]:
-                path = props_path / subdir
-                if not path.exists():
-                    self.errors.append(f"{model}: Missing properties/{subdir}")
-                    valid = False
-        
-        return valid
+        if "properties" in present:
+            for subdir in self.SCHEMA.properties_subdirs:
+                if f"properties/{subdir}" in missing:
+                    yield Finding(model, f"properties/{subdir}", "missing-dir", ERROR, None)
     
-    def validate_operations(self, model: str) -> bool:
-        """Validate all required operations exist"""
-        ops_path = self.models_path / model / "operations"
-        valid = True
+    def operations_findings(self, model: str) -> Iterator[Finding]:
+        """Required operations absent from operations/"""
+        present, files = self.model_paths(model)
         
-        if ops_path.exists():
-            existing = set(f.name for f in ops_path.iterdir() if f.is_file())
-            required = set(self.EXPECTED_STRUCTURE["operations"])
-            
-            missing = required - existing
+        if "operations" in present:
+            missing = self.SCHEMA.required_operations - files
             if missing:
-                self.errors.append(f"{model}/operations: Missing {missing}")
-                valid = False
+                # Sorted so the message is identical from run to run
+                names = sorted(path.split("/", 1)[1] for path in missing)
+                yield Finding(model, "operations", "missing-operation", ERROR, names)
+    
+    def types_findings(self, model: str) -> Iterator[Finding]:
+        """The model's <Prefix>Type.swift, if it has a types/ directory"""
+        present, _ = self.model_paths(model)
         
-        return valid
+        if "types" in present:
+            type_path = self.SCHEMA.type_path(Path(model).name)
+            if type_path not in present:
+                yield Finding(model, type_path, "missing-type", ERROR, None)
+    
+    def naming_findings(self, model: str) -> Iterator[Finding]:
+        """Files whose names break the naming convention of their directory"""
+        _, files = self.model_paths(model)
+        for relpath in self.SCHEMA.naming_violations(Path(model).name, files):
+            yield Finding(model, relpath, "naming", WARNING, None)
+    
+    def model_findings(self, model: str) -> Iterator[Finding]:
+        """Every per-model finding, errors first"""
+        # Each check runs to completion inside its phase, so a profile doesn't bill the consumer's time to it
+        with phase(STRUCTURE):
+            found = list(self.structure_findings(model))
+        with phase(OPERATIONS):
+            found += self.operations_findings(model)
+        with phase(STRUCTURE):
+            found += self.types_findings(model)
+        with phase(NAMING):
+            found += self.naming_findings(model)
+        yield from found
+    
+    def component_findings(self, component: str) -> Iterator[Finding]:
+        """model_findings for a component root, which has no <Prefix>Type.swift"""
+        with phase(STRUCTURE):
+            found = list(self.structure_findings(component))
+        with phase(OPERATIONS):
+            found += self.operations_findings(component)
+        with phase(NAMING):
+            found += self.naming_findings(component)
+        yield from found
+    
+    def owner_of(self, path: str) -> Optional[str]:
+        """Model name or component key whose root contains path, or None if no validated root does"""
+        return owner_of(self.base_path, path)
+    
+    @property
+    def errors(self) -> List[str]:
+        """Messages of the errors recorded so far"""
+        return [finding.message for finding in self.findings if finding.severity == ERROR]
     
-    def validate_types(self, model: str) -> bool:
+    @property
+    def warnings(self) -> List[str]:
+        """Messages of everything else recorded so far"""
+        return [finding.message for finding in self.findings if finding.severity != ERROR]
+    
+    def _record(self, findings: Iterable[Finding], errors: Optional[List[str]]) -> bool:
+        """Append the messages of findings to errors (default: the findings to self.findings); True if
+        there were none"""
+        if errors is None:
+            count = len(self.findings)
+            self.findings.extend(findings)
+            return len(self.findings) == count
+        count = len(errors)
+        errors.extend(finding.message for finding in findings)
+        return len(errors) == count
+    
+    def validate_directory_structure(self, model: str, errors: Optional[List[str]] = None) -> bool:
+        """Validate model has all required subdirectories"""
+        return self._record(self.structure_findings(model), errors)
+    
+    def validate_operations(self, model: str, errors: Optional[List[str]] = None) -> bool:
+        """Validate all required operations exist"""
+        return self._record(self.operations_findings(model), errors)
+    
+    def validate_types(self, model: str, errors: Optional[List[str]] = None) -> bool:
         """Validate model has its Type definition"""
-        types_path = self.models_path / model / "types"
-        valid = True
-        
-        if types_path.exists():
-            model_prefix = model.replace("Model", "")
-            type_file = f"{model_prefix}Type.swift"
-            
-            if not (types_path / type_file).exists():
-                self.errors.append(f"{model}/types: Missing {type_file}")
-                valid = False
-        
-        return valid
+        return self._record(self.types_findings(model), errors)
+    
+    def naming_warnings(self, model: str) -> List[str]:
+        """Files whose names break the naming convention of their directory"""
+        return [finding.message for finding in self.naming_findings(model)]
     
     def validate_strings_consistency(self, model: str) -> bool:
         """Check strings follow naming conventions"""
-        strings_path = self.models_path / model / "types"
+        strings_path = self.model_dir(model) / "types"
         valid = True
         
-        if strings_path.exists():
-            files = [f.name for f in strings_path.iterdir() if f.is_file()]
+        if self.snapshot.exists(strings_path):
+            files = self.snapshot.files(strings_path)
             
             # All strings files should be plain text or have consistent naming
             for f in files:
@@ -116,22 +213,179 @@ class PatternValidator:
         
         return valid
     
-    def compare_properties_across_models(self) -> Dict[str, Set[str]]:
+    def compare_properties_across_models(self) -> Dict[str, PropertyMatrix]:
         """Compare properties across all models to find inconsistencies"""
         models = self.get_models()
         comparison = {}
         
-        for prop_type in self.EXPECTED_STRUCTURE["properties_subdirs"]:
-            comparison[prop_type] = {}
-            
-            for model in models:
-                path = self.models_path / model / "properties" / prop_type
-                if path.exists():
-                    files = set(f.name for f in path.iterdir() if f.is_file())
-                    comparison[prop_type][model] = files
+        with phase(PROPERTIES):
+            for prop_type in self.EXPECTED_STRUCTURE["properties_subdirs"]:
+                # Only models that have this category take part in its comparison
+                listings = {model: self.property_files(model, prop_type) for model in models}
+                present = [model for model in models if listings[model] is not None]
+                matrix = PropertyMatrix(present)
+                for model in present:
+                    matrix.add(model, listings[model])
+                comparison[prop_type] = matrix
         
         return comparison
     
+    def property_files(self, model: str, prop_type: str) -> Optional[List[str]]:
+        """Files in a model's properties/<prop_type> (None if it lacks the category), from the cache for a
+        model whose entry was reused without indexing it"""
+        if model in self._unscanned:
+            return self.cache.stored(model, "properties").get(prop_type)
+        if self.lazy:
+            self.index_root(model)
+        path = self.models_path / model / "properties" / prop_type
+        return self.snapshot.files(path) if self.snapshot.exists(path) else None
+    
+    def reuse_data(self, model: str) -> Dict:
+        """Extra cache fields that let a later run answer for a root without indexing it: its directory
+        mtimes and, for a model, its property listings (empty if the mtimes can't be trusted)"""
+        dirs = self.cache.tree_dirs(self.snapshot, self.model_dir(model))
+        if dirs is None:
+            return {}
+        if "/" in model:
+            return {"dirs": dirs}
+        root = self.model_dir(model) / "properties"
+        properties = {prop_type: self.snapshot.files(root / prop_type) for prop_type in self.SCHEMA.properties_subdirs
+                      if self.snapshot.exists(root / prop_type)}
+        return {"dirs": dirs, "properties": properties}
+    
+    def incomplete_findings(self, prop_type: str, matrix: PropertyMatrix) -> Iterator[Finding]:
+        """One workspace-level warning per property of a category that not every model has"""
+        for prop in matrix.incomplete():
+            yield Finding("", f"properties/{prop_type}/{prop}", "property-incomplete", WARNING,
+                          matrix.missing_from(prop))
+    
+    def collect_property_warnings(self) -> List[str]:
+        """The property-consistency warnings validate_all() reports, without printing anything"""
+        return [finding.message for prop_type, matrix in self.compare_properties_across_models().items()
+                for finding in self.incomplete_findings(prop_type, matrix)]
+    
+    def validate_model(self, model: str) -> Tuple[bool, List[str]]:
+        """Run the per-model checks, returning (valid, errors) without touching self.findings"""
+        errors = []
+        valid = True
+        valid &= self.validate_directory_structure(model, errors)
+        valid &= self.validate_operations(model, errors)
+        valid &= self.validate_types(model, errors)
+        return valid, errors
+    
+    def validate_component(self, component: str) -> Tuple[bool, List[str]]:
+        """Structure and operations checks for a component root (components have no <Prefix>Type.swift)"""
+        errors = []
+        valid = True
+        valid &= self.validate_directory_structure(component, errors)
+        valid &= self.validate_operations(component, errors)
+        return valid, errors
+    
+    def run_checks(self, model: str) -> List[Finding]:
+        """model_findings (component_findings for a component key) as a list"""
+        check = self.component_findings if "/" in model else self.model_findings
+        try:
+            return list(check(model))
+        finally:
+            # The relative paths are only needed while the root is checked, with or without a cache
+            self._paths.pop(model, None)
+    
+    def findings_cached(self, model: str) -> Tuple[List[Finding], bool]:
+        """model_findings (component_findings for a component key) as a list, reused from the cache when
+        the root's tree signature is unchanged"""
+        if self.cache is None:
+            return self.run_checks(model), False
+        if self.lazy:
+            cached = self.cache.lookup_unchanged(model, self.model_dir(model))
+            if cached is not None:
+                self._unscanned.add(model)
+                _, errors, warnings = cached
+                return [Finding(*record) for record in errors + warnings], True
+            self.index_root(model)
+        signature = self.cache.signature(self.snapshot, self.model_dir(model))
+        cached = self.cache.lookup(model, signature)
+        if cached is not None:
+            valid, errors, warnings = cached
+            if self.cache.stored(model, "dirs") is None:
+                # Entries from before directory mtimes were stored, or stored while a directory was too fresh
+                self.cache.store(model, signature, valid, errors, warnings, **self.reuse_data(model))
+            return [Finding(*record) for record in errors + warnings], True
+        findings = self.run_checks(model)
+        errors = [f for f in findings if f.severity == ERROR]
+        warnings = [f for f in findings if f.severity != ERROR]
+        self.cache.store(model, signature, not errors, errors, warnings, **self.reuse_data(model))
+        return findings, False
+    
+    def validate_model_cached(self, model: str) -> Tuple[bool, List[str], List[str], bool]:
+        """validate_model plus naming warnings as message lists, with the cache's from-cache flag"""
+        findings, from_cache = self.findings_cached(model)
+        errors = [f.message for f in findings if f.severity == ERROR]
+        warnings = [f.message for f in findings if f.severity != ERROR]
+        return not errors, errors, warnings, from_cache
+    
+    def property_findings(self) -> Iterator[Finding]:
+        """One warning per model lacking a property that other models in its category have"""
+        for prop_type, matrix in self.compare_properties_across_models().items():
+            for prop in matrix.incomplete():
+                coverage = matrix.coverage(prop)
+                for model in matrix.missing_from(prop):
+                    yield Finding(model, f"properties/{prop_type}/{prop}", "property-consistency", WARNING, coverage)
+    
+    def iter_findings(self, keys: Optional[List[str]] = None) -> Iterator[Finding]:
+        """Every finding of validate_all(), yielded as each model is checked instead of collected
+
+        With keys (model names and component keys, e.g. from a git diff) only those roots are checked,
+        and the cross-model property comparison is skipped.
+        """
+        models = self.get_models() if keys is None else [k for k in keys if self.snapshot.is_dir(self.model_dir(k))]
+        pool = ThreadPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else None
+        try:
+            results = pool.map(self.findings_cached, models) if pool else map(self.findings_cached, models)
+            for findings, _ in results:
+                yield from findings
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        
+        if self.cache is not None:
+            if keys is None:
+                self.cache.prune(models)
+            self.cache.save()
+        
+        if keys is None:
+            yield from self.property_findings()
+    
+    def stream_jsonl(self, stream: IO[str], keys: Optional[List[str]] = None) -> JsonlWriter:
+        """Write iter_findings() to stream as JSON Lines; returns the writer with its per-severity counts"""
+        writer = JsonlWriter(stream)
+        writer.write_all(self.iter_findings(keys))
+        return writer
+    
+    def validate_scope(self, keys: List[str], description: str) -> bool:
+        """validate_all() restricted to the given model/component roots, e.g. those touched by a git diff"""
+        print(f"Validating {len(keys)} root(s) with {description}\n")
+        
+        all_valid = True
+        for key in keys:
+            if not self.snapshot.is_dir(self.model_dir(key)):
+                print(f"  - {key} removed")
+                continue
+            findings, from_cache = self.findings_cached(key)
+            self.findings.extend(findings)
+            note = " (cached)" if from_cache else ""
+            
+            if not any(f.severity == ERROR for f in findings):
+                print(f"  ✓ {key} structure valid{note}")
+            else:
+                print(f"  ✗ {key} has errors{note}")
+                all_valid = False
+        
+        if self.cache is not None:
+            self.cache.save()
+        
+        self.print_summary()
+        return all_valid
+    
     def validate_all(self) -> bool:
         """Run all validations"""
         models = self.get_models()
@@ -139,56 +393,171 @@ class PatternValidator:
         
         all_valid = True
         
-        for model in models:
+        # Models are independent, so they can be checked on a pool; map() keeps sorted order
+        if self.jobs > 1:
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                results = list(pool.map(self.findings_cached, models))
+        else:
+            results = map(self.findings_cached, models)
+        
+        for model, (findings, from_cache) in zip(models, results):
             print(f"Validating {model}...")
-            valid = True
-            valid &= self.validate_directory_structure(model)
-            valid &= self.validate_operations(model)
-            valid &= self.validate_types(model)
+            self.findings.extend(findings)
+            note = " (cached)" if from_cache else ""
             
-            if valid:
-                print(f"  ✓ {model} structure valid")
+            if not any(f.severity == ERROR for f in findings):
+                print(f"  ✓ {model} structure valid{note}")
             else:
-                print(f"  ✗ {model} has errors")
+                print(f"  ✗ {model} has errors{note}")
                 all_valid = False
         
+        if self.cache is not None:
+            self.cache.prune(models)
+            self.cache.save()
+        
         print("\n=== Property Comparison ===")
         comparison = self.compare_properties_across_models()
         
-        for prop_type, models_data in comparison.items():
+        for prop_type, matrix in comparison.items():
             print(f"\n{prop_type}:")
-            all_props = set()
-            for model, props in models_data.items():
-                all_props.update(props)
             
-            # Show which models have which properties
-            for prop in sorted(all_props):
-                models_with_prop = [m for m, ps in models_data.items() if prop in ps]
-                models_without_prop = [m for m, ps in models_data.items() if prop not in ps]
-                
-                if models_without_prop:
-                    print(f"  {prop}: Missing from {', '.join(models_without_prop)}")
-                    self.warnings.append(f"Property '{prop}' not in all models (missing from {models_without_prop})")
-        
-        # Print summary
+            # Show which models lack each property that isn't universal
+            for prop in matrix.incomplete():
+                models_without_prop = matrix.missing_from(prop)
+                print(f"  {prop}: Missing from {', '.join(models_without_prop)} ({matrix.coverage(prop):.0%} coverage)")
+            self.findings.extend(self.incomplete_findings(prop_type, matrix))
+            
+            # Models lacking properties that most of their peers have are the likely mistakes
+            for model, props in sorted(matrix.outliers().items()):
+                print(f"  ⚠ Outlier {model}: lacks {', '.join(props)}")
+        
+        self.print_summary()
+        return all_valid and self.findings.count(ERROR) == 0
+    
+    def print_summary(self):
+        errors = self.findings.count(ERROR)
+        warnings = len(self.findings) - errors
         print(f"\n=== Summary ===")
-        print(f"Errors: {len(self.errors)}")
-        print(f"Warnings: {len(self.warnings)}")
+        print(f"Errors: {errors}")
+        print(f"Warnings: {warnings}")
         
-        if self.errors:
+        # Messages are rendered here, one at a time, rather than held for the whole run
+        if errors:
             print("\nErrors:")
-            for error in self.errors:
-                print(f"  ✗ {error}")
+            for finding in self.findings:
+                if finding.severity == ERROR:
+                    print(f"  ✗ {finding.message}")
         
-        if self.warnings:
+        if warnings:
             print("\nWarnings:")
-            for warning in self.warnings:
-                print(f"  ⚠ {warning}")
-        
-        return all_valid and len(self.errors) == 0
+            for finding in self.findings:
+                if finding.severity != ERROR:
+                    print(f"  ⚠ {finding.message}")
+
+@message_format("missing-dir")
+def _missing_dir(finding: Finding) -> str:
+    if finding.path.startswith("properties/"):
+        return f"{finding.model}: Missing {finding.path}"
+    return f"{finding.model}: Missing subdirectory '{finding.path}'"
+
+@message_format("missing-operation")
+def _missing_operation(finding: Finding) -> str:
+    return f"{finding.model}/operations: Missing {{{', '.join(repr(m) for m in finding.detail)}}}"
+
+@message_format("missing-type")
+def _missing_type(finding: Finding) -> str:
+    return f"{finding.model}/types: Missing {finding.path.split('/', 1)[1]}"
+
+@message_format("naming")
+def _naming(finding: Finding) -> str:
+    return f"{finding.model}/{finding.path}: Name doesn't follow the naming convention"
+
+@message_format("property-consistency")
+def _property_consistency(finding: Finding) -> str:
+    prop = finding.path.rsplit("/", 1)[1]
+    return f"{finding.model}: Property '{prop}' missing ({finding.detail:.0%} of models have it)"
+
+@message_format("property-incomplete")
+def _property_incomplete(finding: Finding) -> str:
+    prop = finding.path.rsplit("/", 1)[1]
+    return f"Property '{prop}' not in all models (missing from {list(finding.detail)})"
+
+def root_dir(base_path: Path, key: str) -> Path:
+    """Directory of a model name (models/<model>) or of a workspace-relative component key"""
+    if "/" in key:
+        return base_path / key
+    return base_path / "models" / key
+
+def owner_of(base_path: Path, path: str) -> Optional[str]:
+    """Model name or component key (layout/components/<name>, widow/<name>) that owns path, if any"""
+    try:
+        parts = Path(path).relative_to(base_path).parts
+    except ValueError:
+        return None
+    if len(parts) >= 2 and parts[0] == "models" and parts[1].endswith("Model"):
+        return parts[1]
+    if len(parts) >= 3 and parts[:2] == ("layout", "components") and parts[2] != "models":
+        return "/".join(parts[:3])
+    if len(parts) >= 2 and parts[0] == "widow":
+        return "/".join(parts[:2])
+    return None
+
+def make_cache(base_path: str = DEFAULT_WORKSPACE, content_hash: bool = False) -> ValidationCache:
+    """Validation cache whose entries are invalidated whenever the validator's rules change"""
+    rules = rules_fingerprint(PatternValidator.SCHEMA.fingerprint)
+    return ValidationCache(base_path, rules_key=rules, content_hash=content_hash)
 
 if __name__ == "__main__":
-    validator = PatternValidator()
-    valid = validator.validate_all()
+    import sys
+    
+    base_path = DEFAULT_WORKSPACE
+    profile_option(sys.argv)
+    
+    jsonl = optional_value(sys.argv, "--jsonl")
+    
+    if "--watch" in sys.argv:
+        from pattern_watch import PatternWatch
+        try:
+            PatternWatch(PatternValidator(base_path, jobs=jobs_option(sys.argv))).run()
+        except OSError as e:
+            print(f"✗ Watch mode unavailable: {e}")
+            exit(1)
+        exit(0)
+    
+    cache = None
+    if "--no-cache" not in sys.argv:
+        cache = make_cache(base_path, content_hash="--hash" in sys.argv)
+    
+    scope = scope_option(sys.argv)
+    keys = None
+    snapshot = None
+    if scope is not None:
+        # Only index and check the roots the diff touched; loose files (widow/*.swift) own no root
+        try:
+            changed = changed_paths(base_path, *scope)
+        except GitScopeError as e:
+            print(f"✗ Cannot scope to {describe_scope(*scope)}: {e}")
+            exit(2)
+        base = Path(base_path)
+        keys = [k for k in owning_roots(changed, lambda p: owner_of(base, p)) if not root_dir(base, k).is_file()]
+        roots = [root_dir(base, k) for k in keys if root_dir(base, k).is_dir()]
+        snapshot = WorkspaceSnapshot(base_path, jobs=jobs_option(sys.argv), roots=roots)
+    
+    validator = PatternValidator(base_path, snapshot=snapshot, cache=cache, jobs=jobs_option(sys.argv))
+    
+    if jsonl is not None:
+        # Machine-readable mode: findings go to the stream as they are found, the summary to stderr
+        with open_report(jsonl) as stream:
+            writer = validator.stream_jsonl(stream, keys)
+        print(f"Findings: {writer.summary()}", file=sys.stderr)
+        exit(1 if writer.counts.get(ERROR) else 0)
+    
+    if keys is not None:
+        valid = validator.validate_scope(keys, describe_scope(*scope))
+    else:
+        valid = validator.validate_all()
+    
+    if cache is not None:
+        print(f"\nCache: {cache.hits} hit(s), {cache.misses} miss(es)")
     
     exit(0 if valid else 1)
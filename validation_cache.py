@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Persistent Validation Cache for Layout Pattern Tools
+Remembers each model's errors/warnings keyed by a signature of its directory tree
+"""
+
+import hashlib
+import json
+import os
+import stat
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from cli_options import DEFAULT_WORKSPACE
+from workspace_snapshot import WorkspaceSnapshot
+
+# Lives inside the workspace but is skipped by WorkspaceSnapshot and ignored by git
+CACHE_DIR = ".pattern_cache"
+CACHE_VERSION = 2
+
+# A directory modified this recently may change again within the same mtime tick, so its mtime can't vouch for it
+RACY_NS = 2_000_000_000
+
+
+class ValidationCache:
+    def __init__(self, base_path: str = DEFAULT_WORKSPACE, rules_key: str = "",
+                 content_hash: bool = False, name: str = "validation.json"):
+        self.base_path = Path(base_path)
+        self.cache_path = self.base_path / CACHE_DIR / name
+        self.rules_key = rules_key
+        self.content_hash = content_hash
+        self.entries: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Read the cache file; a missing, corrupt or outdated cache just starts empty"""
+        try:
+            data = json.loads(self.cache_path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION and data.get("rules") == self.rules_key:
+            self.entries = data.get("models", {})
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({
+                "version": CACHE_VERSION,
+                "rules": self.rules_key,
+                "models": self.entries,
+            }, indent=1, sort_keys=True))
+            os.replace(tmp_path, self.cache_path)
+            self.dirty = False
+        except OSError as e:
+            print(f"⚠ Could not write validation cache: {e}")
+
+    def signature(self, snapshot: WorkspaceSnapshot, path: Path) -> str:
+        """Hash of every entry below path: relative name, size, mtime and inode (plus file bytes if content_hash)"""
+        digest = hashlib.sha1()
+        root = str(path)
+        for key, entry in snapshot.walk(path):
+            rel = key[len(root):]
+            digest.update(f"{rel}\0{entry.d_type}\0{entry.size}\0{entry.mtime_ns}\0{entry.inode}\n".encode())
+            if self.content_hash and not entry.is_dir:
+                try:
+                    with open(key, "rb") as f:
+                        digest.update(hashlib.sha1(f.read()).digest())
+                except OSError:
+                    digest.update(b"<unreadable>")
+        return digest.hexdigest()
+
+    def tree_dirs(self, snapshot: WorkspaceSnapshot, path: Path) -> Optional[Dict[str, int]]:
+        """mtime of every directory below path (names relative to it, "" for path itself) for lookup_unchanged(),
+        or None where mtimes can't stand in for the signature: content hashing, symlinks, recently changed dirs"""
+        if self.content_hash:
+            return None
+        root = str(path)
+        recent = time.time_ns() - RACY_NS
+        dirs = {}
+        for key, entry in snapshot.walk(path):
+            if entry.d_type == "link" or (entry.is_dir and entry.mtime_ns > recent):
+                return None
+            if entry.is_dir:
+                dirs[key[len(root):]] = entry.mtime_ns
+        return dirs
+
+    def lookup_unchanged(self, key: str, path: Path) -> Optional[Tuple[bool, List, List]]:
+        """lookup() without indexing path: a hit while every directory stored for key keeps its mtime
+
+        Adding, removing or renaming anything changes its parent directory's mtime, so this costs one stat
+        per directory and no listing. Edits inside files don't show up here, which is fine for structure
+        checks; with content_hash it never hits.
+        """
+        with self._lock:
+            cached = self.entries.get(key)
+        dirs = cached.get("dirs") if cached is not None else None
+        if not dirs or self.content_hash:
+            return None
+        root = str(path)
+        for rel, mtime_ns in dirs.items():
+            try:
+                st = os.lstat(root + rel)
+            except OSError:
+                return None
+            if st.st_mtime_ns != mtime_ns or not stat.S_ISDIR(st.st_mode):
+                return None
+        with self._lock:
+            self.hits += 1
+        return cached["valid"], list(cached["errors"]), list(cached["warnings"])
+
+    def stored(self, key: str, name: str):
+        """An extra field stored with key's entry (see store()), or None"""
+        with self._lock:
+            return self.entries.get(key, {}).get(name)
+
+    def lookup(self, key: str, signature: str) -> Optional[Tuple[bool, List, List]]:
+        """Return (valid, errors, warnings) stored for key if its signature is unchanged
+
+        Errors and warnings are whatever JSON-able records the caller stored (finding rows for the validator).
+        """
+        with self._lock:
+            cached = self.entries.get(key)
+            if cached is None or cached.get("signature") != signature:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return cached["valid"], list(cached["errors"]), list(cached["warnings"])
+
+    def store(self, key: str, signature: str, valid: bool, errors: List, warnings: List, **extra):
+        """Remember key's results; extra fields (e.g. dirs from tree_dirs()) are kept alongside them"""
+        with self._lock:
+            self.entries[key] = {
+                "signature": signature,
+                "valid": valid,
+                "errors": list(errors),
+                "warnings": list(warnings),
+                **extra,
+            }
+            self.dirty = True
+
+    def prune(self, live_keys: List[str]):
+        """Forget models that no longer exist"""
+        for key in set(self.entries) - set(live_keys):
+            del self.entries[key]
+            self.dirty = True
+
+
+def rules_fingerprint(*rules) -> str:
+    """Stable key for a set of validation rules, so changing the rules invalidates the cache"""
+    return hashlib.sha1(json.dumps(rules, sort_keys=True, default=str).encode()).hexdigest()
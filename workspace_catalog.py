@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+SQLite Workspace Catalog
+Indexes every node of the workspace (owning model or component, schema category, property value) in an
+SQLite database under .pattern_cache, refreshed incrementally from directory mtimes, and answers glob and
+predicate selector queries from its indexes instead of walking the tree
+"""
+
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from cli_options import DEFAULT_WORKSPACE
+from instrumentation import LSTAT, SCAN, count_calls, phase
+from pattern_schema import load_schema
+from property_resolver import component_prefix
+from validate_pattern import owner_of, root_dir
+from validation_cache import CACHE_DIR
+from workspace_snapshot import SKIP_DIRS
+
+CATALOG_NAME = "catalog.sqlite"
+CATALOG_VERSION = 1
+
+# Property files larger than this are indexed without their value
+MAX_VALUE_BYTES = 4096
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+-- mtime of every indexed directory: an unchanged one is not listed again on refresh
+CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS nodes (
+    path TEXT PRIMARY KEY,      -- workspace-relative, "/"-separated
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,         -- dir, file or link
+    size INTEGER,
+    mtime_ns INTEGER,
+    owner TEXT,                 -- model name or component key, as the validator names it
+    relpath TEXT,               -- path below the owner's root
+    category TEXT,              -- schema subdirectory (properties, operations, types, ...)
+    sub TEXT,                   -- properties subdirectory (layout, style, content, behavior)
+    value TEXT                  -- stripped content of a property file
+);
+CREATE INDEX IF NOT EXISTS nodes_parent ON nodes (parent);
+CREATE INDEX IF NOT EXISTS nodes_owner ON nodes (owner, relpath);
+CREATE INDEX IF NOT EXISTS nodes_category ON nodes (category, sub, name);
+CREATE INDEX IF NOT EXISTS nodes_name ON nodes (name);
+"""
+
+# Selector fields and operators: `owner~layout/components/*`, `value!=default`, `size>0`
+FIELDS = ("path", "parent", "name", "kind", "size", "mtime_ns", "owner", "relpath", "category", "sub", "value")
+_PREDICATE = re.compile(r"^(%s)\s*(!~|!=|<=|>=|~|=|<|>)(.*)$" % "|".join(FIELDS))
+_SQL_OPS = {"=": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">=", "~": "GLOB", "!~": "NOT GLOB"}
+_NUMERIC_FIELDS = {"size", "mtime_ns"}
+
+
+def default_catalog_path(base_path: str = DEFAULT_WORKSPACE) -> Path:
+    return Path(base_path) / CACHE_DIR / CATALOG_NAME
+
+
+def subtree(path: str) -> Tuple[str, str, str]:
+    """(path, lower, upper) bounds of path and everything below it; "0" sorts right after "/", so the range
+    is index-friendly and needs no LIKE escaping"""
+    return path, path + "/", path + "0"
+
+
+class Node(NamedTuple):
+    path: str
+    parent: str
+    name: str
+    kind: str
+    size: int
+    mtime_ns: int
+    owner: Optional[str]
+    relpath: Optional[str]
+    category: Optional[str]
+    sub: Optional[str]
+    value: Optional[str]
+
+
+class RefreshStats(NamedTuple):
+    dirs_checked: int
+    dirs_listed: int
+    upserted: int
+    removed: int
+    seconds: float
+
+
+class WorkspaceCatalog:
+    def __init__(self, base_path: str = DEFAULT_WORKSPACE, db_path: Optional[Path] = None):
+        self.base_path = Path(base_path)
+        self.db_path = db_path or default_catalog_path(base_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.schema = load_schema()
+        self.categories = frozenset(self.schema.subdirectories)
+        self.db = sqlite3.connect(str(self.db_path))
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self._open()
+
+    def _open(self):
+        """Create the tables; a catalog from another version or schema is dropped and rebuilt on refresh"""
+        self.db.executescript(SCHEMA_SQL)
+        stamp = f"{CATALOG_VERSION}:{self.schema.fingerprint}"
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is not None and row[0] == stamp:
+            return
+        with self.db:
+            self.db.execute("DELETE FROM nodes")
+            self.db.execute("DELETE FROM dirs")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (stamp,))
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Indexing
+
+    def describe(self, rel: str, kind: str, size: int, mtime_ns: int) -> Node:
+        """Catalog row of one workspace-relative node: its owner, schema category and property value"""
+        parent, _, name = rel.rpartition("/")
+        relpath = category = sub = value = None
+        key = str(self.base_path / rel)
+        owner = owner_of(self.base_path, key)
+        if owner is not None and key == str(root_dir(self.base_path, owner)) and kind != "dir":
+            owner = None  # a loose file next to the roots (layout/components/README.md), not one of them
+        if owner is not None:
+            root = root_dir(self.base_path, owner)
+            relpath = Path(key).relative_to(root).as_posix() if key != str(root) else ""
+            parts = relpath.split("/") if relpath else []
+            if parts and parts[0] in self.categories:
+                category = parts[0]
+                if category == "properties" and len(parts) > 1 and (len(parts) > 2 or kind == "dir"):
+                    sub = parts[1]
+            if category == "properties" and kind == "file" and size <= MAX_VALUE_BYTES:
+                value = self._read_value(key)
+        return Node(rel, parent, name, kind, size, mtime_ns, owner, relpath, category, sub, value)
+
+    @staticmethod
+    def _read_value(key: str) -> Optional[str]:
+        try:
+            with open(key, "rb") as f:
+                return f.read().decode("utf-8").strip()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def refresh(self, full: bool = False) -> RefreshStats:
+        """Bring the catalog up to date with the workspace
+
+        Every known directory is stat()ed; only those whose mtime moved (an entry was created, removed or
+        renamed in it) are listed again. A file rewritten in place (a shell redirect) keeps its directory's
+        mtime, so the property files of unchanged directories, a small share of the tree, are stat()ed too and
+        re-read when their size or mtime moved.
+        """
+        start = time.perf_counter()
+        with phase(SCAN), self.db:
+            if full:
+                self.db.execute("DELETE FROM nodes")
+                self.db.execute("DELETE FROM dirs")
+            known = dict(self.db.execute("SELECT path, mtime_ns FROM dirs"))
+            checked = listed = upserted = removed = 0
+            stack = [""]
+            while stack:
+                rel = stack.pop()
+                key = str(self.base_path / rel) if rel else str(self.base_path)
+                checked += 1
+                try:
+                    mtime_ns = os.stat(key).st_mtime_ns
+                except OSError:
+                    removed += self._remove(rel)
+                    continue
+                if known.get(rel) == mtime_ns:
+                    stack.extend(path for (path,) in self.db.execute(
+                        "SELECT path FROM nodes WHERE parent = ? AND kind = 'dir'", (rel,)))
+                    rows = self._changed_properties(rel)
+                    self.db.executemany("INSERT OR REPLACE INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                    upserted += len(rows)
+                    continue
+                listed += 1
+                rows, subdirs = self._list(rel, key)
+                names = {row.name for row in rows}
+                for (name,) in self.db.execute("SELECT name FROM nodes WHERE parent = ?", (rel,)).fetchall():
+                    if name not in names:
+                        removed += self._remove(f"{rel}/{name}" if rel else name)
+                self.db.executemany("INSERT OR REPLACE INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                upserted += len(rows)
+                self.db.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?)", (rel, mtime_ns))
+                stack.extend(subdirs)
+        return RefreshStats(checked, listed, upserted, removed, time.perf_counter() - start)
+
+    def _changed_properties(self, rel: str) -> List[Node]:
+        """Fresh rows for the property files directly in an unchanged directory whose size or mtime moved"""
+        rows = []
+        for path, size, mtime_ns in self.db.execute(
+                "SELECT path, size, mtime_ns FROM nodes WHERE parent = ? AND category = 'properties' AND kind = 'file'",
+                (rel,)).fetchall():
+            try:
+                st = os.lstat(self.base_path / path)
+            except OSError:
+                continue  # gone without its directory's mtime moving: the next listing drops it
+            if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                rows.append(self.describe(path, "file", st.st_size, st.st_mtime_ns))
+        return rows
+
+    def _list(self, rel: str, key: str) -> Tuple[List[Node], List[str]]:
+        rows, subdirs = [], []
+        stats = 0
+        try:
+            with os.scandir(key) as it:
+                for item in it:
+                    if item.name in SKIP_DIRS:
+                        continue
+                    try:
+                        stats += 1
+                        st = item.stat(follow_symlinks=False)
+                        is_dir = item.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    kind = "link" if item.is_symlink() else ("dir" if is_dir else "file")
+                    child = f"{rel}/{item.name}" if rel else item.name
+                    rows.append(self.describe(child, kind, st.st_size, st.st_mtime_ns))
+                    if kind == "dir":
+                        subdirs.append(child)
+        except OSError:
+            pass
+        count_calls(LSTAT, stats)
+        return rows, subdirs
+
+    def _remove(self, rel: str) -> int:
+        """Drop a node and its whole subtree from the catalog; returns the number of nodes removed"""
+        if not rel:
+            bounds = ("", "", "\U0010ffff")
+        else:
+            bounds = subtree(rel)
+        cursor = self.db.execute("DELETE FROM nodes WHERE path = ? OR (path >= ? AND path < ?)", bounds)
+        self.db.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", bounds)
+        return cursor.rowcount
+
+    # Queries
+
+    def where(self, selectors: Iterable[str]) -> Tuple[str, List]:
+        """SQL condition and parameters for selectors, ANDed: `field OP value` predicates, anything else a
+        glob on the path"""
+        clauses, params = [], []
+        for selector in selectors:
+            match = _PREDICATE.match(selector)
+            if match is None:
+                clauses.append("path GLOB ?")
+                params.append(selector)
+                continue
+            field, op, value = match.groups()
+            if value in ("", "null") and op in ("=", "!="):
+                clauses.append(f"{field} IS {'NOT ' if op == '!=' else ''}NULL"
+                               if value == "null" else f"{field} {op} ''")
+                continue
+            clauses.append(f"{field} {_SQL_OPS[op]} ?")
+            if field in _NUMERIC_FIELDS:
+                try:
+                    params.append(int(value))
+                except ValueError:
+                    raise ValueError(f"{field} compares integers, not '{value}' (in '{selector}')") from None
+            else:
+                params.append(value)
+        return " AND ".join(clauses) or "1", params
+
+    def select(self, selectors: Iterable[str], limit: Optional[int] = None) -> List[Node]:
+        condition, params = self.where(selectors)
+        sql = f"SELECT * FROM nodes WHERE {condition} ORDER BY path"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [Node(*row) for row in self.db.execute(sql, params)]
+
+    def owners(self, selectors: Iterable[str] = ()) -> List[str]:
+        """Owners with at least one node matching selectors (every owner without selectors)"""
+        condition, params = self.where(selectors)
+        return [owner for (owner,) in self.db.execute(
+            f"SELECT DISTINCT owner FROM nodes WHERE owner IS NOT NULL AND {condition} ORDER BY owner", params)]
+
+    def expand(self, owner: str, relpath: str) -> str:
+        """relpath with {prefix} replaced by the owner's prefix: BarModel -> Bar, layout/components/card -> Card"""
+        if "{prefix}" not in relpath:
+            return relpath
+        name = owner.rsplit("/", 1)[-1]
+        prefix = name[:-len("Model")] if "/" not in owner and name.endswith("Model") else component_prefix(name)
+        return relpath.replace("{prefix}", prefix)
+
+    def missing(self, relpath: str, selectors: Iterable[str] = ()) -> List[str]:
+        """Owners (of nodes matching selectors) that have no node at relpath below their root"""
+        result = []
+        for owner in self.owners(selectors):
+            wanted = self.expand(owner, relpath)
+            found = self.db.execute("SELECT 1 FROM nodes WHERE owner = ? AND relpath = ?", (owner, wanted)).fetchone()
+            if found is None:
+                result.append(owner)
+        return result
+
+    def summary(self) -> str:
+        counts = dict(self.db.execute("SELECT kind, COUNT(*) FROM nodes GROUP BY kind"))
+        owners = self.db.execute("SELECT COUNT(DISTINCT owner) FROM nodes").fetchone()[0]
+        return (f"{counts.get('dir', 0)} directories, {counts.get('file', 0)} files, "
+                f"{counts.get('link', 0)} links, {owners} owners")
+
+
+USAGE = """Usage: workspace_catalog.py refresh [--full]
+       workspace_catalog.py query [SELECTOR...] [--owners | --missing RELPATH] [--limit N] [--no-refresh]
+
+Selectors are ANDed. A bare word is a glob on the workspace-relative path (models/*/types/*.swift);
+FIELD OP VALUE compares a column, with OP one of = != < <= > >= ~ (glob) !~ (not glob) and VALUE null for
+an absent column. Fields: {fields}
+
+  --owners           list the owners (models and components) of the matching nodes
+  --missing RELPATH  list owners of matching nodes that lack RELPATH; {{prefix}} is the owner's prefix
+
+Examples:
+  query 'owner~layout/components/*' --missing properties/content/icon
+  query 'owner!~*/*' --missing 'types/{{prefix}}Type.swift'
+  query category=properties sub=style name=opacity 'value!=1.0'"""
+
+
+if __name__ == "__main__":
+    import sys
+    from cli_options import option_value
+    from instrumentation import profile_option
+
+    profile_option(sys.argv)
+    args = sys.argv[1:]
+    command = args[0] if args else ""
+    if command not in ("refresh", "query"):
+        print(USAGE.format(fields=", ".join(FIELDS)))
+        exit(2)
+
+    with WorkspaceCatalog(DEFAULT_WORKSPACE) as catalog:
+        if command == "refresh" or "--no-refresh" not in args:
+            stats = catalog.refresh(full="--full" in args)
+            out = sys.stdout if command == "refresh" else sys.stderr
+            print(f"Catalog {catalog.db_path}: {catalog.summary()}", file=out)
+            print(f"Refreshed in {stats.seconds * 1000:.1f} ms: {stats.dirs_checked} directories checked, "
+                  f"{stats.dirs_listed} listed, {stats.upserted} nodes written, {stats.removed} removed", file=out)
+        if command == "query":
+            valued = ("--missing", "--limit", "--profile")
+            selectors = [a for i, a in enumerate(args[1:], 1)
+                         if not a.startswith("--") and args[i - 1] not in valued]
+            start = time.perf_counter()
+            relpath = option_value(args, "--missing")
+            limit = option_value(args, "--limit")
+            if limit is not None and not limit.isdigit():
+                print(f"✗ --limit takes a number of rows, not '{limit}'")
+                exit(2)
+            try:
+                if relpath is not None:
+                    results = catalog.missing(relpath, selectors)
+                elif "--owners" in args:
+                    results = catalog.owners(selectors)
+                else:
+                    results = [f"{node.path}" + (f" = {node.value}" if node.value is not None else "")
+                               for node in catalog.select(selectors, int(limit) if limit else None)]
+            except ValueError as e:
+                print(f"✗ {e}")
+                exit(2)
+            elapsed = (time.perf_counter() - start) * 1000
+            for line in results:
+                print(line)
+            print(f"\n{len(results)} result(s) in {elapsed:.1f} ms", file=sys.stderr)
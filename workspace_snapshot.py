@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Workspace Snapshot Index for Layout Pattern Tools
+Walks the layout tree once with os.scandir and answers every existence/listing query from memory
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from cli_options import DEFAULT_WORKSPACE
+from instrumentation import LSTAT, SCAN, count_calls, phase
+
+# Directories never relevant to the pattern (VCS, SwiftPM build output, bytecode, our own caches)
+SKIP_DIRS = {".git", ".build", "__pycache__", ".pattern_cache"}
+
+PathLike = Union[str, Path]
+
+
+class Entry(NamedTuple):
+    """One node of the snapshot, as reported by os.scandir"""
+    is_dir: bool
+    size: int
+    mtime_ns: int
+    inode: int
+    d_type: str  # "dir", "file" or "link"
+
+
+def _scan_dir(dir_key: str) -> List[Tuple[str, str, Entry]]:
+    """List one directory: (name, path, entry) for every child not in SKIP_DIRS"""
+    found = []
+    stats = 0
+    try:
+        with os.scandir(dir_key) as it:
+            for item in it:
+                if item.name in SKIP_DIRS:
+                    continue
+                try:
+                    is_dir = item.is_dir()
+                    stats += 1
+                    st = item.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                is_link = item.is_symlink()
+                d_type = "link" if is_link else ("dir" if is_dir else "file")
+                found.append((item.name, item.path, Entry(is_dir, st.st_size, st.st_mtime_ns, item.inode(), d_type)))
+    except OSError:
+        pass
+    count_calls(LSTAT, stats)
+    return found
+
+
+def _scan_dir_in_phase(dir_key: str) -> List[Tuple[str, str, Entry]]:
+    """_scan_dir on a pool thread, so a profile counts its calls under the scan phase (timed by scan())"""
+    with phase(SCAN, timed=False):
+        return _scan_dir(dir_key)
+
+
+class WorkspaceSnapshot:
+    def __init__(self, base_path: str = DEFAULT_WORKSPACE, jobs: int = 1, roots: Optional[List[PathLike]] = None):
+        """Index base_path, or with roots only those subtrees (e.g. the ones a git diff touched)"""
+        self.base_path = Path(base_path)
+        self.jobs = jobs
+        self.entries: Dict[str, Entry] = {}
+        self.children: Dict[str, List[str]] = {}
+        self.generation = 0  # bumped on every change, so callers can memoize derived views
+        self._lock = threading.Lock()
+        if roots is None:
+            self.scan()
+        for root in roots or ():
+            self.scan(root)
+
+    def scan(self, root: Optional[PathLike] = None):
+        """Walk root (default: the whole workspace) once and index every dir and file below it
+
+        With jobs > 1 each directory level is listed on a thread pool, which overlaps the
+        per-directory latency of network-backed storage; the resulting index is identical.
+        """
+        with phase(SCAN):
+            root_key = str(root or self.base_path)
+            self.generation += 1
+            self._forget(root_key)
+            try:
+                st = os.stat(root_key)
+            except OSError:
+                return
+            self.entries[root_key] = Entry(True, st.st_size, st.st_mtime_ns, st.st_ino, "dir")
+            self._link_parent(root_key)
+
+            if self.jobs <= 1:
+                stack = [root_key]
+                while stack:
+                    dir_key = stack.pop()
+                    stack.extend(self._index_dir(dir_key, _scan_dir(dir_key)))
+                return
+
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                level = [root_key]
+                while level:
+                    next_level = []
+                    for dir_key, found in zip(level, pool.map(_scan_dir_in_phase, level)):
+                        next_level.extend(self._index_dir(dir_key, found))
+                    level = next_level
+
+    def index_dir(self, path: PathLike):
+        """Index only the entries directly in path; its subdirectories stay unlisted until scan()ned"""
+        with phase(SCAN):
+            key = str(path)
+            if key in self.children:
+                return
+            try:
+                st = os.stat(key)
+            except OSError:
+                return
+            self.generation += 1
+            self.entries[key] = Entry(True, st.st_size, st.st_mtime_ns, st.st_ino, "dir")
+            self._link_parent(key)
+            self._index_dir(key, _scan_dir(key))
+
+    def _index_dir(self, dir_key: str, found: List[Tuple[str, str, Entry]]) -> List[str]:
+        """Store one directory listing; returns the subdirectories still to be walked"""
+        names = []
+        to_walk = []
+        for name, path, entry in found:
+            self.entries[path] = entry
+            # Names repeat across every model and component (Create.swift, properties, ...); share one copy
+            names.append(sys.intern(name))
+            if entry.d_type == "dir":
+                to_walk.append(path)
+            elif entry.is_dir:
+                self.children[path] = []
+        names.sort()
+        self.children[dir_key] = names
+        return to_walk
+
+    def _forget(self, key: str):
+        """Drop key and everything below it from the index (and from its parent's child list)"""
+        for k in [k for k, _ in self.walk(key)]:
+            del self.entries[k]
+            self.children.pop(k, None)
+        parent, name = os.path.split(key)
+        if name in self.children.get(parent, ()):
+            self.children[parent].remove(name)
+
+    def _link_parent(self, key: str):
+        """Make key visible in its parent's child list, if the parent is indexed"""
+        parent, name = os.path.split(key)
+        names = self.children.get(parent)
+        if names is not None and name not in names:
+            names.append(name)
+            names.sort()
+
+    # Queries
+
+    def entry(self, path: PathLike) -> Optional[Entry]:
+        return self.entries.get(str(path))
+
+    def exists(self, path: PathLike) -> bool:
+        return str(path) in self.entries
+
+    def is_dir(self, path: PathLike) -> bool:
+        entry = self.entries.get(str(path))
+        return entry is not None and entry.is_dir
+
+    def is_file(self, path: PathLike) -> bool:
+        entry = self.entries.get(str(path))
+        return entry is not None and not entry.is_dir
+
+    def list_dir(self, path: PathLike) -> List[str]:
+        """Sorted names of all entries directly in path (empty if path is not an indexed dir)"""
+        return list(self.children.get(str(path), ()))
+
+    def subdirs(self, path: PathLike) -> List[str]:
+        key = str(path)
+        return [name for name in self.children.get(key, ())
+                if self.entries[os.path.join(key, name)].is_dir]
+
+    def files(self, path: PathLike) -> List[str]:
+        key = str(path)
+        return [name for name in self.children.get(key, ())
+                if not self.entries[os.path.join(key, name)].is_dir]
+
+    def walk_files(self, path: PathLike) -> Iterator[str]:
+        """Yield every file below path as a path relative to it, like rglob('*') filtered to files"""
+        root = str(path)
+        stack = [(root, "")]
+        while stack:
+            dir_key, rel = stack.pop()
+            for name in self.children.get(dir_key, ()):
+                key = os.path.join(dir_key, name)
+                rel_name = f"{rel}{name}"
+                if self.entries[key].is_dir:
+                    stack.append((key, rel_name + "/"))
+                else:
+                    yield rel_name
+
+    def walk(self, path: PathLike) -> Iterator[Tuple[str, Entry]]:
+        """Yield (key, entry) for path and everything below it, in sorted depth-first order"""
+        root = str(path)
+        if root not in self.entries:
+            return
+        stack = [root]
+        while stack:
+            key = stack.pop()
+            entry = self.entries[key]
+            yield key, entry
+            if entry.is_dir:
+                stack.extend(os.path.join(key, name) for name in reversed(self.children.get(key, ())))
+
+    # Updates, so writers keep the index in sync with what they changed on disk
+
+    def record_dir(self, path: PathLike):
+        """Record a directory (and any missing parents) created after the scan"""
+        with self._lock:
+            self.generation += 1
+            self._record_dir(str(path))
+
+    def _record_dir(self, key: str):
+        base = str(self.base_path)
+        missing = []
+        while key not in self.entries and (key == base or key.startswith(base + os.sep)):
+            missing.append(key)
+            key = os.path.dirname(key)
+        for key in reversed(missing):
+            self.entries[key] = Entry(True, 0, 0, 0, "dir")
+            self.children[key] = []
+            self._link_parent(key)
+
+    def record_file(self, path: PathLike, size: int = 0):
+        """Record a file written after the scan"""
+        key = str(path)
+        with self._lock:
+            self.generation += 1
+            self._record_dir(os.path.dirname(key))
+            self.entries[key] = Entry(False, size, 0, 0, "file")
+            self._link_parent(key)
+
+    def move(self, src: PathLike, dst: PathLike):
+        """Re-key a subtree after it was renamed on disk"""
+        src_key, dst_key = str(src), str(dst)
+        self.generation += 1
+        prefix = src_key + os.sep
+        moved = [k for k in self.entries if k == src_key or k.startswith(prefix)]
+        for k in moved:
+            new_key = dst_key + k[len(src_key):]
+            self.entries[new_key] = self.entries.pop(k)
+            if k in self.children:
+                self.children[new_key] = self.children.pop(k)
+        parent, name = os.path.split(src_key)
+        if name in self.children.get(parent, ()):
+            self.children[parent].remove(name)
+        self._link_parent(dst_key)
+
+    def remove(self, path: PathLike):
+        """Drop a subtree deleted from disk after the scan"""
+        with self._lock:
+            self.generation += 1
+            self._forget(str(path))
+
+    def summary(self) -> str:
+        dirs = sum(1 for e in self.entries.values() if e.is_dir)
+        return f"{dirs} directories, {len(self.entries) - dirs} files"
+
+
+if __name__ == "__main__":
+    import sys
+
+    from cli_options import jobs_option
+
+    args = [a for i, a in enumerate(sys.argv[1:], 1)
+            if not a.startswith("-") and sys.argv[i - 1] not in ("--jobs", "-j")]
+    base = args[0] if args else DEFAULT_WORKSPACE
+    snapshot = WorkspaceSnapshot(base, jobs=jobs_option(sys.argv))
+    print(f"Indexed {snapshot.base_path}: {snapshot.summary()}")
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Batched Write Planner for Pattern Scaffolding
+Computes every missing directory and file across all targets first, then applies them in one transactional batch;
+with refresh, scaffold files that still hold an outdated template are replaced only where their bytes differ
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from cli_options import DEFAULT_WORKSPACE
+from instrumentation import STRUCTURE, WRITES, phase
+from pattern_schema import RETIRED_CONTENT
+from placeholder_store import PlaceholderStore
+from validation_cache import CACHE_DIR
+from workspace_snapshot import WorkspaceSnapshot
+
+JOURNAL_NAME = "write_journal.jsonl"
+
+Content = Union[str, bytes]  # planned file content: text is written as UTF-8, bytes exactly
+
+# A touched file below these invalidates the Swift package's .build module cache and forces a rebuild
+REBUILD_DIRS = ("widow", "window", os.path.join("layout", "components"))
+
+
+def default_journal_path(base_path: str = DEFAULT_WORKSPACE) -> Path:
+    return Path(base_path) / CACHE_DIR / JOURNAL_NAME
+
+
+def triggers_rebuild(base_path, key: str) -> bool:
+    rel = os.path.relpath(key, str(base_path))
+    return any(rel == d or rel.startswith(d + os.sep) for d in REBUILD_DIRS)
+
+
+def encoded(content: Content) -> bytes:
+    return content if isinstance(content, bytes) else content.encode()
+
+
+def same_bytes(key: str, content: bytes) -> bool:
+    """Whether the file at key holds exactly content (sizes are compared before reading)"""
+    try:
+        if os.stat(key).st_size != len(content):
+            return False
+        with open(key, "rb") as f:
+            return f.read() == content
+    except OSError:
+        return False
+
+
+def replace_atomically(key: str, content: bytes):
+    """Write content to a temp file beside key and rename it over key, so readers never see a partial file"""
+    tmp = f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "xb") as f:
+            f.write(content)
+        os.replace(tmp, key)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_if_changed(key: str, content: bytes) -> bool:
+    """Atomically replace (or create) key with content unless it already holds those bytes; True if written
+
+    An untouched file keeps its mtime, so incremental builds don't see it as changed.
+    """
+    if same_bytes(key, content):
+        return False
+    replace_atomically(key, content)
+    return True
+
+
+def is_template_output(data: bytes, bodies) -> bool:
+    """Whether an existing file still holds scaffold output, so refreshing it loses nothing: exactly one of
+    the known template bodies, current or retired. Anything else, even a comment-only stub, may be hand-written."""
+    return data in bodies
+
+
+class WritePlan:
+    def __init__(self, snapshot: WorkspaceSnapshot, store: Optional[PlaceholderStore] = None, refresh: bool = False):
+        self.snapshot = snapshot
+        self.store = store  # when set, placeholder bodies are linked to its shared blobs instead of written
+        self.refresh = refresh  # also bring existing scaffold files up to the current template
+        self.dirs: Dict[str, None] = {}   # insertion-ordered set of directories to create
+        self.files: Dict[str, Content] = {}   # path -> content of files to create (text, or exact bytes)
+        self.replacements: Dict[str, Content] = {}  # path -> content of outdated scaffold files to refresh
+        self.originals: Dict[str, bytes] = {}   # path -> bytes a refresh replaced, for rollback
+        self.unchanged: List[str] = []  # existing files whose bytes already matched: writes avoided
+        self.bodies = {body.encode() for body in RETIRED_CONTENT}  # known template bodies, encoded
+        self.created_dirs: List[str] = []
+        self.created_files: List[str] = []
+        self.replaced_files: List[str] = []
+        self._lock = threading.Lock()
+        self._journal = None
+
+    # Planning (pure, answered from the snapshot)
+
+    def add_dir(self, path: Path):
+        """Plan a directory and any missing ancestors, each at most once"""
+        key = str(path)
+        base = str(self.snapshot.base_path)
+        missing = []
+        while key not in self.dirs and not self.snapshot.exists(key) and key.startswith(base + os.sep):
+            missing.append(key)
+            key = os.path.dirname(key)
+        for key in reversed(missing):
+            self.dirs[key] = None
+
+    def add_file(self, path: Path, content: Content) -> bool:
+        """Plan a file unless it already exists or is already planned; with refresh, plan replacing an
+        existing one that still holds an outdated template. Text is written as UTF-8, bytes as they are."""
+        key = str(path)
+        if key in self.files or key in self.replacements:
+            return False
+        if self.snapshot.exists(key):
+            return self.refresh and self.add_refresh(key, content)
+        self.add_dir(path.parent)
+        self.files[key] = content
+        return True
+
+    def add_refresh(self, key: str, content: Content) -> bool:
+        """Plan replacing key with content if its bytes differ and it is still scaffold output (files that were
+        edited are left alone); reads the file, unlike the rest of planning"""
+        data = encoded(content)
+        try:
+            with open(key, "rb") as f:
+                current = f.read()
+        except OSError:
+            return False
+        if current == data:
+            self.unchanged.append(key)
+            return False
+        if not is_template_output(current, self.bodies | {data}):
+            return False
+        self.replacements[key] = content
+        self.originals[key] = current
+        return True
+
+    def refreshed(self, path: Path) -> bool:
+        """Whether path is planned as a refresh of an existing file rather than a new one"""
+        return str(path) in self.replacements
+
+    def ensure_pattern(self, root: Path, structure: List[str], default_content: Dict[str, str]) -> List[str]:
+        """Plan every missing entry of structure under root; returns the planned relative paths"""
+        planned = []
+        self.bodies.update(body.encode() for body in default_content.values())
+        with phase(STRUCTURE):
+            for relpath in structure:
+                content = default_content.get(Path(relpath).suffix, default_content[""])
+                if self.add_file(root / relpath, content):
+                    planned.append(relpath)
+        return planned
+
+    def is_empty(self) -> bool:
+        return not self.dirs and not self.files and not self.replacements
+
+    def summary(self) -> str:
+        refreshed = f", {len(self.replacements)} refreshed" if self.replacements else ""
+        return f"{len(self.dirs)} directories, {len(self.files)} files{refreshed}"
+
+    def write_summary(self) -> str:
+        """Writes made and avoided by content comparison, and how many avoided ones would have forced a Swift
+        rebuild"""
+        base = self.snapshot.base_path
+        written = len(self.created_files) + len(self.replaced_files)
+        rebuilds = sum(triggers_rebuild(base, key) for key in self.unchanged)
+        return (f"{written} file(s) written, {len(self.unchanged)} write(s) avoided (bytes already matched), "
+                f"{rebuilds} rebuild trigger(s) avoided")
+
+    # Applying
+
+    def apply(self, journal: Optional[Path] = None, jobs: int = 1):
+        """Create all planned dirs, then all planned files; on any failure undo everything and re-raise
+
+        With a journal path every completed step is also appended to that file, so a run killed
+        half-way can be undone later with rollback_journal().
+        """
+        if self.is_empty():
+            return
+        if journal is not None:
+            journal.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = open(journal, "a")
+        try:
+            with phase(WRITES):
+                # Sorted, so every parent is created before its children
+                for key in sorted(self.dirs):
+                    os.mkdir(key)
+                    self._log("mkdir", key, self.created_dirs)
+
+                items = [(self._create_file, item) for item in sorted(self.files.items())]
+                items += [(self._replace_file, item) for item in sorted(self.replacements.items())]
+                if jobs > 1:
+                    with ThreadPoolExecutor(max_workers=jobs) as pool:
+                        list(pool.map(lambda step: step[0](step[1]), items))
+                else:
+                    for write, item in items:
+                        write(item)
+        except BaseException:
+            self.rollback()
+            self._close_journal(journal)
+            raise
+        self._close_journal(journal)
+
+        for key in self.created_dirs:
+            self.snapshot.record_dir(key)
+        for key in self.created_files:
+            self.snapshot.record_file(key, len(encoded(self.files[key])))
+        for key in self.replaced_files:
+            self.snapshot.record_file(key, len(encoded(self.replacements[key])))
+
+    def _create_file(self, item):
+        key, content = item
+        data = encoded(content)
+        # Entered again here so calls made on pool threads are counted under writes too (apply() times them)
+        with phase(WRITES, timed=False):
+            # "x" (and linking) refuses to clobber a file that appeared since the snapshot was taken
+            try:
+                if self.store is not None:
+                    self.store.materialize(data, key)
+                else:
+                    with open(key, "xb") as f:
+                        f.write(data)
+            except FileExistsError:
+                if not same_bytes(key, data):
+                    raise
+                with self._lock:
+                    self.unchanged.append(key)  # another run created it identically; nothing to do
+                return
+        self._log("create", key, self.created_files)
+
+    def _replace_file(self, item):
+        key, content = item
+        with phase(WRITES, timed=False):
+            data = encoded(content)
+            if same_bytes(key, data):
+                with self._lock:
+                    self.unchanged.append(key)
+                return
+            if self.store is not None:
+                # Materialize (link) beside the file, then rename it over: still one atomic replace
+                tmp = f"{key}.refresh.tmp"
+                try:
+                    self.store.materialize(data, tmp)
+                    os.replace(tmp, key)
+                except BaseException:
+                    if os.path.lexists(tmp):
+                        os.unlink(tmp)
+                    raise
+            else:
+                replace_atomically(key, data)
+        self._log("replace", key, self.replaced_files, original=self.originals[key])
+
+    def _log(self, op: str, key: str, done: List[str], original: Optional[bytes] = None):
+        with self._lock:
+            done.append(key)
+            if self._journal is not None:
+                step = {"op": op, "path": key}
+                if original is not None:
+                    step["original"] = original.decode("utf-8", "surrogateescape")
+                self._journal.write(json.dumps(step) + "\n")
+                self._journal.flush()
+
+    def _close_journal(self, journal: Optional[Path]):
+        if self._journal is None:
+            return
+        self._journal.close()
+        self._journal = None
+        # A finished batch (applied or rolled back) leaves nothing to recover
+        journal.unlink()
+
+    def rollback(self):
+        """Undo whatever this plan created or refreshed, newest first"""
+        for key in reversed(self.replaced_files):
+            try:
+                replace_atomically(key, self.originals[key])
+            except OSError:
+                pass
+        for key in reversed(self.created_files):
+            try:
+                os.unlink(key)
+            except OSError:
+                pass
+        for key in sorted(self.created_dirs, reverse=True):
+            try:
+                os.rmdir(key)
+            except OSError:
+                pass
+        self.created_files = []
+        self.created_dirs = []
+        self.replaced_files = []
+
+    @staticmethod
+    def rollback_journal(journal: Path) -> int:
+        """Undo an interrupted batch recorded in journal; returns the number of entries removed"""
+        if not journal.exists():
+            return 0
+        steps = []
+        for line in journal.read_text().splitlines():
+            try:
+                steps.append(json.loads(line))
+            except ValueError:
+                continue  # torn final line from a killed run
+        removed = 0
+        for step in reversed(steps):
+            try:
+                if step["op"] == "create":
+                    os.unlink(step["path"])
+                elif step["op"] == "replace":
+                    replace_atomically(step["path"], step["original"].encode("utf-8", "surrogateescape"))
+                else:
+                    os.rmdir(step["path"])
+                removed += 1
+            except OSError:
+                pass
+        journal.unlink()
+        return removed
+
+
+def apply_and_report(plan: WritePlan, report: List, journal: Optional[Path] = None, jobs: int = 1) -> bool:
+    """Apply plan, then print report ([(header, lines)] in target order); on failure print what was rolled back"""
+    try:
+        plan.apply(journal=journal, jobs=jobs)
+    except OSError as e:
+        for header, _ in report:
+            print(header)
+        print(f"\n✗ Write batch failed ({e}); rolled back {plan.summary()}")
+        return False
+    for header, lines in report:
+        print(header)
+        for line in lines:
+            print(line)
+    if plan.refresh or plan.unchanged:
+        print(f"\nWrites: {plan.write_summary()}")
+    return True